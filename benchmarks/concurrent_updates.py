@@ -0,0 +1,43 @@
+"""
+Stress test of concurrent updates to the same toasts, checking that no update is lost or applied out of order.
+Run with ``python benchmarks/concurrent_updates.py`` after installing the package
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from windows_toasts import InMemoryToastNotifier, InteractableWindowsToaster, Toast, ToastProgressBar
+
+
+def run(threads: int = 32, toasts: int = 4, updatesPerThread: int = 2000) -> None:
+    toaster = InteractableWindowsToaster("Benchmark")
+    notifier = InMemoryToastNotifier().attach(toaster)
+
+    sharedToasts = [Toast([f"Job {i}"], progress_bar=ToastProgressBar("Starting...")) for i in range(toasts)]
+    handles = [toaster.show_toast(sharedToast) for sharedToast in sharedToasts]
+    start = threading.Barrier(threads)
+
+    def worker(workerId: int) -> None:
+        toastHandle = handles[workerId % toasts]
+        start.wait()
+        for i in range(updatesPerThread):
+            toastHandle.update(progress=i / updatesPerThread, status=f"Worker {workerId}")
+
+    startTime = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        list(executor.map(worker, range(threads)))
+    elapsed = time.perf_counter() - startTime
+
+    totalUpdates = threads * updatesPerThread
+    print(f"{totalUpdates:,} updates from {threads} threads to {toasts} toasts in {elapsed:.2f}s")
+    print(f"{totalUpdates / elapsed:,.0f} updates/s, {notifier.discardedUpdates} discarded")
+
+    assert notifier.updateCount == totalUpdates, "Updates were lost"
+    assert notifier.discardedUpdates == 0, "Updates arrived out of order or with duplicate sequence numbers"
+    for toastHandle in handles:
+        assert notifier.sequence_number_of(toastHandle.tag) == 1 + totalUpdates // toasts
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,69 @@
+"""
+Leak test of toasts that are shown and then activated, dismissed or removed, checking that neither the toaster's state
+nor the WinRT event handlers it registers grow with the number of toasts.
+Run with ``python benchmarks/event_handler_leaks.py`` after installing the package
+"""
+
+import gc
+import time
+import tracemalloc
+
+from windows_toasts import InMemoryToastNotifier, InteractableWindowsToaster, Toast, ToastDismissalReason
+
+
+def run(cycles: int = 100_000, samples: int = 10) -> None:
+    toaster = InteractableWindowsToaster("Benchmark")
+    notifier = InMemoryToastNotifier().attach(toaster)
+
+    def on_event(_) -> None:
+        pass
+
+    def cycle(i: int) -> None:
+        toast = Toast([f"Cycle {i}"], on_activated=on_event, on_dismissed=on_event, on_failed=on_event)
+        toaster.show_toast(toast)
+        if i % 4 == 0:
+            notifier.activate(toast.tag)
+        elif i % 4 == 1:
+            notifier.dismiss(toast.tag)
+        elif i % 4 == 2:
+            notifier.fail(toast.tag)
+        else:
+            # Timed out toasts stay in the action center until they are removed
+            notifier.dismiss(toast.tag, reason=ToastDismissalReason.TIMED_OUT)
+            toaster.remove_toast(toast)
+
+    # Warm up caches before measuring
+    for i in range(1000):
+        cycle(i)
+
+    tracemalloc.start()
+    gc.collect()
+    baseline = tracemalloc.get_traced_memory()[0]
+    startTime = time.perf_counter()
+    memoryUsage = []
+    for sample in range(samples):
+        for i in range(cycles // samples):
+            cycle(i)
+
+        gc.collect()
+        memoryUsage.append(tracemalloc.get_traced_memory()[0] - baseline)
+    elapsed = time.perf_counter() - startTime
+    tracemalloc.stop()
+
+    liveToasts = toaster.liveToasts
+    print(f"{cycles:,} show/dismiss cycles in {elapsed:.2f}s ({cycles / elapsed:,.0f}/s)")
+    print("Memory above baseline (KiB): " + ", ".join(f"{usage / 1024:.1f}" for usage in memoryUsage))
+    print(
+        f"{liveToasts.liveCount} live, {liveToasts.releasedCount:,} released, "
+        f"{liveToasts.handlersRegistered:,} handlers registered, {liveToasts.leakedHandlers} still registered"
+    )
+
+    assert liveToasts.liveCount == 0, "Toasts were not released"
+    assert liveToasts.leakedHandlers == 0, "Event handlers were not unregistered"
+    assert len(toaster.sequenceAllocator) == 0, "Sequence numbers were not forgotten"
+    # Memory should stay flat; allow for allocator noise but not for anything kept per toast
+    assert memoryUsage[-1] - memoryUsage[0] < 64 * 1024, "Memory grows with the number of toasts"
+
+
+if __name__ == "__main__":
+    run()
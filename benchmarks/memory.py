@@ -0,0 +1,198 @@
+"""
+Memory benchmark of a long-running toaster: bytes per Toast, bytes per shown toast held by the toaster, and memory
+retained after many show-only, show/dismiss, show/update/remove and schedule/unschedule cycles, broken down by object
+type. Fails if the retained memory grows past a threshold. Toasts go to an InMemoryToastNotifier, so no desktop is
+needed, and where winrt is not installed, e.g. on Linux, the stand-in in winrt_standin.py is used instead.
+Run with ``python benchmarks/memory.py`` after installing the package
+"""
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+try:
+    import winrt.windows.ui.notifications  # noqa: F401
+except ImportError:
+    import winrt_standin
+
+    winrt_standin.install()
+
+import windows_toasts  # noqa: E402
+from windows_toasts import (  # noqa: E402
+    InMemoryToastNotifier,
+    InteractableWindowsToaster,
+    SimulatedToastNotifier,
+    Toast,
+    ToastButton,
+)
+
+# Allocations made by the package itself, rather than by the notifier stand-in or the WinRT projection
+PACKAGE_FILTERS = [
+    tracemalloc.Filter(True, os.path.join(windows_toasts.__path__[0], "*")),
+    tracemalloc.Filter(False, os.path.join("*", "notifiers.py")),
+]
+
+
+def on_event(_) -> None:
+    pass
+
+
+def build_toast(i: int, callbacks: bool = True) -> Toast:
+    toast = Toast(
+        [f"Message {i}", "Are we still on for lunch tomorrow?"],
+        actions=[ToastButton("Reply", f"action=reply&id={i}"), ToastButton("Mute", f"action=mute&id={i}")],
+    )
+    if callbacks:
+        toast.on_activated = toast.on_dismissed = toast.on_failed = on_event
+
+    return toast
+
+
+def object_census() -> Dict[str, Tuple[int, int]]:
+    """
+    Number and shallow size of the objects tracked by the garbage collector, per type
+    """
+    counts: Counter = Counter()
+    sizes: Counter = Counter()
+    for trackedObject in gc.get_objects():
+        typeName = type(trackedObject).__qualname__
+        counts[typeName] += 1
+        sizes[typeName] += sys.getsizeof(trackedObject)
+
+    return {typeName: (counts[typeName], sizes[typeName]) for typeName in counts}
+
+
+def traced_memory(packageOnly: bool = False) -> int:
+    gc.collect()
+    if not packageOnly:
+        return tracemalloc.get_traced_memory()[0]
+
+    snapshot = tracemalloc.take_snapshot().filter_traces(PACKAGE_FILTERS)
+    return sum(statistic.size for statistic in snapshot.statistics("filename"))
+
+
+def measure_toast_size(count: int) -> float:
+    tracemalloc.start()
+    baseline = traced_memory()
+    toasts = [build_toast(i) for i in range(count)]
+    perToast = (traced_memory() - baseline) / count
+    tracemalloc.stop()
+    del toasts
+    return perToast
+
+
+def measure_held_size(count: int, callbacks: bool = True) -> Tuple[float, float]:
+    """
+    :return: Bytes per live toast allocated by the package, and by everything including the notifier stand-in
+    """
+    toaster = InteractableWindowsToaster("Benchmark")
+    InMemoryToastNotifier().attach(toaster)
+    toasts = [build_toast(i, callbacks) for i in range(count)]
+
+    tracemalloc.start()
+    packageBaseline, totalBaseline = traced_memory(True), traced_memory()
+    for toast in toasts:
+        toaster.show_toast(toast)
+
+    packageHeld, totalHeld = traced_memory(True) - packageBaseline, traced_memory() - totalBaseline
+    tracemalloc.stop()
+    toaster.clear_toasts()
+    return packageHeld / count, totalHeld / count
+
+
+def measure_cycles(
+    cycle: Callable[[int], None], cycles: int, samples: int, packageOnly: bool = False
+) -> Tuple[List[int], float, List[tuple]]:
+    """
+    :param packageOnly: Whether to only measure what the package allocates, e.g. when the notifier keeps the toasts
+    :return: Memory above the baseline after each sample, the seconds taken, and the types whose objects grew most
+    """
+    # Warm up caches before measuring
+    for i in range(1000):
+        cycle(i)
+
+    censusBefore = object_census()
+    tracemalloc.start()
+    baseline = traced_memory(packageOnly)
+    memoryUsage = []
+    startTime = time.perf_counter()
+    for sample in range(samples):
+        for i in range(cycles // samples):
+            cycle(i)
+
+        memoryUsage.append(traced_memory(packageOnly) - baseline)
+    elapsed = time.perf_counter() - startTime
+    tracemalloc.stop()
+
+    censusAfter = object_census()
+    typeGrowth = []
+    for typeName, (count, size) in censusAfter.items():
+        countBefore, sizeBefore = censusBefore.get(typeName, (0, 0))
+        if count > countBefore:
+            typeGrowth.append((typeName, count - countBefore, size - sizeBefore))
+
+    typeGrowth.sort(key=lambda growth: growth[2], reverse=True)
+    return memoryUsage, elapsed, typeGrowth[:10]
+
+
+def run(cycles: int = 100_000, samples: int = 10, maxGrowth: int = 64 * 1024) -> None:
+    print(f"Toast: {measure_toast_size(10_000):,.0f} bytes")
+    for callbacks in (True, False):
+        packageHeld, totalHeld = measure_held_size(10_000, callbacks)
+        print(
+            f"Shown toast {'with' if callbacks else 'without'} callbacks: {packageHeld:,.0f} bytes held by the toaster, "
+            f"{totalHeld:,.0f} bytes including the notifier"
+        )
+
+    toaster = InteractableWindowsToaster("Benchmark")
+    notifier = InMemoryToastNotifier().attach(toaster)
+    displayTime = datetime.now() + timedelta(days=1)
+    # Fire-and-forget toasts are never dismissed or removed; like the action center, this notifier drops the oldest
+    showOnlyToaster = InteractableWindowsToaster("Benchmark")
+    SimulatedToastNotifier().attach(showOnlyToaster)
+
+    def show_only(i: int) -> None:
+        showOnlyToaster.show_toast(build_toast(i, False))
+
+    def show_dismiss(i: int) -> None:
+        toast = build_toast(i)
+        toaster.show_toast(toast)
+        notifier.dismiss(toast.tag)
+
+    def show_update_remove(i: int) -> None:
+        toastHandle = toaster.show_toast(build_toast(i))
+        toastHandle.update([f"Message {i}", "Edited"])
+        toastHandle.remove()
+
+    def schedule_unschedule(i: int) -> None:
+        toast = build_toast(i)
+        toaster.schedule_toast(toast, displayTime)
+        toaster.unschedule_toast(toast)
+
+    failures = []
+    for cycle in (show_only, show_dismiss, show_update_remove, schedule_unschedule):
+        memoryUsage, elapsed, typeGrowth = measure_cycles(cycle, cycles, samples, cycle is show_only)
+        retainedGrowth = memoryUsage[-1] - memoryUsage[0]
+        print(f"\n{cycle.__name__}: {cycles:,} cycles in {elapsed:.2f}s ({cycles / elapsed:,.0f}/s)")
+        print("Memory above baseline (KiB): " + ", ".join(f"{usage / 1024:.1f}" for usage in memoryUsage))
+        print(f"Retained growth: {retainedGrowth / 1024:.1f} KiB")
+        for typeName, countGrowth, sizeGrowth in typeGrowth:
+            print(f"    {typeName}: +{countGrowth:,} objects, {sizeGrowth / 1024:+.1f} KiB")
+
+        # Allow for allocator noise, but not for anything kept per toast
+        if retainedGrowth > maxGrowth:
+            failures.append(cycle.__name__)
+
+    for checkedToaster in (toaster, showOnlyToaster):
+        assert checkedToaster.liveToasts.liveCount == 0, "Toasts were not released"
+        assert len(checkedToaster.sequenceAllocator) == 0, "Sequence numbers were not forgotten"
+    assert not failures, f"Memory grows with the number of toasts in {', '.join(failures)}"
+
+
+if __name__ == "__main__":
+    run()
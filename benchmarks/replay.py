@@ -0,0 +1,33 @@
+"""
+Replay a traffic recording made with TrafficRecorder against an InMemoryToastNotifier, and report how the toaster
+copes: throughput, latency percentiles per operation, and how far the queue fell behind the recorded times.
+Run with ``python benchmarks/replay.py traffic.wtr --speed 10`` after installing the package
+"""
+
+import argparse
+
+from windows_toasts import InMemoryToastNotifier, InteractableWindowsToaster
+from windows_toasts.recording import replay_traffic
+
+
+def run(path: str, speed: float = 1.0, workers: int = 1) -> None:
+    toaster = InteractableWindowsToaster("Benchmark")
+    notifier = InMemoryToastNotifier().attach(toaster)
+    report = replay_traffic(path, toaster, speed, workers)
+
+    print(f"{report.operations:,} operations at {speed:g}x in {report.elapsed:.2f}s ({report.throughput:,.0f}/s)")
+    for operation, percentiles in sorted(report.latencies.items()):
+        latencies = ", ".join(f"p{percentile} {latency * 1000:.2f}ms" for percentile, latency in percentiles.items())
+        errors = report.errors.get(operation, 0)
+        print(f"    {operation}: {latencies}" + (f", {errors:,} errors" if errors else ""))
+    print(f"Queue: {report.maxQueueDepth:,} deep at most, lagging {report.meanLag * 1000:.2f}ms on average")
+    print(f"Lagging at most {report.maxLag * 1000:.2f}ms, {len(notifier):,} toasts left in the notifier")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="Recording to replay")
+    parser.add_argument("--speed", type=float, default=1.0, help="How much faster than recorded to replay")
+    parser.add_argument("--workers", type=int, default=1, help="Number of threads applying the operations")
+    arguments = parser.parse_args()
+    run(arguments.path, arguments.speed, arguments.workers)
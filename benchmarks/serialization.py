@@ -0,0 +1,68 @@
+"""
+Encode/decode throughput of the toast serialization formats, compared to pickle.
+Run with ``python benchmarks/serialization.py`` after installing the package
+"""
+
+import pickle
+import timeit
+
+from windows_toasts import (
+    AudioSource,
+    Toast,
+    ToastAudio,
+    ToastButton,
+    ToastInputTextBox,
+    ToastProgressBar,
+    ToastScenario,
+    handler_registry,
+)
+from windows_toasts.serialization import dumps_binary, dumps_json, loads_binary, loads_json
+
+
+@handler_registry.register("benchmark.activated")
+def on_activated(_):
+    pass
+
+
+def build_toast() -> Toast:
+    replyBox = ToastInputTextBox("reply", "Reply:", "Type a message")
+    return Toast(
+        ["New message from Alice", "Are we still on for lunch tomorrow?"],
+        audio=ToastAudio(AudioSource.IM),
+        group="messages",
+        progress_bar=ToastProgressBar("Uploading...", "holiday.jpg", 0.42),
+        scenario=ToastScenario.Reminder,
+        on_activated=on_activated,
+        inputs=[replyBox],
+        actions=[ToastButton("Send", "action=send", relatedInput=replyBox), ToastButton("Mute", "action=mute")],
+    )
+
+
+def run(number: int = 20000) -> None:
+    toast = build_toast()
+    # Pickle cannot handle lambdas, so compare against the dictionary form, which is what pickle users end up with
+    toastDict = toast.to_dict()
+
+    jsonPayload = dumps_json(toast)
+    binaryPayload = dumps_binary(toast)
+    picklePayload = pickle.dumps(toastDict, pickle.HIGHEST_PROTOCOL)
+
+    cases = {
+        "to_dict": lambda: toast.to_dict(),
+        "from_dict": lambda: Toast.from_dict(toastDict),
+        "dumps_json": lambda: dumps_json(toast),
+        "loads_json": lambda: loads_json(jsonPayload),
+        "dumps_binary": lambda: dumps_binary(toast),
+        "loads_binary": lambda: loads_binary(binaryPayload),
+        "pickle.dumps(dict)": lambda: pickle.dumps(toast.to_dict(), pickle.HIGHEST_PROTOCOL),
+        "pickle.loads(dict)": lambda: Toast.from_dict(pickle.loads(picklePayload)),
+    }
+
+    print(f"Payload sizes: json={len(jsonPayload.encode())}B binary={len(binaryPayload)}B pickle={len(picklePayload)}B")
+    for name, case in cases.items():
+        elapsed = min(timeit.repeat(case, number=number, repeat=3))
+        print(f"{name:>20}: {number / elapsed:>10,.0f} ops/s ({elapsed / number * 1e6:.2f} us/op)")
+
+
+if __name__ == "__main__":
+    run()
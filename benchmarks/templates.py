@@ -0,0 +1,52 @@
+"""
+Benchmark of rendering toasts from records with a precompiled template, compared to formatting each toast by hand.
+Run with ``python benchmarks/templates.py`` after installing the package
+"""
+
+import gc
+import time
+
+from windows_toasts import Toast, ToastButton, ToastProgressBar, ToastTemplate
+
+
+def run(records: int = 50_000) -> None:
+    rows = [
+        {"sender": f"User {i}", "message": f"Message number {i}", "unread": i % 100, "ratio": (i % 100) / 100}
+        for i in range(records)
+    ]
+
+    def by_hand() -> list:
+        return [
+            Toast(
+                [row["sender"], f"{row['message']:.80}"],
+                group="messages",
+                progress_bar=ToastProgressBar(f"{row['unread']} unread", progress=row["ratio"]),
+                actions=[ToastButton("Reply", "reply")],
+            )
+            for row in rows
+        ]
+
+    template = ToastTemplate(
+        ["{sender}", "{message:.80}"],
+        status="{unread} unread",
+        progress="ratio",
+        toast=Toast(group="messages", actions=[ToastButton("Reply", "reply")]),
+    )
+
+    for name, render in (("By hand", by_hand), ("Template", lambda: template.render_many(rows))):
+        # Start each run from a clean heap, so that one run's toasts do not slow the next run's garbage collection
+        gc.collect()
+        startTime = time.perf_counter()
+        renderedCount = len(render())
+        elapsed = time.perf_counter() - startTime
+        print(f"{name:>8}: {renderedCount:,} toasts in {elapsed:.3f}s ({renderedCount / elapsed:,.0f}/s)")
+
+    startTime = time.perf_counter()
+    for row in rows:
+        template.render_values(row)
+    elapsed = time.perf_counter() - startTime
+    print(f"  Values: {records:,} updates in {elapsed:.3f}s ({records / elapsed:,.0f}/s)")
+
+
+if __name__ == "__main__":
+    run()
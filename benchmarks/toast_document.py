@@ -0,0 +1,47 @@
+"""
+Benchmark of building the XML of wide toasts, with many text fields, images, inputs and actions.
+Run with ``python benchmarks/toast_document.py`` after installing the package
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+from windows_toasts import (
+    AudioSource,
+    InteractableWindowsToaster,
+    Toast,
+    ToastAudio,
+    ToastButton,
+    ToastDisplayImage,
+    ToastImage,
+    ToastInputTextBox,
+    ToastProgressBar,
+)
+
+
+def run(toasts: int = 2_000, textFields: int = 30, actions: int = 3) -> None:
+    toaster = InteractableWindowsToaster("Benchmark")
+    # Images only have to exist, they are not read
+    imagePath = Path(tempfile.mkdtemp()) / "image.png"
+    imagePath.touch()
+    wideToast = Toast(
+        [f"Field {i}" for i in range(textFields)],
+        attribution_text="Via Benchmark",
+        audio=ToastAudio(AudioSource.IM),
+        images=[ToastDisplayImage(ToastImage(imagePath)), ToastDisplayImage(ToastImage(imagePath))],
+        inputs=[ToastInputTextBox("reply", "Reply"), ToastInputTextBox("note", "Note")],
+        actions=[ToastButton(f"Action {i}", f"action={i}") for i in range(actions)],
+        progress_bar=ToastProgressBar("Working..."),
+    )
+
+    for name, dynamic in (("Dynamic", True), ("Static", False)):
+        startTime = time.perf_counter()
+        for _ in range(toasts):
+            toaster._setup_toast(wideToast, dynamic)
+        elapsed = time.perf_counter() - startTime
+        print(f"{name:>7}: {toasts:,} documents in {elapsed:.3f}s ({toasts / elapsed:,.0f}/s)")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,273 @@
+"""
+Minimal pure-Python stand-in for the parts of the WinRT projection windows_toasts imports, so that the benchmarks can
+run where winrt has no wheels, e.g. on Linux. XML is built with :mod:`xml.dom.minidom` and notifications go nowhere;
+pair it with an InMemoryToastNotifier. Absolute numbers differ from the real projection, but what the package itself
+allocates and retains does not
+"""
+
+import enum
+import itertools
+import sys
+import types
+from xml.dom import minidom
+
+
+class _XmlAttribute:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+class _XmlAttributeReference:
+    def __init__(self, element: "XmlElement", name: str) -> None:
+        self._element = element
+        self._name = name
+
+    @property
+    def inner_text(self) -> str:
+        return self._element._node.getAttribute(self._name)
+
+    @inner_text.setter
+    def inner_text(self, value: str) -> None:
+        self._element._node.setAttribute(self._name, value)
+
+
+class _XmlAttributeMap:
+    def __init__(self, element: "XmlElement") -> None:
+        self._element = element
+
+    def set_named_item(self, attribute: _XmlAttribute) -> None:
+        self._element._node.setAttribute(attribute.name, "")
+
+    def get_named_item(self, name: str):
+        if not self._element._node.hasAttribute(name):
+            return None
+
+        return _XmlAttributeReference(self._element, name)
+
+
+class XmlElement:
+    def __init__(self, node) -> None:
+        self._node = node
+
+    @property
+    def attributes(self) -> _XmlAttributeMap:
+        return _XmlAttributeMap(self)
+
+    def append_child(self, child: "XmlElement") -> "XmlElement":
+        self._node.appendChild(child._node)
+        return child
+
+    def clone_node(self, deep: bool) -> "XmlElement":
+        return XmlElement(self._node.cloneNode(deep))
+
+    def set_attribute(self, name: str, value: str) -> None:
+        self._node.setAttribute(name, value)
+
+    def get_attribute(self, name: str) -> str:
+        return self._node.getAttribute(name)
+
+
+class _XmlNodeList:
+    def __init__(self, nodes) -> None:
+        self._nodes = nodes
+
+    @property
+    def length(self) -> int:
+        return len(self._nodes)
+
+    def item(self, index: int):
+        return XmlElement(self._nodes[index]) if index < len(self._nodes) else None
+
+
+class XmlDocument:
+    def __init__(self) -> None:
+        self._document = None
+
+    def load_xml(self, xml: str) -> None:
+        self._document = minidom.parseString(xml)
+
+    def get_elements_by_tag_name(self, name: str) -> _XmlNodeList:
+        return _XmlNodeList(self._document.getElementsByTagName(name))
+
+    def create_element(self, name: str) -> XmlElement:
+        return XmlElement(self._document.createElement(name))
+
+    def create_attribute(self, name: str) -> _XmlAttribute:
+        return _XmlAttribute(name)
+
+    def create_text_node(self, text: str) -> XmlElement:
+        return XmlElement(self._document.createTextNode(text))
+
+    def get_xml(self) -> str:
+        return self._document.documentElement.toxml()
+
+
+class _NotificationValues(dict):
+    def insert(self, key: str, value: str) -> bool:
+        self[key] = value
+        return False
+
+
+class NotificationData:
+    def __init__(self) -> None:
+        self.values = _NotificationValues()
+        self.sequence_number = 0
+
+
+class NotificationUpdateResult(enum.IntEnum):
+    SUCCEEDED = 0
+    FAILED = 1
+    NOTIFICATION_NOT_FOUND = 2
+
+
+class ToastDismissalReason(enum.IntEnum):
+    USER_CANCELED = 0
+    APPLICATION_HIDDEN = 1
+    TIMED_OUT = 2
+
+
+_eventTokens = itertools.count(1)
+
+
+class ToastNotification:
+    def __init__(self, content: XmlDocument) -> None:
+        self.content = content
+        self.tag = ""
+        self.group = ""
+        self.expiration_time = None
+        self.suppress_popup = False
+        self.data = None
+        self._handlers = {}
+
+    def _add_handler(self, handler) -> int:
+        token = next(_eventTokens)
+        self._handlers[token] = handler
+        return token
+
+    def _remove_handler(self, token: int) -> None:
+        self._handlers.pop(token, None)
+
+    add_activated = add_dismissed = add_failed = _add_handler
+    remove_activated = remove_dismissed = remove_failed = _remove_handler
+
+
+class ScheduledToastNotification(ToastNotification):
+    def __init__(self, content: XmlDocument, deliveryTime) -> None:
+        super().__init__(content)
+        self.delivery_time = deliveryTime
+
+
+class ToastActivatedEventArgs:
+    arguments = ""
+    user_input: dict = {}
+
+
+class ToastDismissedEventArgs:
+    reason = ToastDismissalReason.USER_CANCELED
+
+
+class ToastFailedEventArgs:
+    error_code = 0
+
+
+class ToastNotifier:
+    def __init__(self) -> None:
+        self._scheduled = []
+
+    def show(self, notification: ToastNotification) -> None:
+        pass
+
+    def hide(self, notification: ToastNotification) -> None:
+        pass
+
+    def update_with_tag_and_group(self, data: NotificationData, tag: str, group: str) -> NotificationUpdateResult:
+        return NotificationUpdateResult.SUCCEEDED
+
+    def add_to_schedule(self, notification: ScheduledToastNotification) -> None:
+        self._scheduled.append(notification)
+
+    def remove_from_schedule(self, notification: ScheduledToastNotification) -> None:
+        self._scheduled.remove(notification)
+
+    def get_scheduled_toast_notifications(self) -> list:
+        return list(self._scheduled)
+
+
+class ToastNotificationHistory:
+    def clear(self) -> None:
+        pass
+
+    def clear_with_id(self, aumid: str) -> None:
+        pass
+
+    def remove_grouped_tag_with_id(self, tag: str, group: str, aumid: str) -> None:
+        pass
+
+    def remove_group_with_id(self, group: str, aumid: str) -> None:
+        pass
+
+    def get_history_with_id(self, aumid: str) -> list:
+        return []
+
+
+class ToastNotificationManager:
+    history = ToastNotificationHistory()
+
+    @staticmethod
+    def create_toast_notifier() -> ToastNotifier:
+        return ToastNotifier()
+
+    @staticmethod
+    def create_toast_notifier_with_id(aumid: str) -> ToastNotifier:
+        return ToastNotifier()
+
+
+class Object:
+    def as_(self, _):
+        return self
+
+
+def unbox_string(value):
+    return value
+
+
+def install() -> None:
+    """
+    Register the stand-in as the winrt modules windows_toasts imports. Call it before importing windows_toasts
+    """
+    modules = {
+        name: types.ModuleType(name)
+        for name in (
+            "winrt",
+            "winrt.system",
+            "winrt.windows",
+            "winrt.windows.data",
+            "winrt.windows.data.xml",
+            "winrt.windows.data.xml.dom",
+            "winrt.windows.ui",
+            "winrt.windows.ui.notifications",
+        )
+    }
+    for name, module in modules.items():
+        parentName, _, childName = name.rpartition(".")
+        if parentName:
+            setattr(modules[parentName], childName, module)
+
+    modules["winrt.system"].__dict__.update(Object=Object, unbox_string=unbox_string)
+    modules["winrt.windows.data.xml.dom"].__dict__.update(
+        IXmlNode=XmlElement, XmlDocument=XmlDocument, XmlElement=XmlElement
+    )
+    modules["winrt.windows.ui.notifications"].__dict__.update(
+        NotificationData=NotificationData,
+        NotificationUpdateResult=NotificationUpdateResult,
+        ScheduledToastNotification=ScheduledToastNotification,
+        ToastActivatedEventArgs=ToastActivatedEventArgs,
+        ToastDismissalReason=ToastDismissalReason,
+        ToastDismissedEventArgs=ToastDismissedEventArgs,
+        ToastFailedEventArgs=ToastFailedEventArgs,
+        ToastNotification=ToastNotification,
+        ToastNotificationHistory=ToastNotificationHistory,
+        ToastNotificationManager=ToastNotificationManager,
+        ToastNotifier=ToastNotifier,
+    )
+    sys.modules.update(modules)
@@ -33,6 +33,7 @@ setup(
     entry_points={"console_scripts": ["register_hkey_aumid = scripts.register_hkey_aumid:main"]},
     python_requires=">=3.9",
     install_requires=requires,
+    extras_require={"images": ["Pillow>=9.1"]},
     license_files=["LICENSE"],
     zip_safe=False,
     classifiers=[
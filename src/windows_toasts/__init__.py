@@ -10,11 +10,34 @@ if platform.system() == "Windows" and (osVersion := int(platform.version().split
     )
 
 from ._version import __author__, __description__, __license__, __title__, __url__, __version__  # noqa: F401
-from .events import ToastActivatedEventArgs, ToastDismissalReason, ToastDismissedEventArgs, ToastFailedEventArgs
-from .exceptions import InvalidImageException, ToastNotFoundError
+from .activation import ToastActivationDispatcher
+from .broadcast import BroadcastResult, ToastBroadcast, ToastBroadcaster
+from .daemon import ToastDaemon, ToastDaemonClient
+from .events import (
+    ToastActivatedEventArgs,
+    ToastDismissalReason,
+    ToastDismissedEventArgs,
+    ToastDismissedEventData,
+    ToastFailedEventArgs,
+    ToastFailedEventData,
+)
+from .exceptions import InvalidImageException, ToastNotFoundError, ToastSerializationError
+from .handle import ToastHandle
+from .history import ToastHistoryEntry, ToastHistoryIndex
+from .images import ToastImageCache, ToastImageFetcher
+from .notifiers import InMemoryToastHistory, InMemoryToastNotifier, SimulatedToastNotifier
+from .progress import ToastProgressAggregator, ToastProgressGroup
+from .recording import ReplayReport, TrafficRecord, TrafficRecorder
+from .registry import LiveToastEntry, LiveToastRegistry
+from .reminders import ReminderEngine
+from .retry import ToastRetryPolicy
+from .scheduling import ScheduleOverflowManager
+from .serialization import ToastHandlerRegistry, handler_registry
+from .slowlog import SlowOperationLog, SlowOperationRecord
+from .templates import ToastTemplate
 from .toast import Toast
 from .toast_audio import AudioSource, ToastAudio
-from .toasters import InteractableWindowsToaster, WindowsToaster
+from .toasters import BulkRemovalResult, CompiledToast, InteractableWindowsToaster, ToasterObserver, WindowsToaster
 from .wrappers import (
     ToastButton,
     ToastButtonColour,
@@ -39,22 +62,73 @@ __all__ = [
     "__title__",
     "__url__",
     "__version__",
+    # activation.py
+    "ToastActivationDispatcher",
+    # broadcast.py
+    "BroadcastResult",
+    "ToastBroadcast",
+    "ToastBroadcaster",
+    # daemon.py
+    "ToastDaemon",
+    "ToastDaemonClient",
     # events.py
     "ToastActivatedEventArgs",
     "ToastDismissalReason",
     "ToastDismissedEventArgs",
+    "ToastDismissedEventData",
     "ToastFailedEventArgs",
+    "ToastFailedEventData",
     # exceptions.py
     "InvalidImageException",
     "ToastNotFoundError",
+    "ToastSerializationError",
     "UnsupportedOSVersionException",
+    # handle.py
+    "ToastHandle",
+    # history.py
+    "ToastHistoryEntry",
+    "ToastHistoryIndex",
+    # images.py
+    "ToastImageCache",
+    "ToastImageFetcher",
+    # notifiers.py
+    "InMemoryToastHistory",
+    "InMemoryToastNotifier",
+    "SimulatedToastNotifier",
+    # progress.py
+    "ToastProgressAggregator",
+    "ToastProgressGroup",
+    # recording.py
+    "ReplayReport",
+    "TrafficRecord",
+    "TrafficRecorder",
+    # registry.py
+    "LiveToastEntry",
+    "LiveToastRegistry",
+    # reminders.py
+    "ReminderEngine",
+    # retry.py
+    "ToastRetryPolicy",
+    # scheduling.py
+    "ScheduleOverflowManager",
+    # serialization.py
+    "ToastHandlerRegistry",
+    "handler_registry",
+    # slowlog.py
+    "SlowOperationLog",
+    "SlowOperationRecord",
+    # templates.py
+    "ToastTemplate",
     # toast_audio.py
     "AudioSource",
     "ToastAudio",
     # toast.py
     "Toast",
     # toasters.py
+    "BulkRemovalResult",
+    "CompiledToast",
     "InteractableWindowsToaster",
+    "ToasterObserver",
     "WindowsToaster",
     # wrappers.py
     "ToastButton",
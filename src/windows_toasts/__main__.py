@@ -0,0 +1,194 @@
+"""
+Show toasts described as newline-delimited JSON, so that scripts can send many toasts through a single interpreter.
+
+Each line is a toast in the format of :func:`~windows_toasts.serialization.toast_to_dict`, with an optional ``op``:
+
+* ``{"text_fields": ["Deploying"], "tag": "deploy", "progress_bar": {"status": "Starting", "progress": 0}}``
+  shows a toast (``"op": "show"`` is the default)
+* ``{"op": "update", "tag": "deploy", "progress_bar": {"status": "Copying", "progress": 0.5}}`` updates the text
+  fields and progress bar of a toast by its tag
+* ``{"op": "remove", "tag": "deploy"}`` removes a toast, and ``{"op": "clear"}`` removes all of them
+
+A JSON result is printed for every line, e.g. ``{"line": 1, "ok": true, "tag": "deploy"}``
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import queue
+import sys
+import threading
+from typing import IO, Dict, Iterator, List, Optional
+
+from .serialization import progress_bar_from_dict, toast_from_dict
+from .toast import Toast
+from .toasters import BaseWindowsToaster, InteractableWindowsToaster, WindowsToaster
+
+
+class ToastLineProcessor:
+    """
+    Applies JSON toast lines to a toaster, remembering the toasts it has shown with an explicit tag or a progress bar
+    so that they can be updated by tag. Others can still be updated by the tag reported for them, but only through
+    their text fields and progress bar, so they are not kept around on long streams
+
+    :param toaster: Toaster to show the toasts through
+    """
+
+    toaster: BaseWindowsToaster
+
+    def __init__(self, toaster: BaseWindowsToaster) -> None:
+        self.toaster = toaster
+        self._toasts: Dict[str, Toast] = {}
+
+    def process(self, lineNumber: int, line: str) -> dict:
+        """
+        Apply a single line
+
+        :return: The result to report for the line
+        """
+        try:
+            spec = json.loads(line)
+            if not isinstance(spec, dict):
+                raise ValueError("Each line must be a JSON object")
+
+            operation = spec.pop("op", "show")
+            if operation == "show":
+                toast = toast_from_dict(spec)
+                self.toaster.show_toast(toast)
+                if "tag" in spec or toast.progress_bar is not None:
+                    self._toasts[toast.tag] = toast
+                return {"line": lineNumber, "ok": True, "tag": toast.tag}
+            elif operation == "update":
+                return {"line": lineNumber, "ok": self._update(spec), "tag": spec["tag"]}
+            elif operation == "remove":
+                toast = self._toasts.pop(spec["tag"], None) or self._toast_by_tag(spec["tag"], spec.get("group"))
+                self.toaster.remove_toast(toast)
+                return {"line": lineNumber, "ok": True, "tag": toast.tag}
+            elif operation == "clear":
+                self.toaster.clear_toasts()
+                self._toasts.clear()
+                return {"line": lineNumber, "ok": True}
+
+            raise ValueError(f"Unknown op '{operation}'")
+        except Exception as e:
+            return {"line": lineNumber, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    def _update(self, spec: dict) -> bool:
+        tag = spec["tag"]
+        toast = self._toasts.get(tag)
+        if toast is None:
+            # Not kept, or shown by a previous run, so the sequence number starts again from the one supplied. Toasts
+            # are shown with sequence number 1, which the update has to be newer than
+            toast = self._toast_by_tag(tag, spec.get("group"))
+            toast.updates = spec.get("updates", 1)
+            self._toasts[tag] = toast
+
+        if "text_fields" in spec:
+            toast.text_fields = spec["text_fields"]
+        if "progress_bar" in spec:
+            toast.progress_bar = progress_bar_from_dict(spec["progress_bar"])
+
+        return self.toaster.update_toast(toast)
+
+    @staticmethod
+    def _toast_by_tag(tag: str, group: Optional[str]) -> Toast:
+        toast = Toast(group=group)
+        toast.tag = tag
+        return toast
+
+
+def _read_batches(stream: IO[str], batchSize: int) -> Iterator[List[str]]:
+    """
+    Yield lines in batches of whatever has arrived, up to batchSize, so that a slow producer isn't held up
+    """
+    lines: queue.SimpleQueue[Optional[str]] = queue.SimpleQueue()
+
+    def reader() -> None:
+        for line in stream:
+            lines.put(line)
+        lines.put(None)
+
+    threading.Thread(target=reader, name="ToastLineReader", daemon=True).start()
+
+    while True:
+        line = lines.get()
+        if line is None:
+            return
+
+        batch = [line]
+        while len(batch) < batchSize:
+            try:
+                line = lines.get_nowait()
+            except queue.Empty:
+                break
+
+            if line is None:
+                yield batch
+                return
+
+            batch.append(line)
+
+        yield batch
+
+
+def run(inputStream: IO[str], outputStream: IO[str], toaster: BaseWindowsToaster, batchSize: int = 64) -> int:
+    """
+    Process every line of inputStream, writing a JSON result per line to outputStream
+
+    :return: Number of lines that failed
+    """
+    processor = ToastLineProcessor(toaster)
+    failures = lineNumber = 0
+    for batch in _read_batches(inputStream, batchSize):
+        results = []
+        for line in batch:
+            lineNumber += 1
+            if not line.strip():
+                continue
+
+            result = processor.process(lineNumber, line)
+            failures += not result["ok"]
+            results.append(json.dumps(result, separators=(",", ":")))
+
+        if results:
+            outputStream.write("\n".join(results) + "\n")
+            outputStream.flush()
+
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m windows_toasts", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("file", nargs="?", default="-", help="File to read toast lines from. Defaults to stdin")
+    parser.add_argument("--app-text", default="Python", help="Text to display the application as")
+    parser.add_argument("--aumid", default=None, help="AUMID to show toasts under. Defaults to Command Prompt")
+    parser.add_argument("--basic", action="store_true", help="Use WindowsToaster instead of InteractableWindowsToaster")
+    parser.add_argument("--batch-size", type=int, default=64, help="Maximum lines to process before flushing output")
+    parser.add_argument(
+        "--in-memory", action="store_true", help="Keep toasts in memory instead of displaying them, for testing"
+    )
+    args = parser.parse_args(argv)
+
+    toaster: BaseWindowsToaster
+    if args.basic:
+        toaster = WindowsToaster(args.app_text)
+    else:
+        toaster = InteractableWindowsToaster(args.app_text, args.aumid)
+
+    if args.in_memory:
+        from .notifiers import InMemoryToastNotifier
+
+        InMemoryToastNotifier().attach(toaster)
+
+    if args.file == "-":
+        failures = run(sys.stdin, sys.stdout, toaster, args.batch_size)
+    else:
+        with open(args.file, "r", encoding="utf-8") as inputFile:
+            failures = run(inputFile, sys.stdout, toaster, args.batch_size)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
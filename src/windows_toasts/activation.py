@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import heapq
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from .events import ToastActivatedEventArgs
+from .registry import DEFAULT_LIFETIME
+from .toast import Toast
+from .wrappers import ToastButton
+
+ActivationHandler = Callable[[ToastActivatedEventArgs], None]
+
+
+class ToastActivationDispatcher:
+    """
+    Routes toast activations to handlers through a single index, by tag or by arguments, rather than through callbacks
+    registered per toast. Toasts without callbacks have no handlers for Windows to call, and neither do scheduled
+    toasts, so their activations reach the app through its launch instead, e.g. a toast shown by an earlier run
+    launching it. The app must pass those to :meth:`dispatch` from its launch handler. Set the dispatcher as a toaster's
+    :attr:`~windows_toasts.toasters.BaseWindowsToaster.activationDispatcher` so that the on_activated of its scheduled
+    toasts are registered with it
+
+    The dispatcher does not replace the handlers added to each toast with callbacks, or shown with a retry policy,
+    since WinRT has no activation event to register once for the whole app. Nor does the package receive the app's
+    launch: hooking it up, e.g. through protocol activation, is up to the app
+
+    Handlers are looked up by, in order:
+
+    * The tag of the toast. A toast clicked on its body is activated with its tag as arguments, unless it has a
+      launch action
+    * The exact arguments, e.g. those of a button
+    * The ``action`` key of arguments in query string form, e.g. ``reply`` for ``action=reply&id=42``
+
+    :param defaultLifetime: Seconds to keep the handlers of a scheduled toast for after its display time, if it has no
+        expiration time and is never activated
+    """
+
+    defaultLifetime: float
+    dispatchedCount: int
+    """Number of activations dispatched to a handler"""
+    unhandledCount: int
+    """Number of activations no handler was found for"""
+
+    def __init__(self, defaultLifetime: float = DEFAULT_LIFETIME) -> None:
+        self.defaultLifetime = defaultLifetime
+        self.dispatchedCount = 0
+        self.unhandledCount = 0
+        self._lock = threading.Lock()
+        self._byTag: Dict[str, ActivationHandler] = {}
+        self._byArguments: Dict[str, ActivationHandler] = {}
+        self._byAction: Dict[str, ActivationHandler] = {}
+        # Button arguments indexed for each toast registered with register_toast, and when to forget the toast
+        self._toastArguments: Dict[str, List[str]] = {}
+        self._argumentTags: Dict[str, str] = {}
+        self._toastExpiries: Dict[str, float] = {}
+        self._expiries: List[Tuple[float, str]] = []
+
+    def register_tag(self, tag: str, handler: ActivationHandler) -> None:
+        """
+        Call a handler when the toast with a tag is activated, until it is unregistered
+        """
+        with self._lock:
+            self._byTag[tag] = handler
+
+    def unregister_tag(self, tag: str) -> bool:
+        """
+        Stop routing the activations of a tag, including the button arguments of a toast registered with
+        :meth:`register_toast`
+
+        :return: Whether a handler was registered
+        """
+        with self._lock:
+            return self._forget_tag(tag)
+
+    def register_arguments(self, arguments: str, handler: ActivationHandler) -> None:
+        """
+        Call a handler for activations with exactly these arguments, e.g. those of a
+        :class:`~windows_toasts.wrappers.ToastButton`
+        """
+        with self._lock:
+            self._byArguments[arguments] = handler
+
+    def unregister_arguments(self, arguments: str) -> bool:
+        """
+        :return: Whether a handler was registered
+        """
+        with self._lock:
+            return self._byArguments.pop(arguments, None) is not None
+
+    def register_action(self, action: str, handler: ActivationHandler) -> None:
+        """
+        Call a handler for activations whose arguments have this ``action``, e.g. ``action=reply&id=42`` for "reply"
+        """
+        with self._lock:
+            self._byAction[action] = handler
+
+    def unregister_action(self, action: str) -> bool:
+        """
+        :return: Whether a handler was registered
+        """
+        with self._lock:
+            return self._byAction.pop(action, None) is not None
+
+    def register_toast(self, toast: Toast, displayTime: Optional[datetime] = None) -> bool:
+        """
+        Route the activations of a toast, by its tag and the arguments of its buttons, to its on_activated.
+        The registration ends once it is activated, or once it expires. Button arguments should identify the toast,
+        since each is routed to the toast registered with it last
+
+        :param toast: Toast to register
+        :param displayTime: When the toast is displayed, if it is scheduled. Defaults to now
+        :return: Whether the toast had an on_activated to register
+        """
+        if toast.on_activated is None:
+            return False
+
+        displayTimestamp = time.time() if displayTime is None else displayTime.timestamp()
+        expiresAt = displayTimestamp + self.defaultLifetime
+        if toast.expiration_time is not None:
+            expiresAt = toast.expiration_time.timestamp()
+
+        buttonArguments = [
+            action.arguments for action in toast.actions if isinstance(action, ToastButton) and action.arguments
+        ]
+        with self._lock:
+            self._sweep(time.time())
+            self._forget_tag(toast.tag)
+            self._byTag[toast.tag] = toast.on_activated
+            for arguments in buttonArguments:
+                self._byArguments[arguments] = toast.on_activated
+                self._argumentTags[arguments] = toast.tag
+
+            self._toastArguments[toast.tag] = buttonArguments
+            self._toastExpiries[toast.tag] = expiresAt
+            heapq.heappush(self._expiries, (expiresAt, toast.tag))
+
+        return True
+
+    def dispatch(self, arguments: Optional[str], inputs: Optional[dict] = None, tag: Optional[str] = None) -> bool:
+        """
+        Call the handler of an activation
+
+        :param arguments: Arguments the toast was activated with
+        :param inputs: Values of the toast's inputs
+        :param tag: Tag of the toast, if known. Otherwise the arguments are looked up as a tag
+        :return: Whether a handler was found
+        """
+        with self._lock:
+            handler, handlerTag = self._resolve(arguments, tag)
+            if handler is None:
+                self.unhandledCount += 1
+                return False
+
+            self.dispatchedCount += 1
+            if handlerTag in self._toastArguments:
+                # A registered toast is gone from the action center once activated
+                self._forget_tag(handlerTag)
+
+        # Called outside the lock, so that handlers can register or show toasts themselves
+        handler(ToastActivatedEventArgs(arguments, inputs))
+        return True
+
+    def __len__(self) -> int:
+        return len(self._byTag) + len(self._byArguments) + len(self._byAction)
+
+    def _resolve(self, arguments: Optional[str], tag: Optional[str]) -> Tuple[Optional[ActivationHandler], str]:
+        for candidateTag in (tag, arguments):
+            if candidateTag is not None and candidateTag in self._byTag:
+                return self._byTag[candidateTag], candidateTag
+
+        if arguments is None:
+            return None, ""
+
+        handler = self._byArguments.get(arguments)
+        if handler is not None:
+            # Button arguments of a registered toast end its registration like its tag does
+            return handler, self._argumentTags.get(arguments, "")
+
+        if "action=" in arguments:
+            for key, value in parse_qsl(arguments):
+                if key == "action" and value in self._byAction:
+                    return self._byAction[value], ""
+
+        return None, ""
+
+    def _forget_toast(self, tag: str) -> None:
+        # Called by the toaster when a toast is unscheduled or removed. Handlers registered for the tag are kept
+        with self._lock:
+            if tag in self._toastArguments:
+                self._forget_tag(tag)
+
+    def _forget_tag(self, tag: str) -> bool:
+        # Called with the lock held
+        handler = self._byTag.pop(tag, None)
+        for arguments in self._toastArguments.pop(tag, ()):
+            if self._argumentTags.get(arguments) == tag:
+                del self._argumentTags[arguments]
+                del self._byArguments[arguments]
+
+        self._toastExpiries.pop(tag, None)
+        return handler is not None
+
+    def _sweep(self, now: float) -> None:
+        # Called with the lock held. Forgets a bounded number of expired toasts per registration
+        for _ in range(8):
+            if not self._expiries or self._expiries[0][0] > now:
+                return
+
+            expiresAt, tag = heapq.heappop(self._expiries)
+            # Skip toasts that were already forgotten or registered again since
+            if self._toastExpiries.get(tag) == expiresAt:
+                self._forget_tag(tag)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from winrt.windows.data.xml.dom import XmlDocument
+from winrt.windows.ui.notifications import ToastNotification
+
+from .handle import ToastHandle
+from .toast import Toast
+from .toasters import BaseWindowsToaster, _build_binding_values, _build_toast_notification
+
+
+@dataclass
+class BroadcastResult:
+    """
+    Outcome of showing, updating or removing a toast through one of a broadcaster's toasters
+    """
+
+    toaster: BaseWindowsToaster
+    """The toaster"""
+    handle: Optional[ToastHandle] = None
+    """Handle of the toast shown, if it was"""
+    succeeded: bool = True
+    """Whether the operation succeeded"""
+    error: Optional[Exception] = None
+    """The error the operation raised, if any"""
+
+
+class ToastBroadcast:
+    """
+    A toast shown through every toaster of a :class:`ToastBroadcaster`, returned by :meth:`ToastBroadcaster.show_toast`
+    """
+
+    tag: str
+    """Tag of the toast, the same for every toaster"""
+    group: str
+    """Group of the toast, the same for every toaster"""
+    results: List[BroadcastResult]
+    """Result of showing the toast, per toaster"""
+
+    def __init__(self, tag: str, group: str, results: List[BroadcastResult]) -> None:
+        self.tag = tag
+        self.group = group
+        self.results = results
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether the toast was shown through every toaster"""
+        return all(result.succeeded for result in self.results)
+
+    @property
+    def handles(self) -> List[ToastHandle]:
+        """Handles of the toasts that were shown"""
+        return [result.handle for result in self.results if result.handle is not None]
+
+    def update(self, text_fields: Optional[Iterable[Optional[str]]] = None, **fields: Any) -> List[BroadcastResult]:
+        """
+        Update every copy of the toast, like :meth:`~windows_toasts.handle.ToastHandle.update`
+
+        :return: Result of the update, per toaster the toast was shown through
+        """
+        if text_fields is not None:
+            text_fields = list(text_fields)
+
+        updateResults = []
+        for toastHandle in self.handles:
+            try:
+                updateResults.append(
+                    BroadcastResult(toastHandle._toaster, toastHandle, toastHandle.update(text_fields, **fields))
+                )
+            except OSError as error:
+                updateResults.append(BroadcastResult(toastHandle._toaster, toastHandle, False, error))
+
+        return updateResults
+
+    def remove(self) -> None:
+        """
+        Remove every copy of the toast
+        """
+        for toastHandle in self.handles:
+            toastHandle.remove()
+
+
+class ToastBroadcaster:
+    """
+    Shows the same toast through several toasters, e.g. one per AUMID, building it only once.
+    The XML is only built again for toasters that would build it differently, e.g. a
+    :class:`~windows_toasts.toasters.WindowsToaster` next to an :class:`~windows_toasts.toasters.InteractableWindowsToaster`,
+    or toasters putting different application texts in the attribution. The binding values are shared by all
+
+    :param toasters: Toasters to show the toasts through
+    """
+
+    toasters: List[BaseWindowsToaster]
+
+    def __init__(self, toasters: Iterable[BaseWindowsToaster]) -> None:
+        self.toasters = list(toasters)
+
+    def show_toast(self, toast: Toast, static: Optional[bool] = None) -> ToastBroadcast:
+        """
+        Show a toast through every toaster. An error from one toaster does not keep the toast from the others
+
+        :param toast: Toast to display
+        :param static: Whether to inline the toast's values, like in
+            :meth:`~windows_toasts.toasters.BaseWindowsToaster.show_toast`. Defaults to each toaster's own setting
+        :return: The toast's handles and the result per toaster
+        """
+        group = toast.group or toast.tag
+        bindingValues = _build_binding_values(toast)
+        # The XML per payload key and mode; the first toaster uses the document it was built in, the others parse it
+        payloads: Dict[Tuple[Hashable, bool], str] = {}
+        results = []
+        for toaster in self.toasters:
+            dynamic = not (toaster.staticToasts if static is None else static)
+            payloadKey = (toaster._payload_key(), dynamic)
+            try:
+                xml = payloads.get(payloadKey)
+                if xml is None:
+                    toaster._warn_unsupported(toast)
+                    xmlDocument = toaster._setup_toast(toast, dynamic).xmlDocument
+                    payloads[payloadKey] = xmlDocument.get_xml()
+                else:
+                    xmlDocument = XmlDocument()
+                    xmlDocument.load_xml(xml)
+
+                notificationToSend = _build_toast_notification(toast, ToastNotification(xmlDocument))
+                toastHandle = toaster._show_notification(
+                    toast, notificationToSend, bindingValues.copy if dynamic else None
+                )
+                results.append(BroadcastResult(toaster, toastHandle))
+            except OSError as error:
+                results.append(BroadcastResult(toaster, None, False, error))
+
+        return ToastBroadcast(toast.tag, group, results)
+
+    def update_toast(self, toast: Toast) -> List[BroadcastResult]:
+        """
+        Update a toast shown through :meth:`show_toast` with its new data, building the binding values once
+
+        :return: Result of the update, per toaster
+        """
+        group = toast.group or toast.tag
+        bindingValues = _build_binding_values(toast)
+        updateResults = []
+        for toaster in self.toasters:
+            try:
+                succeeded, _ = toaster._update_binding_values(toast.tag, group, bindingValues.copy, toast.updates)
+                updateResults.append(BroadcastResult(toaster, None, succeeded))
+            except OSError as error:
+                updateResults.append(BroadcastResult(toaster, None, False, error))
+
+        return updateResults
+
+    def remove_toast(self, toast: Toast) -> None:
+        """
+        Remove a toast shown through :meth:`show_toast` from every toaster
+        """
+        for toaster in self.toasters:
+            toaster.remove_toast(toast)
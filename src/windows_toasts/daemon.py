@@ -0,0 +1,508 @@
+"""
+A long-lived process that owns a single toaster and shows toasts submitted by any number of client processes.
+Clients keep a persistent connection, submit without waiting for each reply, and receive the events of their toasts.
+
+Start it with ``python -m windows_toasts.daemon``, and connect using :class:`ToastDaemonClient`
+"""
+
+from __future__ import annotations
+
+import argparse
+import errno
+import itertools
+import os
+import queue
+import socket
+import sys
+import tempfile
+import threading
+import traceback
+from concurrent.futures import Future
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .events import ToastActivatedEventArgs, ToastDismissalReason, ToastDismissedEventData, ToastFailedEventData
+from .exceptions import ToastSerializationError
+from .serialization import CALLBACK_FIELDS, decode_binary, encode_binary, toast_from_dict, toast_to_dict
+from .toast import Toast
+from .toasters import BaseWindowsToaster, InteractableWindowsToaster, ToasterObserver
+
+if sys.platform == "win32":
+    DEFAULT_ADDRESS = r"\\.\pipe\windows-toasts"
+else:
+    # Per user, so that other users can neither connect to nor take over the socket
+    DEFAULT_ADDRESS = os.path.join(
+        os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir(), f"windows-toasts-{os.getuid()}.sock"
+    )
+
+# Message types. Client to daemon: [op, requestId, ...]. Daemon to client: [RESULTS, [[requestId, ok, value], ...]]
+# or [EVENT, tag, eventName, payload]
+SHOW, UPDATE, REMOVE = "show", "update", "remove"
+RESULTS, EVENT = "results", "event"
+# Number of arguments each operation takes after the request ID
+_ARGUMENT_COUNTS = {SHOW: 2, UPDATE: 1, REMOVE: 2}
+
+
+def _close_connection(connection: Connection) -> None:
+    """
+    Close a connection, waking up any thread blocked reading from it. Closing a Unix socket alone does not, so the
+    other end would never find out
+    """
+    if sys.platform != "win32" and not connection.closed:
+        try:
+            with socket.socket(fileno=os.dup(connection.fileno())) as duplicate:
+                duplicate.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    connection.close()
+
+
+class _ClientConnection:
+    """
+    Daemon-side state of a single client connection
+    """
+
+    def __init__(self, connection: Connection) -> None:
+        self.connection = connection
+        self.sendLock = threading.Lock()
+        self.closed = False
+
+    def send(self, message: Any) -> None:
+        if self.closed:
+            return
+
+        try:
+            with self.sendLock:
+                self.connection.send_bytes(encode_binary(message))
+        except OSError:
+            self.closed = True
+
+
+class _ReleaseObserver(ToasterObserver):
+    # Forgets the toasts the toaster stops tracking, e.g. because they expired in the action center
+    def __init__(self, daemon: ToastDaemon) -> None:
+        self.daemon = daemon
+
+    def toast_released(self, tag: str, group: str) -> None:
+        self.daemon._forget_toast(tag)
+
+
+class ToastDaemon:
+    """
+    Accepts toast submissions over a local pipe (Windows) or Unix socket and shows them through a single toaster.
+    Requests from all clients are processed in batches by one dispatcher thread
+
+    :param toaster: Toaster to show toasts through
+    :param address: Address to listen on
+    :param authkey: Optional key clients have to authenticate with
+    :param batchSize: Maximum number of requests processed before replies are flushed
+    """
+
+    toaster: BaseWindowsToaster
+    address: str
+    batchSize: int
+
+    def __init__(
+        self,
+        toaster: BaseWindowsToaster,
+        address: str = DEFAULT_ADDRESS,
+        authkey: Optional[bytes] = None,
+        batchSize: int = 64,
+    ) -> None:
+        self.toaster = toaster
+        self.address = address
+        self.batchSize = batchSize
+        self._authkey = authkey
+        self._listener: Optional[Listener] = None
+        self._requests: queue.SimpleQueue[Optional[Tuple[_ClientConnection, list]]] = queue.SimpleQueue()
+        self._clients: List[_ClientConnection] = []
+        # Shown toasts with callbacks by tag, along with the client that owns them, so that updates keep the
+        # callbacks. Entries go when the toaster releases the toast or the client disconnects
+        self._toasts: Dict[str, Tuple[Toast, _ClientConnection]] = {}
+        self._toastsLock = threading.Lock()
+        self._releaseObserver = _ReleaseObserver(self)
+        self._threads: List[threading.Thread] = []
+        self._running = threading.Event()
+
+    def start(self) -> None:
+        """
+        Start listening and processing requests in background threads
+        """
+        if sys.platform != "win32":
+            self._remove_stale_socket()
+
+        self._listener = Listener(self.address, authkey=self._authkey)
+        if sys.platform != "win32":
+            os.chmod(self.address, 0o600)
+
+        self.toaster.add_observer(self._releaseObserver)
+        self._running.set()
+        for target in (self._accept_loop, self._dispatch_loop):
+            thread = threading.Thread(target=target, name=f"ToastDaemon.{target.__name__}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _remove_stale_socket(self) -> None:
+        """
+        Remove a socket file left behind by a daemon that did not shut down cleanly, which would make listening fail
+
+        :raises: OSError: If another daemon is still listening on the address
+        """
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.address)
+        except FileNotFoundError:
+            return
+        except ConnectionRefusedError:
+            os.unlink(self.address)
+            return
+        finally:
+            probe.close()
+
+        raise OSError(errno.EADDRINUSE, f"A toast daemon is already listening on {self.address}")
+
+    def serve_forever(self) -> None:
+        """
+        Start the daemon and block until it is closed
+        """
+        self.start()
+        try:
+            while self._running.is_set():
+                self._running.wait(1)
+                for thread in self._threads:
+                    thread.join(0.1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """
+        Stop accepting connections, disconnect all clients and stop the dispatcher
+        """
+        if not self._running.is_set():
+            return
+
+        self._running.clear()
+        self._requests.put(None)
+        self.toaster.remove_observer(self._releaseObserver)
+        if self._listener is not None:
+            # Closing the listener does not interrupt a blocking accept() everywhere, so wake it up with a connection
+            try:
+                Client(self.address, authkey=self._authkey).close()
+            except OSError:
+                pass
+            self._listener.close()
+
+        for client in list(self._clients):
+            client.closed = True
+            _close_connection(client.connection)
+
+    def __enter__(self) -> ToastDaemon:
+        self.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def _accept_loop(self) -> None:
+        assert self._listener is not None
+        while self._running.is_set():
+            try:
+                connection = self._listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                # Closed, or a client that failed to authenticate
+                continue
+
+            if not self._running.is_set():
+                connection.close()
+                return
+
+            client = _ClientConnection(connection)
+            self._clients.append(client)
+            threading.Thread(target=self._read_loop, args=(client,), name="ToastDaemon._read_loop", daemon=True).start()
+
+    def _read_loop(self, client: _ClientConnection) -> None:
+        try:
+            while not client.closed:
+                frame = client.connection.recv_bytes()
+                try:
+                    message = decode_binary(frame)
+                except (ToastSerializationError, KeyError, TypeError) as e:
+                    # Frames are delimited by the connection, so the next one can still be read
+                    client.send([RESULTS, [[None, False, f"Malformed request: {e}"]]])
+                    continue
+
+                self._requests.put((client, message))
+        except (OSError, EOFError):
+            pass
+        finally:
+            client.closed = True
+            _close_connection(client.connection)
+            self._clients.remove(client)
+            # Events can no longer be relayed to the client, and it can no longer update its toasts
+            with self._toastsLock:
+                self._toasts = {tag: entry for tag, entry in self._toasts.items() if entry[1] is not client}
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+
+            batch = [request]
+            while len(batch) < self.batchSize:
+                try:
+                    request = self._requests.get_nowait()
+                except queue.Empty:
+                    break
+
+                if request is None:
+                    self._requests.put(None)
+                    break
+
+                batch.append(request)
+
+            replies: Dict[_ClientConnection, list] = {}
+            for client, message in batch:
+                replies.setdefault(client, []).append(self._handle(client, message))
+
+            for client, results in replies.items():
+                client.send([RESULTS, results])
+
+    def _handle(self, client: _ClientConnection, message: Any) -> list:
+        requestId = None
+        try:
+            if not isinstance(message, list) or len(message) < 2:
+                return [requestId, False, "Malformed request"]
+
+            operation, requestId = message[0], message[1]
+            if len(message) != 2 + _ARGUMENT_COUNTS.get(operation, len(message) - 2):
+                return [requestId, False, f"Wrong number of arguments for '{operation}'"]
+
+            if operation == SHOW:
+                return [requestId, True, self._show(client, message[2], message[3])]
+            elif operation == UPDATE:
+                return [requestId, True, self._update(client, message[2])]
+            elif operation == REMOVE:
+                return [requestId, True, self._remove(client, message[2], message[3])]
+
+            return [requestId, False, f"Unknown operation '{operation}'"]
+        except Exception as e:
+            return [requestId, False, f"{type(e).__name__}: {e}"]
+
+    def _owned_toast(self, client: _ClientConnection, tag: str) -> Optional[Toast]:
+        """
+        Look up a toast shown with callbacks
+
+        :return: The toast, or None if it is not tracked
+        :raises: PermissionError: If another client showed the toast
+        """
+        with self._toastsLock:
+            shownToast, owner = self._toasts.get(tag, (None, None))
+
+        if owner is not None and owner is not client:
+            raise PermissionError(f"Toast '{tag}' was shown by another client")
+
+        return shownToast
+
+    def _show(self, client: _ClientConnection, toastDict: dict, subscribedEvents: List[str]) -> None:
+        toast = toast_from_dict(toastDict)
+        tag = toast.tag
+        self._owned_toast(client, tag)
+
+        # The client is captured rather than looked up, since the toaster releases the toast before calling them
+        if "on_activated" in subscribedEvents:
+            toast.on_activated = lambda eventArgs: client.send(
+                [EVENT, tag, "on_activated", {"arguments": eventArgs.arguments, "inputs": eventArgs.inputs}]
+            )
+        if "on_dismissed" in subscribedEvents:
+            toast.on_dismissed = lambda eventArgs: client.send([EVENT, tag, "on_dismissed", int(eventArgs.reason)])
+        if "on_failed" in subscribedEvents:
+            toast.on_failed = lambda eventArgs: client.send(
+                [EVENT, tag, "on_failed", ToastFailedEventData.fromWinRt(eventArgs).error_code]
+            )
+
+        # Clients may update it later
+        self.toaster.show_toast(toast, False)
+        if subscribedEvents:
+            # Only once shown, so that a failed show leaves nothing behind
+            with self._toastsLock:
+                self._toasts[tag] = (toast, client)
+
+    def _update(self, client: _ClientConnection, toastDict: dict) -> bool:
+        newToast = toast_from_dict(toastDict)
+        shownToast = self._owned_toast(client, newToast.tag)
+        if shownToast is None:
+            return self.toaster.update_toast(newToast)
+
+        shownToast.text_fields = newToast.text_fields
+        shownToast.progress_bar = newToast.progress_bar
+        return self.toaster.update_toast(shownToast)
+
+    def _remove(self, client: _ClientConnection, tag: str, group: Optional[str]) -> None:
+        shownToast = self._owned_toast(client, tag)
+        with self._toastsLock:
+            self._toasts.pop(tag, None)
+
+        if shownToast is None:
+            shownToast = Toast(group=group)
+            shownToast.tag = tag
+
+        self.toaster.remove_toast(shownToast)
+
+    def _forget_toast(self, tag: str) -> None:
+        with self._toastsLock:
+            self._toasts.pop(tag, None)
+
+
+def _is_terminal_event(eventName: str, payload: Any) -> bool:
+    # A toast that timed out moves to the action center, where it can still be activated
+    return eventName != "on_dismissed" or payload != ToastDismissalReason.TIMED_OUT
+
+
+class ToastDaemonClient:
+    """
+    Lightweight client for :class:`ToastDaemon`. Submissions are pipelined: every call returns a
+    :class:`~concurrent.futures.Future` immediately, which is resolved once the daemon has processed it.
+    The toast's callbacks are invoked from the client's reader thread
+
+    :param address: Address the daemon listens on
+    :param authkey: Key to authenticate with, if the daemon requires one
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, authkey: Optional[bytes] = None) -> None:
+        self._connection = Client(address, authkey=authkey)
+        self._sendLock = threading.Lock()
+        self._requestIds = itertools.count()
+        self._pending: Dict[int, Future] = {}
+        self._callbacks: Dict[str, Dict[str, Callable]] = {}
+        self._reader = threading.Thread(target=self._read_loop, name="ToastDaemonClient._read_loop", daemon=True)
+        self._reader.start()
+
+    def show_toast(self, toast: Toast) -> Future:
+        """
+        Submit a toast to be shown. Its callbacks stay on this side and are invoked when the daemon relays events
+
+        :param toast: Toast to display
+        :return: Future resolved with None once the toast has been shown
+        """
+        callbacks = {field: getattr(toast, field) for field in CALLBACK_FIELDS if getattr(toast, field) is not None}
+        if callbacks:
+            self._callbacks[toast.tag] = callbacks
+
+        return self._submit(SHOW, toast_to_dict(toast, includeCallbacks=False), list(callbacks))
+
+    def update_toast(self, toast: Toast) -> Future:
+        """
+        Submit new text fields and progress bar values for a toast submitted earlier
+
+        :return: Future resolved with whether the update succeeded
+        """
+        return self._submit(UPDATE, toast_to_dict(toast, includeCallbacks=False))
+
+    def remove_toast(self, toast: Toast) -> Future:
+        """
+        Remove a toast submitted earlier from the action center
+        """
+        self._callbacks.pop(toast.tag, None)
+        return self._submit(REMOVE, toast.tag, toast.group)
+
+    def close(self) -> None:
+        """
+        Close the connection. Pending futures are failed
+        """
+        _close_connection(self._connection)
+        self._reader.join(1)
+
+    def __enter__(self) -> ToastDaemonClient:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def _submit(self, operation: str, *arguments: Any) -> Future:
+        future: Future = Future()
+        requestId = next(self._requestIds)
+        self._pending[requestId] = future
+        try:
+            with self._sendLock:
+                self._connection.send_bytes(encode_binary([operation, requestId, *arguments]))
+        except Exception as e:
+            # No reply will ever come for it
+            if self._pending.pop(requestId, None) is not None:
+                future.set_exception(e)
+
+        return future
+
+    def _read_loop(self) -> None:
+        try:
+            while True:
+                message = decode_binary(self._connection.recv_bytes())
+                if message[0] == RESULTS:
+                    for requestId, succeeded, value in message[1]:
+                        # Replies to malformed requests may not carry a request ID of ours
+                        future = self._pending.pop(requestId, None)
+                        if future is None:
+                            continue
+                        elif succeeded:
+                            future.set_result(value)
+                        else:
+                            future.set_exception(RuntimeError(value))
+                elif message[0] == EVENT:
+                    self._dispatch_event(*message[1:])
+        except (OSError, EOFError):
+            pass
+        finally:
+            # Popped one by one, since a failing submission may be failing its own future at the same time
+            while self._pending:
+                _, future = self._pending.popitem()
+                future.set_exception(ConnectionError("Connection to the toast daemon was closed"))
+
+    def _dispatch_event(self, tag: str, eventName: str, payload: Any) -> None:
+        if _is_terminal_event(eventName, payload):
+            callbacks = self._callbacks.pop(tag, {})
+        else:
+            callbacks = self._callbacks.get(tag, {})
+
+        callback = callbacks.get(eventName)
+        if callback is None:
+            return
+
+        # An exception escaping would stop the reader thread, and with it every pending future
+        try:
+            if eventName == "on_activated":
+                callback(ToastActivatedEventArgs(payload["arguments"], payload["inputs"]))
+            elif eventName == "on_dismissed":
+                callback(ToastDismissedEventData(ToastDismissalReason(payload)))
+            else:
+                callback(ToastFailedEventData(payload))
+        except Exception:
+            traceback.print_exc()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Show toasts submitted by other processes through one toaster")
+    parser.add_argument("--app-text", default="Python", help="Text to display the application as")
+    parser.add_argument("--aumid", default=None, help="AUMID to show toasts under. Defaults to Command Prompt")
+    parser.add_argument("--address", default=DEFAULT_ADDRESS, help="Pipe or socket address to listen on")
+    parser.add_argument("--batch-size", type=int, default=64, help="Maximum requests to process per batch")
+    parser.add_argument(
+        "--in-memory", action="store_true", help="Keep toasts in memory instead of displaying them, for testing"
+    )
+    args = parser.parse_args(argv)
+
+    toaster = InteractableWindowsToaster(args.app_text, args.aumid)
+    if args.in_memory:
+        from .notifiers import InMemoryToastNotifier
+
+        InMemoryToastNotifier().attach(toaster)
+
+    authkey = os.environ.get("WINDOWS_TOASTS_AUTHKEY")
+    ToastDaemon(toaster, args.address, None if authkey is None else authkey.encode(), args.batch_size).serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -34,3 +34,34 @@ class ToastActivatedEventArgs:
             pass
 
         return cls(activatedEventArgs.arguments, receivedInputs)
+
+
+@dataclass
+class ToastDismissedEventData:
+    """
+    Plain Python equivalent of WinRT's ToastDismissedEventArgs, for dismissals that do not come from WinRT directly,
+    such as those relayed by :mod:`~windows_toasts.daemon`
+    """
+
+    reason: ToastDismissalReason
+    """Why the toast was dismissed"""
+
+    @classmethod
+    def fromWinRt(cls, eventArgs: ToastDismissedEventArgs) -> ToastDismissedEventData:
+        return cls(ToastDismissalReason(eventArgs.reason))
+
+
+@dataclass
+class ToastFailedEventData:
+    """
+    Plain Python equivalent of WinRT's ToastFailedEventArgs, for failures that do not come from WinRT directly
+    """
+
+    error_code: int
+    """The HRESULT the toast failed with, as an unsigned integer"""
+
+    @classmethod
+    def fromWinRt(cls, eventArgs: ToastFailedEventArgs) -> ToastFailedEventData:
+        errorCode = eventArgs.error_code
+        # Depending on the projection, the HRESULT is either an integer or a struct wrapping one
+        return cls(int(getattr(errorCode, "value", errorCode)) & 0xFFFFFFFF)
@@ -6,5 +6,9 @@ class ToastNotFoundError(Exception):
     """The toast could not be found"""
 
 
+class ToastSerializationError(Exception):
+    """The toast could not be serialized or deserialized"""
+
+
 class UnsupportedOSVersionException(ImportError):
     """The operating system version is not supported"""
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Mapping, Optional
+
+if TYPE_CHECKING:
+    from .toasters import BaseWindowsToaster
+
+PROGRESS_BINDINGS = ("status", "progress", "progress_override", "caption")
+
+
+class ToastHandle:
+    """
+    Lightweight reference to a shown toast, returned by :meth:`~windows_toasts.toasters.BaseWindowsToaster.show_toast`.
+    Holds only the tag, group, sequence number and current binding values, so the :class:`~windows_toasts.toast.Toast`
+    itself can be discarded. Safe to use from any thread, and can be serialized to keep updating the toast elsewhere
+    """
+
+    tag: str
+    """Tag of the toast"""
+    group: str
+    """Group of the toast"""
+
+    def __init__(
+        self,
+        toaster: Optional[BaseWindowsToaster],
+        tag: str,
+        group: str,
+        bindingValues: Mapping[str, Optional[str]],
+        sequenceNumber: int = 0,
+    ) -> None:
+        self.tag = tag
+        self.group = group
+        self._toaster = toaster
+        self._lock = threading.Lock()
+        self._values: Dict[str, Optional[str]] = dict(bindingValues)
+        self._sequenceNumber = sequenceNumber
+        # If the override was generated from the progress, regenerate it when the progress changes
+        self._automaticOverride = "progress" in self._values and self._values.get("progress_override") == (
+            _default_progress_override(self._values["progress"])
+        )
+
+    @property
+    def values(self) -> Dict[str, Optional[str]]:
+        """A copy of the binding values the toast was last updated with"""
+        with self._lock:
+            return dict(self._values)
+
+    @property
+    def sequence_number(self) -> int:
+        """Sequence number of the last update sent through this handle"""
+        return self._sequenceNumber
+
+    def update(self, text_fields: Optional[Iterable[Optional[str]]] = None, **fields: Any) -> bool:
+        """
+        Update the toast's bindings. Fields left out keep their current values
+
+        :param text_fields: Replacement for all text fields, like :attr:`~windows_toasts.toast.Toast.text_fields`
+        :param fields: Individual bindings: text1, text2... and status, progress, progress_override, caption.
+            Progress may be a float between 0 and 1, or None for an indeterminate bar
+        :raises: ValueError: If a field is not a binding of the toast
+        :return: Whether the update succeeded
+        """
+        newValues: Dict[str, Optional[str]] = {}
+        if text_fields is not None:
+            newValues.update(
+                (f"text{i + 1}", fieldContent) for i, fieldContent in enumerate(text_fields) if fieldContent is not None
+            )
+
+        for fieldName, fieldValue in fields.items():
+            if fieldName in PROGRESS_BINDINGS:
+                if fieldName == "progress":
+                    fieldValue = "indeterminate" if fieldValue is None else str(fieldValue)
+            elif not (fieldName.startswith("text") and fieldName[4:].isdigit()):
+                raise ValueError(f"'{fieldName}' is not a binding of the toast")
+
+            newValues[fieldName] = fieldValue
+
+        toaster = self._require_toaster()
+        with self._lock:
+            if "progress_override" in newValues:
+                self._automaticOverride = newValues["progress_override"] is None
+            if self._automaticOverride and "progress" in newValues:
+                newValues.setdefault("progress_override", _default_progress_override(newValues["progress"]))
+
+            self._values.update(newValues)
+
+        # The values are snapshotted once the sequence number has been allocated, so a newer number never has older data
+        succeeded, sequenceNumber = toaster._update_binding_values(
+            self.tag, self.group, lambda: self.values, self._sequenceNumber
+        )
+        with self._lock:
+            self._sequenceNumber = max(self._sequenceNumber, sequenceNumber)
+
+        return succeeded
+
+    def remove(self) -> None:
+        """
+        Remove the toast from the action center, hiding it if it is on-screen
+        """
+        self._require_toaster()._remove_by_tag(self.tag, self.group)
+
+    def bind(self, toaster: BaseWindowsToaster) -> ToastHandle:
+        """
+        Attach the handle to a toaster, e.g. after deserializing it in another process.
+        The toaster has to use the same AUMID as the one that showed the toast
+
+        :return: The handle itself
+        """
+        self._toaster = toaster
+        return self
+
+    def to_dict(self) -> dict:
+        """
+        Serialize the handle. The toaster is not included; see :meth:`from_dict`
+        """
+        with self._lock:
+            return {
+                "tag": self.tag,
+                "group": self.group,
+                "values": dict(self._values),
+                "sequence_number": self._sequenceNumber,
+            }
+
+    @classmethod
+    def from_dict(cls, handleDict: dict, toaster: Optional[BaseWindowsToaster] = None) -> ToastHandle:
+        """
+        Create a handle from :meth:`to_dict`. Further updates continue from the serialized sequence number
+
+        :param handleDict: Serialized handle
+        :param toaster: Toaster to update through, which has to use the same AUMID as the one that showed the toast
+        """
+        return cls(toaster, handleDict["tag"], handleDict["group"], handleDict["values"], handleDict["sequence_number"])
+
+    def __getstate__(self) -> dict:
+        return self.to_dict()
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(None, state["tag"], state["group"], state["values"], state["sequence_number"])  # type: ignore
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(tag={self.tag!r}, group={self.group!r}, sequence_number={self._sequenceNumber})"
+
+    def _require_toaster(self) -> BaseWindowsToaster:
+        if self._toaster is None:
+            raise RuntimeError("The handle is not bound to a toaster. Use bind() after deserializing it")
+
+        return self._toaster
+
+
+def _default_progress_override(progress: Optional[str]) -> Optional[str]:
+    if progress is None or progress == "indeterminate":
+        return None
+
+    return f"{round(float(progress) * 100)}%"
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from .toast import Toast
+from .toasters import BaseWindowsToaster, ToasterObserver
+
+
+@dataclass
+class ToastHistoryEntry:
+    """
+    A toast believed to be in the action center
+    """
+
+    tag: str
+    """Tag of the toast"""
+    group: str
+    """Group of the toast"""
+    firstSeen: float
+    """Time (as in :func:`time.time`) the toast was shown, or first found in the history if shown elsewhere"""
+    expiresAt: Optional[float] = None
+    """Time (as in :func:`time.time`) the toast expires from the action center, if it has an expiration time"""
+
+    @property
+    def age(self) -> float:
+        """Seconds since :attr:`firstSeen`"""
+        return time.time() - self.firstSeen
+
+
+def _timestamp(value: Optional[datetime]) -> Optional[float]:
+    return None if value is None else value.timestamp()
+
+
+class ToastHistoryIndex(ToasterObserver):
+    """
+    In-memory mirror of a toaster's toasts in the action center, indexed by tag and group.
+    It is kept up to date by the toaster's own show and remove calls, and reconciled against the actual history
+    (which the user can change) at most every reconcileInterval seconds, when queried
+
+    :param toaster: Toaster whose toasts to index
+    :param reconcileInterval: Minimum seconds between reconciliations. None to only reconcile through :meth:`refresh`
+    """
+
+    toaster: BaseWindowsToaster
+    reconcileInterval: Optional[float]
+
+    def __init__(self, toaster: BaseWindowsToaster, reconcileInterval: Optional[float] = 60.0) -> None:
+        self.toaster = toaster
+        self.reconcileInterval = reconcileInterval
+        self._lock = threading.RLock()
+        self._entries: Dict[Tuple[str, str], ToastHistoryEntry] = {}
+        self._groups: Dict[str, Dict[str, ToastHistoryEntry]] = {}
+        self._lastRefresh = 0.0
+        toaster.add_observer(self)
+        self.refresh()
+
+    def close(self) -> None:
+        """
+        Stop tracking the toaster's operations
+        """
+        self.toaster.remove_observer(self)
+
+    def refresh(self) -> None:
+        """
+        Reconcile the index with a snapshot of the action center history. Entries already known keep their
+        :attr:`~ToastHistoryEntry.firstSeen`
+        """
+        with self._lock:
+            # Taken under the lock, so that the toaster's operations in the meantime are applied after the swap
+            # rather than to the entries being replaced
+            snapshot = self.toaster.toastHistory.get_history_with_id(self.toaster._AUMID)
+            now = time.time()
+            previousEntries = self._entries
+            self._entries = {}
+            self._groups = {}
+            for notification in snapshot:
+                key = (notification.tag, notification.group)
+                entry = previousEntries.get(key)
+                if entry is None:
+                    entry = ToastHistoryEntry(*key, now, _timestamp(notification.expiration_time))
+
+                self._add(entry)
+
+            self._lastRefresh = time.monotonic()
+
+    def exists(self, tag: str, group: Optional[str] = None) -> bool:
+        """
+        Whether a toast is in the action center
+
+        :param tag: Tag of the toast
+        :param group: Group of the toast. Defaults to the tag, like the toasters do
+        """
+        return self.get(tag, group) is not None
+
+    def get(self, tag: str, group: Optional[str] = None) -> Optional[ToastHistoryEntry]:
+        """
+        The entry of a toast in the action center, or None if it is not there
+        """
+        self._maybe_reconcile()
+        with self._lock:
+            entry = self._entries.get((tag, group or tag))
+            if entry is None or self._expired(entry, time.time()):
+                return None
+
+            return entry
+
+    def count(self, group: Optional[str] = None) -> int:
+        """
+        Number of toasts in the action center
+
+        :param group: Only count toasts in this group
+        """
+        return len(self.entries(group))
+
+    def counts_by_group(self) -> Dict[str, int]:
+        """
+        Number of toasts in the action center per group
+        """
+        counts: Dict[str, int] = {}
+        for entry in self.entries():
+            counts[entry.group] = counts.get(entry.group, 0) + 1
+
+        return counts
+
+    def entries(self, group: Optional[str] = None) -> List[ToastHistoryEntry]:
+        """
+        The toasts in the action center
+
+        :param group: Only include toasts in this group
+        """
+        self._maybe_reconcile()
+        now = time.time()
+        with self._lock:
+            candidates = self._entries.values() if group is None else self._groups.get(group, {}).values()
+            return [entry for entry in candidates if not self._expired(entry, now)]
+
+    def older_than(self, seconds: float, group: Optional[str] = None) -> List[ToastHistoryEntry]:
+        """
+        The toasts that have been in the action center for longer than the number of seconds
+
+        :param seconds: Minimum age
+        :param group: Only include toasts in this group
+        """
+        cutoff = time.time() - seconds
+        return [entry for entry in self.entries(group) if entry.firstSeen < cutoff]
+
+    def __contains__(self, toast: Toast) -> bool:
+        return self.exists(toast.tag, toast.group)
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def toast_shown(self, toast: Toast, group: str) -> None:
+        with self._lock:
+            self._discard(toast.tag, group)
+            self._add(ToastHistoryEntry(toast.tag, group, time.time(), _timestamp(toast.expiration_time)))
+
+    def toast_updated(self, tag: str, group: str, succeeded: bool) -> None:
+        # Updates only fail if the toast is no longer in the action center
+        if not succeeded:
+            self.toast_removed(tag, group)
+
+    def toast_removed(self, tag: str, group: str) -> None:
+        with self._lock:
+            self._discard(tag, group)
+
+    def group_removed(self, group: str) -> None:
+        with self._lock:
+            for tag in list(self._groups.get(group, ())):
+                self._discard(tag, group)
+
+    def toasts_cleared(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+
+    def _add(self, entry: ToastHistoryEntry) -> None:
+        self._entries[(entry.tag, entry.group)] = entry
+        self._groups.setdefault(entry.group, {})[entry.tag] = entry
+
+    def _discard(self, tag: str, group: str) -> None:
+        if self._entries.pop((tag, group), None) is not None:
+            groupEntries = self._groups[group]
+            del groupEntries[tag]
+            if not groupEntries:
+                del self._groups[group]
+
+    @staticmethod
+    def _expired(entry: ToastHistoryEntry, now: float) -> bool:
+        return entry.expiresAt is not None and entry.expiresAt <= now
+
+    def _maybe_reconcile(self) -> None:
+        if self.reconcileInterval is not None and time.monotonic() - self._lastRefresh >= self.reconcileInterval:
+            self.refresh()
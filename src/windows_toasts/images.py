@@ -0,0 +1,621 @@
+from __future__ import annotations
+
+import collections
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import warnings
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List, Optional, OrderedDict, Set, Tuple, Union
+
+from .exceptions import InvalidImageException
+from .serialization import _image_from_uri
+from .toast import Toast
+from .wrappers import ToastDisplayImage, ToastImage, ToastImagePosition
+
+try:
+    from PIL import Image, ImageDraw, ImageOps
+except ImportError:  # pragma: no cover
+    Image = None
+
+TARGET_SIZES: Dict[ToastImagePosition, Tuple[int, int]] = {
+    ToastImagePosition.AppLogo: (48, 48),
+    ToastImagePosition.Hero: (364, 180),
+    ToastImagePosition.Inline: (364, 180),
+}
+"""Size each position is displayed at, in effective pixels, i.e. at 100% display scaling"""
+
+# Bumped whenever the output of _render_image changes, so that stale cache entries are not reused
+_CACHE_VERSION = 1
+
+
+def _path_of(toastImage: ToastImage) -> Path:
+    """
+    Filesystem path of a :class:`ToastImage`, which stores a file URI
+    """
+    if not toastImage.path.startswith("file://"):
+        raise InvalidImageException(f"Image '{toastImage.path}' is not a local file")
+
+    prefixLength = len("file://")
+    path = toastImage.path[prefixLength:]
+    if not path.startswith("/"):
+        # UNC path, i.e. file://server/share
+        path = "//" + path
+    elif path[2:3] == ":":
+        # Drive letter, i.e. file:///C:/
+        path = path[1:]
+
+    return Path(path)
+
+
+def _render_image(
+    sourcePath: str, cacheDirectory: str, width: int, height: int, fill: bool, circleCrop: bool
+) -> Tuple[str, int]:
+    """
+    Downscale an image to fit a size and store it in the cache, named after its content and the parameters.
+    Runs in the worker processes
+
+    :param fill: Whether to crop the image to fill the size, rather than fit it inside
+    :param circleCrop: Whether to cut a circle out of the image, leaving the rest transparent
+    :return: The cached file, and the number of bytes added to the cache (zero if it was already there)
+    """
+    digest = hashlib.sha256(f"{_CACHE_VERSION}:{width}x{height}:{fill}:{circleCrop}:".encode())
+    with open(sourcePath, "rb") as sourceFile:
+        for chunk in iter(lambda: sourceFile.read(1 << 20), b""):
+            digest.update(chunk)
+
+    targetPath = os.path.join(cacheDirectory, f"{digest.hexdigest()}.png")
+    if os.path.exists(targetPath):
+        # Mark as recently used, for eviction
+        os.utime(targetPath)
+        return targetPath, 0
+
+    with Image.open(sourcePath) as sourceImage:
+        # Lets JPEG decode at a fraction of its full size, which is most of the work for large photos
+        sourceImage.draft("RGB", (width, height))
+        image = ImageOps.exif_transpose(sourceImage)
+
+        # Only ever downscale
+        shrinkFactor = min(1.0, image.width / width, image.height / height) if fill else 1.0
+        targetSize = (max(1, round(width * shrinkFactor)), max(1, round(height * shrinkFactor)))
+        if fill:
+            image = ImageOps.fit(image, targetSize, Image.Resampling.LANCZOS)
+        else:
+            image.thumbnail(targetSize, Image.Resampling.LANCZOS)
+
+        if circleCrop:
+            mask = Image.new("L", image.size, 0)
+            ImageDraw.Draw(mask).ellipse((0, 0, image.width - 1, image.height - 1), fill=255)
+            image = image.convert("RGBA")
+            image.putalpha(mask)
+
+        # Written under a temporary name first, so that other processes never see a partial file
+        temporaryPath = f"{targetPath}.{os.getpid()}.{threading.get_ident()}.tmp"
+        image.save(temporaryPath, "PNG", optimize=True)
+
+    os.replace(temporaryPath, targetPath)
+    return targetPath, os.path.getsize(targetPath)
+
+
+class ToastImageCache:
+    """
+    Downscales images to the size their position is displayed at, and circle-crops them if requested, so that Windows
+    does not have to decode full-size photos. Processing happens in a process pool, and the results are kept in an
+    on-disk cache named after their content, which is evicted by least recent use once it exceeds its size limit.
+    Requires Pillow, e.g. through ``pip install windows-toasts[images]``
+
+    :param cacheDirectory: Directory to store the processed images in. Created if it does not exist
+    :param maxBytes: Size the cache is evicted down to
+    :param scale: Display scaling to prepare the images for, e.g. 2.0 for 200%
+    :param executor: Executor to process the images in. Defaults to a :class:`~concurrent.futures.ProcessPoolExecutor`
+    :param maxEntries: Number of source images to remember the processed file of, least recently used first.
+        Forgotten ones are hashed again to find their processed file
+    :raises: ImportError: If Pillow is not installed
+    """
+
+    cacheDirectory: Path
+    maxBytes: int
+    scale: float
+    maxEntries: int
+    hits: int
+    """Number of images found in the cache"""
+    misses: int
+    """Number of images processed"""
+
+    def __init__(
+        self,
+        cacheDirectory: Union[str, os.PathLike],
+        maxBytes: int = 64 * 1024 * 1024,
+        scale: float = 2.0,
+        executor: Optional[Executor] = None,
+        maxEntries: int = 4096,
+    ) -> None:
+        if Image is None:
+            raise ImportError(
+                "Pillow is required to process images. Install it with pip install windows-toasts[images]"
+            )
+
+        self.cacheDirectory = Path(cacheDirectory)
+        self.cacheDirectory.mkdir(parents=True, exist_ok=True)
+        self.maxBytes = maxBytes
+        self.scale = scale
+        self.maxEntries = maxEntries
+        self.hits = 0
+        self.misses = 0
+        self._ownsExecutor = executor is None
+        self._executor = ProcessPoolExecutor() if executor is None else executor
+        self._lock = threading.Lock()
+        # Source file and parameters mapped to processed files, so unchanged files are not hashed again
+        self._processed: OrderedDict[tuple, str] = collections.OrderedDict()
+        self._inFlight: Dict[tuple, Future] = {}
+        self._cachedBytes = sum(cachedFile.stat().st_size for cachedFile in self.cacheDirectory.glob("*.png"))
+
+    def target_size(self, position: ToastImagePosition, circleCrop: bool = False) -> Tuple[int, int]:
+        """
+        Size, in pixels, images at a position are prepared at
+
+        :param position: Position of the image
+        :param circleCrop: Whether the image is cropped into a circle, which makes it square
+        """
+        width, height = TARGET_SIZES[position]
+        if circleCrop and position != ToastImagePosition.Hero:
+            width = height = min(width, height)
+
+        return round(width * self.scale), round(height * self.scale)
+
+    def submit(self, displayImage: ToastDisplayImage) -> Future:
+        """
+        Start preparing an image
+
+        :param displayImage: Image to prepare
+        :return: A future resolving to a copy of displayImage that points at the prepared file
+        """
+        sourcePath = _path_of(displayImage.image)
+        circleCrop = displayImage.circleCrop and displayImage.position != ToastImagePosition.Hero
+        width, height = self.target_size(displayImage.position, circleCrop)
+        sourceStat = sourcePath.stat()
+        # Windows crops logos, circles and hero images to their shape anyway, while inline images keep theirs
+        fill = displayImage.position != ToastImagePosition.Inline or circleCrop
+        key = (str(sourcePath), sourceStat.st_mtime_ns, sourceStat.st_size, width, height, fill, circleCrop)
+
+        preparedFuture: Future = Future()
+        with self._lock:
+            cachedPath = self._processed.get(key)
+            if cachedPath is not None:
+                if os.path.exists(cachedPath):
+                    self.hits += 1
+                    os.utime(cachedPath)
+                    self._processed.move_to_end(key)
+                    preparedFuture.set_result(_with_path(displayImage, cachedPath))
+                    return preparedFuture
+
+                # Evicted, or deleted by something else
+                del self._processed[key]
+
+            renderFuture = self._inFlight.get(key)
+            if renderFuture is None:
+                renderFuture = self._executor.submit(
+                    _render_image, str(sourcePath), str(self.cacheDirectory), width, height, fill, circleCrop
+                )
+                self._inFlight[key] = renderFuture
+                # Added outside the lock, since the callback runs immediately if the image is already done
+                isNewRender = True
+            else:
+                isNewRender = False
+
+        if isNewRender:
+            renderFuture.add_done_callback(lambda _: self._finish(key, renderFuture))
+
+        def resolve(finishedFuture: Future) -> None:
+            exception = finishedFuture.exception()
+            if exception is not None:
+                preparedFuture.set_exception(exception)
+            else:
+                preparedFuture.set_result(_with_path(displayImage, finishedFuture.result()[0]))
+
+        renderFuture.add_done_callback(resolve)
+        return preparedFuture
+
+    def prepare(self, toast: Toast) -> Future:
+        """
+        Start preparing all of a toast's images. Images that cannot be prepared are left as they are, with a warning
+
+        :param toast: Toast whose images to prepare
+        :return: A future resolving to the toast, once its images have been replaced by the prepared ones
+        """
+        preparedFuture: Future = Future()
+        originalImages = list(toast.images)
+        if not originalImages:
+            preparedFuture.set_result(toast)
+            return preparedFuture
+
+        imageFutures: List[Future] = []
+        for displayImage in originalImages:
+            try:
+                imageFutures.append(self.submit(displayImage))
+            except (OSError, InvalidImageException) as exception:
+                imageFutures.append(_failed_future(exception))
+
+        remaining = [len(imageFutures)]
+        remainingLock = threading.Lock()
+
+        def image_done(_: Future) -> None:
+            with remainingLock:
+                remaining[0] -= 1
+                if remaining[0] > 0:
+                    return
+
+            preparedImages = []
+            for displayImage, imageFuture in zip(originalImages, imageFutures):
+                if imageFuture.exception() is None:
+                    preparedImages.append(imageFuture.result())
+                else:
+                    warnings.warn(f"Could not prepare image {displayImage.image.path}: {imageFuture.exception()}")
+                    preparedImages.append(displayImage)
+
+            toast.images = preparedImages
+            preparedFuture.set_result(toast)
+
+        for imageFuture in imageFutures:
+            imageFuture.add_done_callback(image_done)
+
+        return preparedFuture
+
+    def evict(self) -> int:
+        """
+        Delete the least recently used images until the cache is within :attr:`maxBytes`.
+        This also happens automatically as images are added
+
+        :return: Number of bytes freed
+        """
+        cachedFiles = []
+        for cachedFile in self.cacheDirectory.glob("*.png"):
+            try:
+                fileStat = cachedFile.stat()
+            except FileNotFoundError:
+                continue
+
+            cachedFiles.append((fileStat.st_mtime, fileStat.st_size, cachedFile))
+
+        totalBytes = sum(fileSize for _, fileSize, _ in cachedFiles)
+        freedBytes = 0
+        deletedPaths: Set[str] = set()
+        for _, fileSize, cachedFile in sorted(cachedFiles):
+            if totalBytes - freedBytes <= self.maxBytes:
+                break
+
+            try:
+                cachedFile.unlink()
+            except OSError:
+                # Still in use, e.g. by a toast being displayed
+                continue
+
+            freedBytes += fileSize
+            deletedPaths.add(str(cachedFile))
+
+        with self._lock:
+            self._cachedBytes = totalBytes - freedBytes
+            if deletedPaths:
+                self._processed = collections.OrderedDict(
+                    (key, cachedPath) for key, cachedPath in self._processed.items() if cachedPath not in deletedPaths
+                )
+
+        return freedBytes
+
+    def close(self) -> None:
+        """
+        Wait for images being prepared and shut the process pool down, if the cache created it
+        """
+        if self._ownsExecutor:
+            self._executor.shutdown()
+
+    def __enter__(self) -> ToastImageCache:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def _finish(self, key: tuple, renderFuture: Future) -> None:
+        with self._lock:
+            self._inFlight.pop(key, None)
+            if renderFuture.exception() is not None:
+                return
+
+            cachedPath, addedBytes = renderFuture.result()
+            self._processed[key] = cachedPath
+            self._processed.move_to_end(key)
+            if len(self._processed) > self.maxEntries:
+                self._processed.popitem(last=False)
+            if addedBytes:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+            self._cachedBytes += addedBytes
+            overLimit = self._cachedBytes > self.maxBytes
+
+        if overLimit:
+            self.evict()
+
+
+def _with_path(displayImage: ToastDisplayImage, path: str) -> ToastDisplayImage:
+    # Stored unquoted, like ToastImage does
+    return replace(displayImage, image=_image_from_uri(urllib.parse.unquote(Path(path).absolute().as_uri())))
+
+
+def _failed_future(exception: BaseException) -> Future:
+    failedFuture: Future = Future()
+    failedFuture.set_exception(exception)
+    return failedFuture
+
+
+class ToastImageFetcher:
+    """
+    Downloads remote images into a local disk cache, so that toasts can display them. Concurrent requests for the same
+    URL share one download, and at most maxWorkers downloads run at once. Cached images are revalidated with their
+    ETag or Last-Modified once they are older than maxAge, and the least recently used ones are evicted once the cache
+    exceeds maxBytes
+
+    :param cacheDirectory: Directory to store the images in. Created if it does not exist
+    :param maxBytes: Size the cache is evicted down to
+    :param maxAge: Seconds a cached image is used for without revalidating it
+    :param maxWorkers: Maximum number of concurrent downloads
+    :param timeout: Seconds to wait for a server before giving up
+    :param maxImageBytes: Size of the largest image to download. Larger ones fail with an
+        :class:`~windows_toasts.exceptions.InvalidImageException`, without being read into memory
+    """
+
+    cacheDirectory: Path
+    maxBytes: int
+    maxAge: float
+    timeout: float
+    maxImageBytes: int
+    downloads: int
+    """Number of images downloaded"""
+    revalidations: int
+    """Number of cached images the server confirmed were unchanged"""
+    hits: int
+    """Number of images served from the cache without contacting the server"""
+
+    def __init__(
+        self,
+        cacheDirectory: Union[str, os.PathLike],
+        maxBytes: int = 64 * 1024 * 1024,
+        maxAge: float = 300.0,
+        maxWorkers: int = 4,
+        timeout: float = 10.0,
+        maxImageBytes: int = 16 * 1024 * 1024,
+    ) -> None:
+        self.cacheDirectory = Path(cacheDirectory)
+        self.cacheDirectory.mkdir(parents=True, exist_ok=True)
+        self.maxBytes = maxBytes
+        self.maxAge = maxAge
+        self.timeout = timeout
+        self.maxImageBytes = maxImageBytes
+        self.downloads = 0
+        self.revalidations = 0
+        self.hits = 0
+        self._executor = ThreadPoolExecutor(maxWorkers, thread_name_prefix="ToastImageFetcher")
+        self._lock = threading.Lock()
+        self._inFlight: Dict[str, Future] = {}
+        self._cachedBytes = sum(
+            cachedFile.stat().st_size
+            for cachedFile in self.cacheDirectory.iterdir()
+            if cachedFile.suffix not in (".json", ".tmp")
+        )
+
+    def fetch(self, url: str) -> Future:
+        """
+        Start fetching an image, unless it is already being fetched
+
+        :param url: URL of the image
+        :return: A future resolving to a :class:`~windows_toasts.wrappers.ToastImage` of the local copy
+        """
+        with self._lock:
+            fetchFuture = self._inFlight.get(url)
+            if fetchFuture is not None:
+                return fetchFuture
+
+            fetchFuture = self._executor.submit(self._fetch, url)
+            self._inFlight[url] = fetchFuture
+
+        fetchFuture.add_done_callback(lambda _: self._forget(url, fetchFuture))
+        return fetchFuture
+
+    def display_image(
+        self,
+        url: str,
+        altText: Optional[str] = None,
+        position: ToastImagePosition = ToastImagePosition.Inline,
+        circleCrop: bool = False,
+    ) -> Future:
+        """
+        Start fetching an image to display on a toast, like :meth:`ToastDisplayImage.fromPath`
+
+        :return: A future resolving to a :class:`~windows_toasts.wrappers.ToastDisplayImage` of the local copy
+        """
+        displayFuture: Future = Future()
+
+        def resolve(fetchFuture: Future) -> None:
+            exception = fetchFuture.exception()
+            if exception is not None:
+                displayFuture.set_exception(exception)
+            else:
+                displayFuture.set_result(ToastDisplayImage(fetchFuture.result(), altText, position, circleCrop))
+
+        self.fetch(url).add_done_callback(resolve)
+        return displayFuture
+
+    def evict(self) -> int:
+        """
+        Delete the least recently used images until the cache is within :attr:`maxBytes`.
+        This also happens automatically as images are downloaded
+
+        :return: Number of bytes freed
+        """
+        cachedFiles = []
+        for metadataPath in self.cacheDirectory.glob("*.json"):
+            try:
+                metadata = json.loads(metadataPath.read_text("utf-8"))
+                imageStat = (self.cacheDirectory / metadata["file"]).stat()
+            except (OSError, ValueError, KeyError):
+                continue
+
+            cachedFiles.append((imageStat.st_mtime, imageStat.st_size, metadataPath, metadata["file"]))
+
+        totalBytes = sum(fileSize for _, fileSize, _, _ in cachedFiles)
+        freedBytes = 0
+        for _, fileSize, metadataPath, fileName in sorted(cachedFiles):
+            if totalBytes - freedBytes <= self.maxBytes:
+                break
+
+            try:
+                # The metadata goes first, so that a half-deleted entry is never considered cached
+                metadataPath.unlink()
+                (self.cacheDirectory / fileName).unlink()
+            except OSError:
+                continue
+
+            freedBytes += fileSize
+
+        with self._lock:
+            self._cachedBytes = totalBytes - freedBytes
+
+        return freedBytes
+
+    def close(self) -> None:
+        """
+        Wait for downloads in progress and stop the download threads
+        """
+        self._executor.shutdown()
+
+    def __enter__(self) -> ToastImageFetcher:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def _forget(self, url: str, fetchFuture: Future) -> None:
+        with self._lock:
+            if self._inFlight.get(url) is fetchFuture:
+                del self._inFlight[url]
+
+    def _fetch(self, url: str) -> ToastImage:
+        if urllib.parse.urlparse(url).scheme not in ("http", "https"):
+            raise InvalidImageException(f"'{url}' is not an http(s) URL")
+
+        urlDigest = hashlib.sha256(url.encode()).hexdigest()
+        metadataPath = self.cacheDirectory / f"{urlDigest}.json"
+        metadata: Optional[dict] = None
+        try:
+            metadata = json.loads(metadataPath.read_text("utf-8"))
+            cachedPath: Optional[Path] = self.cacheDirectory / metadata["file"]
+            if not cachedPath.exists():
+                cachedPath = metadata = None
+        except (OSError, ValueError, KeyError):
+            cachedPath = metadata = None
+
+        if cachedPath is not None and time.time() - metadata["validated"] < self.maxAge:
+            with self._lock:
+                self.hits += 1
+            # Mark as recently used, for eviction
+            os.utime(cachedPath)
+            return ToastImage(cachedPath)
+
+        request = urllib.request.Request(url)
+        if metadata is not None:
+            if metadata.get("etag"):
+                request.add_header("If-None-Match", metadata["etag"])
+            if metadata.get("last_modified"):
+                request.add_header("If-Modified-Since", metadata["last_modified"])
+
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                imageData = self._read_limited(url, response)
+                headers = response.headers
+        except urllib.error.HTTPError as httpError:
+            if httpError.code != 304 or cachedPath is None:
+                raise
+
+            with self._lock:
+                self.revalidations += 1
+            metadata["validated"] = time.time()
+            self._write_atomically(metadataPath, json.dumps(metadata).encode())
+            os.utime(cachedPath)
+            return ToastImage(cachedPath)
+        except OSError as networkError:
+            if cachedPath is None:
+                raise
+
+            # Better an outdated image than none
+            warnings.warn(f"Could not revalidate {url}, using the cached copy: {networkError}")
+            return ToastImage(cachedPath)
+
+        contentType = headers.get_content_type()
+        extension = mimetypes.guess_extension(contentType) if contentType.startswith("image/") else None
+        if extension is None:
+            extension = Path(urllib.parse.urlparse(url).path).suffix or ".img"
+
+        newPath = self.cacheDirectory / f"{urlDigest}{extension}"
+        self._write_atomically(newPath, imageData)
+        newMetadata = {
+            "url": url,
+            "file": newPath.name,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "validated": time.time(),
+        }
+        self._write_atomically(metadataPath, json.dumps(newMetadata).encode())
+        if cachedPath is not None and cachedPath != newPath:
+            # The server now sends a different type of image
+            cachedPath.unlink(missing_ok=True)
+
+        fetchedImage = ToastImage(newPath)
+        with self._lock:
+            self.downloads += 1
+            self._cachedBytes += len(imageData)
+            overLimit = self._cachedBytes > self.maxBytes
+
+        if overLimit:
+            self.evict()
+
+        return fetchedImage
+
+    def _read_limited(self, url: str, response) -> bytes:
+        """
+        Read a response in chunks, failing as soon as it turns out to be larger than :attr:`maxImageBytes`
+
+        :raises: InvalidImageException: If the image is too large
+        """
+        declaredLength = response.headers.get("Content-Length")
+        if declaredLength is not None and declaredLength.isdigit() and int(declaredLength) > self.maxImageBytes:
+            raise InvalidImageException(
+                f"'{url}' is {declaredLength} bytes, more than the {self.maxImageBytes} allowed"
+            )
+
+        chunks = []
+        readBytes = 0
+        while True:
+            chunk = response.read(64 * 1024)
+            if not chunk:
+                return b"".join(chunks)
+
+            readBytes += len(chunk)
+            if readBytes > self.maxImageBytes:
+                raise InvalidImageException(f"'{url}' is more than the {self.maxImageBytes} bytes allowed")
+
+            chunks.append(chunk)
+
+    @staticmethod
+    def _write_atomically(path: Path, data: bytes) -> None:
+        temporaryPath = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        temporaryPath.write_bytes(data)
+        os.replace(temporaryPath, path)
@@ -0,0 +1,403 @@
+from __future__ import annotations
+
+import queue
+import random
+import threading
+import time
+import traceback
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+from winrt.windows.ui.notifications import (
+    NotificationData,
+    NotificationUpdateResult,
+    ScheduledToastNotification,
+    ToastNotification,
+)
+
+from .events import ToastActivatedEventArgs, ToastDismissalReason, ToastDismissedEventData, ToastFailedEventData
+
+if TYPE_CHECKING:
+    from .registry import LiveToastRegistry
+    from .toasters import BaseWindowsToaster
+
+TOAST_NOTIFICATION_DROPPED = 0x803E0207
+"""HRESULT of toasts dropped by Windows, e.g. when an app shows too many at once"""
+
+
+class InMemoryToastNotifier:
+    """
+    Stand-in for WinRT's ToastNotifier that keeps toasts in memory rather than displaying them.
+    Useful for tests, benchmarks and for running the daemon headless. Attach it with :meth:`attach`
+    """
+
+    history: InMemoryToastHistory
+    """Stand-in for the Action Center history of the toasts shown through this notifier"""
+    shownCount: int
+    """Number of toasts shown"""
+    updateCount: int
+    """Number of updates applied"""
+    discardedUpdates: int
+    """Number of updates ignored because their sequence number was not newer than the current one"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._notifications: Dict[Tuple[str, str], ToastNotification] = {}
+        self._values: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self._sequenceNumbers: Dict[Tuple[str, str], int] = {}
+        self._scheduled: List[ScheduledToastNotification] = []
+        self.history = InMemoryToastHistory(self)
+        self.shownCount = 0
+        self.updateCount = 0
+        self.discardedUpdates = 0
+        self._toaster: Optional[BaseWindowsToaster] = None
+
+    def attach(self, toaster: BaseWindowsToaster) -> InMemoryToastNotifier:
+        """
+        Make a toaster send its toasts to this notifier and its history calls to :attr:`history`.
+        Simulated events are dispatched to the toaster attached last
+
+        :return: The notifier itself
+        """
+        toaster.toastNotifier = self
+        toaster.toastHistory = self.history
+        self._toaster = toaster
+        return self
+
+    def show(self, notification: ToastNotification) -> None:
+        key = (notification.tag, notification.group)
+        data: Optional[NotificationData] = notification.data
+        with self._lock:
+            self.shownCount += 1
+            self._notifications[key] = notification
+            self._values[key] = {} if data is None else dict(data.values.items())
+            self._sequenceNumbers[key] = 0 if data is None else data.sequence_number
+
+    def hide(self, notification: ToastNotification) -> None:
+        self._forget(notification.tag, notification.group)
+
+    def update_with_tag_and_group(self, data: NotificationData, tag: str, group: str) -> NotificationUpdateResult:
+        key = (tag, group)
+        with self._lock:
+            if key not in self._notifications:
+                return NotificationUpdateResult.NOTIFICATION_NOT_FOUND
+
+            # Like Windows, a sequence number of zero always applies, and otherwise it has to be newer
+            if data.sequence_number != 0 and data.sequence_number <= self._sequenceNumbers[key]:
+                self.discardedUpdates += 1
+                return NotificationUpdateResult.SUCCEEDED
+
+            self.updateCount += 1
+            self._sequenceNumbers[key] = data.sequence_number
+            self._values[key].update(data.values.items())
+
+        return NotificationUpdateResult.SUCCEEDED
+
+    def update_with_tag(self, data: NotificationData, tag: str) -> NotificationUpdateResult:
+        return self.update_with_tag_and_group(data, tag, tag)
+
+    def add_to_schedule(self, scheduledToast: ScheduledToastNotification) -> None:
+        with self._lock:
+            self._scheduled.append(scheduledToast)
+
+    def remove_from_schedule(self, scheduledToast: ScheduledToastNotification) -> None:
+        with self._lock:
+            self._scheduled.remove(scheduledToast)
+
+    def get_scheduled_toast_notifications(self) -> List[ScheduledToastNotification]:
+        with self._lock:
+            return list(self._scheduled)
+
+    def activate(
+        self, tag: str, group: Optional[str] = None, arguments: Optional[str] = None, inputs: Optional[dict] = None
+    ) -> bool:
+        """
+        Simulate the user clicking a toast or one of its buttons, which also removes it
+
+        :param tag: Tag of the toast
+        :param group: Group of the toast. Defaults to the tag, like the toasters do
+        :param arguments: Arguments of the button clicked. Defaults to the tag, like the toast's launch arguments
+        :param inputs: Values of the toast's inputs
+        :return: Whether the toast had callbacks to dispatch to
+        """
+        self._forget(tag, group or tag)
+        return self._require_toaster()._dispatch_activated(
+            tag, group or tag, ToastActivatedEventArgs(tag if arguments is None else arguments, inputs)
+        )
+
+    def dismiss(
+        self, tag: str, group: Optional[str] = None, reason: ToastDismissalReason = ToastDismissalReason.USER_CANCELED
+    ) -> bool:
+        """
+        Simulate a toast being dismissed. Unless it timed out, it is also removed
+
+        :return: Whether the toast had callbacks to dispatch to
+        """
+        if reason != ToastDismissalReason.TIMED_OUT:
+            self._forget(tag, group or tag)
+
+        return self._require_live_toasts().dispatch_dismissed(tag, group or tag, ToastDismissedEventData(reason))
+
+    def fail(self, tag: str, group: Optional[str] = None, errorCode: int = 0x80004005) -> bool:
+        """
+        Simulate a toast failing to display, which also removes it. The toaster's retry policy may show it again
+
+        :param errorCode: HRESULT to fail with. Defaults to E_FAIL
+        :return: Whether the toast had callbacks to dispatch to
+        """
+        self._forget(tag, group or tag)
+        return self._require_toaster()._dispatch_failed(tag, group or tag, ToastFailedEventData(errorCode))
+
+    def values_of(self, tag: str, group: Optional[str] = None) -> Optional[Dict[str, str]]:
+        """
+        The binding values a toast currently displays, or None if it is not being displayed
+
+        :param tag: Tag of the toast
+        :param group: Group of the toast. Defaults to the tag, like the toasters do
+        """
+        with self._lock:
+            values = self._values.get((tag, group or tag))
+            return None if values is None else dict(values)
+
+    def sequence_number_of(self, tag: str, group: Optional[str] = None) -> Optional[int]:
+        """
+        The sequence number of the data a toast currently displays, or None if it is not being displayed
+        """
+        with self._lock:
+            return self._sequenceNumbers.get((tag, group or tag))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._notifications)
+
+    def _require_toaster(self) -> BaseWindowsToaster:
+        if self._toaster is None:
+            raise RuntimeError("The notifier is not attached to a toaster. Use attach() first")
+
+        return self._toaster
+
+    def _require_live_toasts(self) -> LiveToastRegistry:
+        return self._require_toaster().liveToasts
+
+    def _forget(self, tag: str, group: str) -> None:
+        with self._lock:
+            self._notifications.pop((tag, group), None)
+            self._values.pop((tag, group), None)
+            self._sequenceNumbers.pop((tag, group), None)
+
+    def _snapshot(self) -> List[ToastNotification]:
+        with self._lock:
+            return list(self._notifications.values())
+
+
+class SimulatedToastNotifier(InMemoryToastNotifier):
+    """
+    An :class:`InMemoryToastNotifier` that behaves more like Windows under load, to tune delivery settings without a
+    desktop. Bursts beyond a rate limit are dropped, the action center only keeps the most recent toasts of the app,
+    showing takes time, some toasts fail, and scheduled toasts are delivered late and possibly out of order.
+    Failures are dispatched to the toaster from a separate thread, like WinRT's events, so they go through the same
+    on_failed and retry paths as real ones
+
+    :param rateLimit: Toasts per second that can be shown once the burst is used up. None for no limit
+    :param burst: Number of toasts that can be shown at once before the rate limit applies
+    :param historyCapacity: Number of toasts kept in the action center, beyond which the oldest are evicted.
+        Windows keeps 20 per app by default. None for no limit
+    :param showLatency: Returns the seconds each show takes, e.g. ``lambda: random.expovariate(500)``. None for none
+    :param failureRate: Fraction of the toasts that fail rather than being shown
+    :param failureCode: HRESULT the toasts fail with
+    :param dropSilently: Whether toasts beyond the rate limit disappear without an event, as they usually do on
+        Windows. If False, they fail with :data:`TOAST_NOTIFICATION_DROPPED`, which a retry policy retries
+    :param scheduleJitter: Maximum seconds scheduled toasts are delivered after their display time, at random
+    :param seed: Seed of the random choices, so that a simulation can be repeated
+    :param clock: Returns the current time in seconds, for the rate limit and scheduled toasts. Defaults to
+        :func:`time.time`
+    """
+
+    rateLimit: Optional[float]
+    burst: int
+    historyCapacity: Optional[int]
+    failureRate: float
+    failureCode: int
+    dropSilently: bool
+    scheduleJitter: float
+    throttledCount: int
+    """Number of toasts dropped because of the rate limit"""
+    evictedCount: int
+    """Number of toasts evicted from the action center by newer ones"""
+    failedCount: int
+    """Number of toasts that failed"""
+    scheduledDeliveries: int
+    """Number of scheduled toasts delivered"""
+
+    def __init__(
+        self,
+        rateLimit: Optional[float] = None,
+        burst: int = 10,
+        historyCapacity: Optional[int] = 20,
+        showLatency: Optional[Callable[[], float]] = None,
+        failureRate: float = 0.0,
+        failureCode: int = 0x80004005,
+        dropSilently: bool = True,
+        scheduleJitter: float = 0.0,
+        seed: Optional[int] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        super().__init__()
+        self.rateLimit = rateLimit
+        self.burst = burst
+        self.historyCapacity = historyCapacity
+        self.failureRate = failureRate
+        self.failureCode = failureCode
+        self.dropSilently = dropSilently
+        self.scheduleJitter = scheduleJitter
+        self.throttledCount = 0
+        self.evictedCount = 0
+        self.failedCount = 0
+        self.scheduledDeliveries = 0
+        self._showLatency = showLatency
+        self._random = random.Random(seed)
+        self._clock = clock
+        self._tokens = float(burst)
+        self._lastRefill = clock()
+        # Times scheduled toasts are delivered on, including the jitter, by id of the scheduled notification
+        self._deliveryTimes: Dict[int, float] = {}
+        self._events: queue.SimpleQueue = queue.SimpleQueue()
+        self._eventLock = threading.Lock()
+        self._eventThread: Optional[threading.Thread] = None
+
+    def show(self, notification: ToastNotification) -> None:
+        if self._showLatency is not None:
+            time.sleep(max(0.0, self._showLatency()))
+
+        key = (notification.tag, notification.group)
+        errorCode = None
+        with self._lock:
+            if not self._take_token():
+                self.throttledCount += 1
+                if self.dropSilently:
+                    return
+
+                errorCode = TOAST_NOTIFICATION_DROPPED
+            elif self.failureRate and self._random.random() < self.failureRate:
+                self.failedCount += 1
+                errorCode = self.failureCode
+            else:
+                # Showing a toast again moves it to the top of the action center
+                self._notifications.pop(key, None)
+
+        if errorCode is not None:
+            failedEvent = ToastFailedEventData(errorCode)
+            self._queue_event(lambda: self._require_toaster()._dispatch_failed(*key, failedEvent))
+            return
+
+        super().show(notification)
+
+        with self._lock:
+            while self.historyCapacity is not None and len(self._notifications) > self.historyCapacity:
+                oldestKey = next(iter(self._notifications))
+                del self._notifications[oldestKey]
+                self._values.pop(oldestKey, None)
+                self._sequenceNumbers.pop(oldestKey, None)
+                self.evictedCount += 1
+
+    def add_to_schedule(self, scheduledToast: ScheduledToastNotification) -> None:
+        deliveryTime = scheduledToast.delivery_time.timestamp() + self._random.random() * self.scheduleJitter
+        with self._lock:
+            self._deliveryTimes[id(scheduledToast)] = deliveryTime
+            self._scheduled.append(scheduledToast)
+
+    def remove_from_schedule(self, scheduledToast: ScheduledToastNotification) -> None:
+        with self._lock:
+            self._scheduled.remove(scheduledToast)
+            self._deliveryTimes.pop(id(scheduledToast), None)
+
+    def deliver_scheduled(self) -> int:
+        """
+        Show the scheduled toasts that are due, in the order of their delivery times, which includes the jitter.
+        They go through the rate limit and history capacity like any other toast
+
+        :return: Number of toasts delivered
+        """
+        now = self._clock()
+        with self._lock:
+            dueToasts = sorted(
+                (
+                    (self._deliveryTimes[id(scheduledToast)], i, scheduledToast)
+                    for i, scheduledToast in enumerate(self._scheduled)
+                    if self._deliveryTimes[id(scheduledToast)] <= now
+                ),
+                key=lambda due: due[:2],
+            )
+            for _, _, scheduledToast in dueToasts:
+                self._scheduled.remove(scheduledToast)
+                del self._deliveryTimes[id(scheduledToast)]
+            self.scheduledDeliveries += len(dueToasts)
+
+        for _, _, scheduledToast in dueToasts:
+            notification = ToastNotification(scheduledToast.content)
+            notification.tag = scheduledToast.tag
+            notification.group = scheduledToast.group
+            self.show(notification)
+
+        return len(dueToasts)
+
+    def flush_events(self) -> None:
+        """
+        Wait until the events queued so far have been dispatched
+        """
+        dispatched = threading.Event()
+        self._queue_event(dispatched.set)
+        dispatched.wait()
+
+    def _take_token(self) -> bool:
+        if self.rateLimit is None:
+            return True
+
+        now = self._clock()
+        self._tokens = min(float(self.burst), self._tokens + (now - self._lastRefill) * self.rateLimit)
+        self._lastRefill = now
+        if self._tokens < 1:
+            return False
+
+        self._tokens -= 1
+        return True
+
+    def _queue_event(self, dispatch: Callable[[], object]) -> None:
+        self._events.put(dispatch)
+        with self._eventLock:
+            if self._eventThread is None:
+                self._eventThread = threading.Thread(target=self._event_loop, name="SimulatedToastEvents", daemon=True)
+                self._eventThread.start()
+
+    def _event_loop(self) -> None:
+        while True:
+            dispatch = self._events.get()
+            try:
+                dispatch()
+            except Exception:
+                # Like WinRT, an exception in a handler does not stop later events
+                traceback.print_exc()
+
+
+class InMemoryToastHistory:
+    """
+    Stand-in for WinRT's ToastNotificationHistory, backed by an :class:`InMemoryToastNotifier`.
+    Since a notifier belongs to a single AUMID, the AUMID arguments are accepted but ignored
+    """
+
+    def __init__(self, notifier: InMemoryToastNotifier) -> None:
+        self._notifier = notifier
+
+    def get_history_with_id(self, _: str) -> List[ToastNotification]:
+        return self._notifier._snapshot()
+
+    def clear_with_id(self, _: str) -> None:
+        for notification in self._notifier._snapshot():
+            self._notifier._forget(notification.tag, notification.group)
+
+    def remove_grouped_tag_with_id(self, tag: str, group: str, _: str) -> None:
+        self._notifier._forget(tag, group)
+
+    def remove_group_with_id(self, group: str, _: str) -> None:
+        for notification in self._notifier._snapshot():
+            if notification.group == group:
+                self._notifier._forget(notification.tag, group)
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, Optional
+
+from .toast import Toast
+from .toasters import BaseWindowsToaster
+from .wrappers import ToastProgressBar
+
+
+class ToastProgressGroup:
+    """
+    Combined progress of any number of tasks, displayed as a single progress toast.
+    Created through :meth:`ToastProgressAggregator.group`; reporting is thread-safe and never touches WinRT
+    """
+
+    name: str
+    """Name of the group"""
+    toast: Toast
+    """The toast displaying the group's progress"""
+    statusFormat: str
+    """Format of the status text. Receives done, total, unit and percent"""
+    unit: str
+    """What is being counted, e.g. "files" """
+
+    def __init__(
+        self, aggregator: ToastProgressAggregator, name: str, toast: Toast, total: int, unit: str, statusFormat: str
+    ) -> None:
+        self.name = name
+        self.toast = toast
+        self.unit = unit
+        self.statusFormat = statusFormat
+        self._aggregator = aggregator
+        self._lock = threading.Lock()
+        # Serializes pushes, so that a flush still running cannot overwrite the final push
+        self._pushLock = threading.Lock()
+        self._done = 0
+        self._total = total
+        self._dirty = False
+        self._finished = False
+
+    @property
+    def done(self) -> int:
+        """Number of units completed so far"""
+        return self._done
+
+    @property
+    def total(self) -> int:
+        """Number of units expected in total"""
+        return self._total
+
+    def advance(self, amount: int = 1) -> None:
+        """
+        Report that amount more units have been completed
+
+        :param amount: Number of units completed
+        """
+        with self._lock:
+            self._done += amount
+            self._mark_dirty()
+
+    def add_total(self, amount: int) -> None:
+        """
+        Report that amount more units are expected, e.g. when tasks discover more work
+
+        :param amount: Number of units to add to the total
+        """
+        with self._lock:
+            self._total += amount
+            self._mark_dirty()
+
+    def finish(self, status: Optional[str] = None) -> bool:
+        """
+        Push the final progress immediately and stop tracking the group
+
+        :param status: Status text to display instead of the formatted one, e.g. "Done!"
+        :return: Whether the final update succeeded
+        """
+        with self._lock:
+            self._finished = True
+            self._dirty = False
+
+        self._aggregator._forget(self)
+        return self._push(status, True)
+
+    def _mark_dirty(self) -> None:
+        # Called with the lock held. Only wake the flusher on the first report since its last push
+        if not self._dirty and not self._finished:
+            self._dirty = True
+            self._aggregator._wake()
+
+    def _snapshot(self) -> tuple[int, int]:
+        with self._lock:
+            self._dirty = False
+            return self._done, self._total
+
+    def _build_progress_bar(self, done: int, total: int, status: Optional[str] = None) -> ToastProgressBar:
+        progress = 1.0 if total <= 0 else min(done / total, 1.0)
+        if status is None:
+            status = self.statusFormat.format(done=done, total=total, unit=self.unit, percent=round(progress * 100))
+
+        currentBar = self.toast.progress_bar
+        return ToastProgressBar(status, None if currentBar is None else currentBar.caption, progress)
+
+    def _push(self, status: Optional[str] = None, final: bool = False) -> bool:
+        with self._pushLock:
+            if self._finished and not final:
+                return False
+
+            done, total = self._snapshot()
+            self.toast.progress_bar = self._build_progress_bar(done, total, status)
+            return self._aggregator.toaster.update_toast(self.toast)
+
+
+class ToastProgressAggregator:
+    """
+    Keeps one progress toast per group of tasks and pushes their combined progress at a bounded rate from a single
+    background thread, however many tasks report progress
+
+    :param toaster: Toaster to show and update the progress toasts with
+    :param minInterval: Minimum number of seconds between two pushes
+    """
+
+    toaster: BaseWindowsToaster
+    minInterval: float
+
+    def __init__(self, toaster: BaseWindowsToaster, minInterval: float = 0.5) -> None:
+        self.toaster = toaster
+        self.minInterval = minInterval
+        self._groups: Dict[str, ToastProgressGroup] = {}
+        self._groupsLock = threading.Lock()
+        self._pending = threading.Event()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._flush_loop, name="ToastProgressAggregator", daemon=True)
+        self._thread.start()
+
+    def group(
+        self,
+        name: str,
+        total: int,
+        title: Optional[str] = None,
+        unit: str = "items",
+        toast: Optional[Toast] = None,
+        statusFormat: str = "{done} of {total} {unit}",
+    ) -> ToastProgressGroup:
+        """
+        Show a progress toast for a new group, or return the group if it already exists
+
+        :param name: Name of the group. Also used as the toast's group
+        :param total: Number of units expected in total
+        :param title: Caption for the progress bar
+        :param unit: What is being counted, e.g. "files"
+        :param toast: Toast to display the progress on. If None, one is created with the title as its text
+        :param statusFormat: Format of the status text. Receives done, total, unit and percent
+        """
+        with self._groupsLock:
+            if name in self._groups:
+                return self._groups[name]
+
+            if toast is None:
+                toast = Toast([title or name])
+            if toast.group is None:
+                toast.group = name
+
+            progressGroup = ToastProgressGroup(self, name, toast, total, unit, statusFormat)
+            progressBar = progressGroup._build_progress_bar(0, total)
+            if title is not None:
+                progressBar.caption = title
+
+            toast.progress_bar = progressBar
+            self._groups[name] = progressGroup
+
+        # Progress is updated through the bindings, so the toast cannot be static
+        self.toaster.show_toast(toast, False)
+        return progressGroup
+
+    def flush(self) -> None:
+        """
+        Push every group with unpushed progress immediately
+        """
+        with self._groupsLock:
+            groups = list(self._groups.values())
+
+        for progressGroup in groups:
+            if progressGroup._dirty:
+                progressGroup._push()
+
+    def close(self) -> None:
+        """
+        Stop the background thread, pushing any outstanding progress first
+        """
+        self._closed.set()
+        self._pending.set()
+        self._thread.join()
+        self.flush()
+
+    def __enter__(self) -> ToastProgressAggregator:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def _wake(self) -> None:
+        self._pending.set()
+
+    def _forget(self, progressGroup: ToastProgressGroup) -> None:
+        with self._groupsLock:
+            if self._groups.get(progressGroup.name) is progressGroup:
+                del self._groups[progressGroup.name]
+
+    def _flush_loop(self) -> None:
+        while not self._closed.is_set():
+            self._pending.wait()
+            self._pending.clear()
+            if self._closed.is_set():
+                return
+
+            self.flush()
+            # Reports arriving in the meantime set the event again and are picked up in the next push
+            self._closed.wait(self.minInterval)
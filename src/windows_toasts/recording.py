@@ -0,0 +1,421 @@
+from __future__ import annotations
+
+import collections
+import json
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, OrderedDict, Tuple, Union
+
+from .exceptions import ToastSerializationError
+from .handle import ToastHandle
+from .serialization import _decode_value, _encode_value, _read_varint, _write_varint, toast_from_dict, toast_to_dict
+from .toast import Toast
+from .toasters import BaseWindowsToaster, ToasterObserver
+
+RECORDING_MAGIC = b"WTR\x01"
+"""Prefix of every recording written by :class:`TrafficRecorder`"""
+
+REPLAY_PERCENTILES = (50, 90, 99, 100)
+"""Latency percentiles reported by :func:`replay_traffic`"""
+
+
+def _redact(text: Any) -> Any:
+    # Keeps the length, and with it the size of the payload, but not the content
+    return "x" * len(text) if isinstance(text, str) else text
+
+
+def _redact_uri(uri: Any) -> Any:
+    # Keeps the scheme, so that replayed images are still told apart from online ones
+    if not isinstance(uri, str):
+        return uri
+
+    scheme, separator, location = uri.partition("://")
+    return scheme + separator + _redact(location) if separator else _redact(uri)
+
+
+def _redact_fields(shapeDict: dict, fieldNames: Tuple[str, ...]) -> None:
+    for fieldName in fieldNames:
+        if fieldName in shapeDict:
+            shapeDict[fieldName] = _redact(shapeDict[fieldName])
+
+
+def _toast_shape(toast: Toast, redact: bool) -> dict:
+    shape = toast_to_dict(toast, None, False)
+    del shape["tag"]
+    shape.pop("group", None)
+    if not redact:
+        return shape
+
+    if "text_fields" in shape:
+        shape["text_fields"] = [_redact(text) for text in shape["text_fields"]]
+    _redact_fields(shape, ("attribution_text", "launch_action"))
+    if "progress_bar" in shape:
+        _redact_fields(shape["progress_bar"], ("status", "caption", "progress_override"))
+    for imageDict in shape.get("images", ()):
+        imageDict["image"] = _redact_uri(imageDict["image"])
+        _redact_fields(imageDict, ("altText",))
+    for inputDict in shape.get("inputs", ()):
+        _redact_fields(inputDict, ("caption", "placeholder"))
+        # Selection IDs are kept, since they are often meaningful to the app, e.g. minutes to snooze for
+        if "selections" in inputDict:
+            inputDict["selections"] = [
+                [selectionId, _redact(content)] for selectionId, content in inputDict["selections"]
+            ]
+    for actionDict in shape.get("actions", ()):
+        _redact_fields(actionDict, ("content", "arguments", "tooltip"))
+        if "image" in actionDict:
+            actionDict["image"] = _redact_uri(actionDict["image"])
+    if "audio" in shape:
+        _redact_fields(shape["audio"], ("path",))
+
+    return shape
+
+
+class TrafficRecorder(ToasterObserver):
+    """
+    Records a toaster's traffic to a compact file: the shape of every toast shown or scheduled, the time between
+    operations, and the updates and removals of every tag, so that it can be replayed with :func:`replay_traffic`.
+    Each distinct shape is only written once. Callbacks are not recorded, and the binding values of updates are not
+    known to observers, so replayed updates send the text fields the toast was shown with
+
+    :param toaster: Toaster whose traffic to record
+    :param path: File to append the recording to
+    :param redact: Whether to replace the toasts' texts, launch arguments, buttons, inputs, progress bars and image
+        and audio paths with placeholders of the same length, so that the recording keeps the sizes of production
+        toasts but not their content
+    :param maxShapes: Number of distinct shapes to remember. Shapes forgotten, least recently used first, are
+        written again the next time they are seen, which bounds the recorder's memory when toasts rarely repeat
+    """
+
+    toaster: BaseWindowsToaster
+    path: Path
+    redact: bool
+    maxShapes: int
+    recordCount: int
+    """Number of operations recorded"""
+
+    def __init__(
+        self, toaster: BaseWindowsToaster, path: Union[str, os.PathLike], redact: bool = True, maxShapes: int = 4096
+    ) -> None:
+        self.toaster = toaster
+        self.path = Path(path)
+        self.redact = redact
+        self.maxShapes = maxShapes
+        self.recordCount = 0
+        self._lock = threading.Lock()
+        self._shapeIds: OrderedDict[str, int] = collections.OrderedDict()
+        self._nextShapeId = 0
+        self._lastTime = time.monotonic()
+        isNew = not self.path.exists() or self.path.stat().st_size == 0
+        self._file = open(self.path, "ab")
+        if isNew:
+            self._file.write(RECORDING_MAGIC)
+
+        toaster.add_observer(self)
+
+    def close(self) -> None:
+        """
+        Stop recording and close the file
+        """
+        self.toaster.remove_observer(self)
+        with self._lock:
+            self._file.close()
+
+    def flush(self) -> None:
+        """
+        Write the buffered records to the file
+        """
+        with self._lock:
+            self._file.flush()
+
+    def __enter__(self) -> TrafficRecorder:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def toast_shown(self, toast: Toast, group: str) -> None:
+        self._record("show", toast.tag, group, toast)
+
+    def toast_updated(self, tag: str, group: str, succeeded: bool) -> None:
+        self._record("update", tag, group)
+
+    def toast_removed(self, tag: str, group: str) -> None:
+        self._record("remove", tag, group)
+
+    def group_removed(self, group: str) -> None:
+        self._record("remove_group", None, group)
+
+    def toasts_cleared(self) -> None:
+        self._record("clear")
+
+    def toast_scheduled(self, toast: Toast, displayTime: datetime) -> None:
+        self._record(
+            "schedule", toast.tag, toast.group or toast.tag, toast, (displayTime - datetime.now()).total_seconds()
+        )
+
+    def toast_unscheduled(self, tag: str) -> None:
+        self._record("unschedule", tag)
+
+    def _record(
+        self,
+        operation: str,
+        tag: Optional[str] = None,
+        group: Optional[str] = None,
+        toast: Optional[Toast] = None,
+        displayDelay: Optional[float] = None,
+    ) -> None:
+        shape = None if toast is None else _toast_shape(toast, self.redact)
+        out = bytearray()
+        with self._lock:
+            if self._file.closed:
+                return
+
+            shapeId = None
+            if shape is not None:
+                shapeKey = json.dumps(shape, sort_keys=True)
+                shapeId = self._shapeIds.get(shapeKey)
+                if shapeId is None:
+                    # IDs are never reused, so that a shape written again does not change what earlier records refer to
+                    shapeId = self._shapeIds[shapeKey] = self._nextShapeId
+                    self._nextShapeId += 1
+                    if len(self._shapeIds) > self.maxShapes:
+                        self._shapeIds.popitem(last=False)
+                    _write_frame(out, ["shape", shapeId, shape])
+                else:
+                    self._shapeIds.move_to_end(shapeKey)
+
+            now = time.monotonic()
+            # Microseconds since the previous record, which stay small varints
+            elapsedMicroseconds = round((now - self._lastTime) * 1e6)
+            self._lastTime = now
+            # The group is left out when it defaults to the tag
+            _write_frame(
+                out, [operation, elapsedMicroseconds, tag, None if group == tag else group, shapeId, displayDelay]
+            )
+            self._file.write(out)
+            self.recordCount += 1
+
+
+def _write_frame(out: bytearray, record: list) -> None:
+    encoded = bytearray()
+    _encode_value(encoded, record)
+    _write_varint(out, len(encoded))
+    out += encoded
+
+
+@dataclass
+class TrafficRecord:
+    """
+    An operation read from a recording by :func:`read_recording`
+    """
+
+    operation: str
+    """One of "show", "update", "remove", "remove_group", "clear", "schedule" and "unschedule" """
+    offset: float
+    """Seconds since the start of the recording"""
+    tag: Optional[str]
+    """Tag of the toast, if the operation concerns one"""
+    group: Optional[str]
+    """Group of the toast or of the operation, if any"""
+    shape: Optional[dict] = None
+    """The toast shown or scheduled, in the format of :func:`~windows_toasts.serialization.toast_to_dict` without
+    its tag, group or callbacks"""
+    displayDelay: Optional[float] = None
+    """Seconds from scheduling a toast to its display time"""
+
+
+def read_recording(path: Union[str, os.PathLike]) -> Iterator[TrafficRecord]:
+    """
+    Read a recording written by :class:`TrafficRecorder`. A record cut short, e.g. by a crash, ends the recording
+
+    :raises: ToastSerializationError: If the file is not a recording
+    """
+    data = Path(path).read_bytes()
+    if data[: len(RECORDING_MAGIC)] != RECORDING_MAGIC:
+        raise ToastSerializationError(f"{path} is not a toast traffic recording")
+
+    shapes: Dict[int, dict] = {}
+    offset = len(RECORDING_MAGIC)
+    elapsed = 0.0
+    while offset < len(data):
+        try:
+            length, offset = _read_varint(data, offset)
+            frameEnd = offset + length
+            if frameEnd > len(data):
+                return
+
+            record, offset = _decode_value(data, offset)
+        except (IndexError, UnicodeDecodeError) as e:
+            raise ToastSerializationError(f"Corrupt recording {path}: {e!r}") from e
+
+        if offset != frameEnd:
+            raise ToastSerializationError(f"Corrupt recording {path}: record ends at {offset}, expected {frameEnd}")
+
+        if record[0] == "shape":
+            shapes[record[1]] = record[2]
+            continue
+
+        operation, elapsedMicroseconds, tag, group, shapeId, displayDelay = record
+        elapsed += elapsedMicroseconds / 1e6
+        yield TrafficRecord(
+            operation,
+            elapsed,
+            tag,
+            tag if group is None else group,
+            None if shapeId is None else shapes[shapeId],
+            displayDelay,
+        )
+
+
+@dataclass
+class ReplayReport:
+    """
+    How a toaster coped with a recording replayed by :func:`replay_traffic`
+    """
+
+    operations: int
+    """Number of operations replayed"""
+    elapsed: float
+    """Seconds the replay took"""
+    errors: Dict[str, int] = field(default_factory=dict)
+    """Number of operations that raised, per operation"""
+    latencies: Dict[str, Dict[int, float]] = field(default_factory=dict)
+    """Seconds each operation took once picked up by a worker, as percentiles (see :data:`REPLAY_PERCENTILES`),
+    per operation"""
+    maxQueueDepth: int = 0
+    """Largest number of operations waiting for a worker"""
+    meanLag: float = 0.0
+    """Mean seconds an operation was picked up after its time in the recording, scaled by the speed"""
+    maxLag: float = 0.0
+    """Largest seconds an operation was picked up after its time"""
+
+    @property
+    def throughput(self) -> float:
+        """Operations per second"""
+        return self.operations / self.elapsed if self.elapsed else 0.0
+
+
+def _percentiles(samples: List[float]) -> Dict[int, float]:
+    samples.sort()
+    return {
+        percentile: samples[min(len(samples) - 1, len(samples) * percentile // 100)]
+        for percentile in REPLAY_PERCENTILES
+    }
+
+
+class _Replayer:
+    def __init__(self, toaster: BaseWindowsToaster, speed: float) -> None:
+        self.toaster = toaster
+        self.speed = speed
+        self.lock = threading.Lock()
+        # Handles and text fields of the toasts shown so far, to update them with
+        self.shown: Dict[str, Tuple[ToastHandle, Optional[List[str]]]] = {}
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.lags: List[float] = []
+
+    def work(self, records: queue.SimpleQueue) -> None:
+        while True:
+            item = records.get()
+            if item is None:
+                return
+
+            dueTime, record = item
+            startTime = time.perf_counter()
+            try:
+                self.apply(record)
+            except Exception:
+                with self.lock:
+                    self.errors[record.operation] = self.errors.get(record.operation, 0) + 1
+            finishTime = time.perf_counter()
+            with self.lock:
+                self.latencies.setdefault(record.operation, []).append(finishTime - startTime)
+                self.lags.append(max(0.0, startTime - dueTime))
+
+    def apply(self, record: TrafficRecord) -> None:
+        if record.operation in ("show", "schedule"):
+            toast = toast_from_dict(record.shape)
+            toast.tag = record.tag
+            toast.group = None if record.group == record.tag else record.group
+            if record.operation == "schedule":
+                displayTime = datetime.now() + timedelta(seconds=record.displayDelay / self.speed)
+                self.toaster.schedule_toast(toast, displayTime)
+            else:
+                self.shown[record.tag] = (self.toaster.show_toast(toast), record.shape.get("text_fields"))
+        elif record.operation == "update":
+            toastHandle, textFields = self.shown[record.tag]
+            toastHandle.update(textFields)
+        elif record.operation == "remove":
+            self.shown.pop(record.tag, None)
+            self.toaster._remove_by_tag(record.tag, record.group)
+        elif record.operation == "remove_group":
+            self.toaster.remove_toast_group(record.group)
+        elif record.operation == "clear":
+            self.shown.clear()
+            self.toaster.clear_toasts()
+        elif record.operation == "unschedule":
+            toast = Toast()
+            toast.tag = record.tag
+            self.toaster.unschedule_toast(toast)
+
+
+def replay_traffic(
+    path: Union[str, os.PathLike], toaster: BaseWindowsToaster, speed: float = 1.0, workers: int = 1
+) -> ReplayReport:
+    """
+    Replay a recording against a toaster, usually one attached to an
+    :class:`~windows_toasts.notifiers.InMemoryToastNotifier`, to see how it copes with production load.
+    Operations are queued at their time in the recording, divided by the speed, and applied by the workers.
+    The operations of a group always go to the same worker, so they are applied in order
+
+    :param path: Recording written by :class:`TrafficRecorder`
+    :param toaster: Toaster to replay the recording against
+    :param speed: How much faster than recorded to replay, e.g. 10 or 100
+    :param workers: Number of threads applying the operations
+    :return: Throughput, latencies and queueing of the replay
+    """
+    records = list(read_recording(path))
+    replayer = _Replayer(toaster, speed)
+    workerQueues: List[queue.SimpleQueue] = [queue.SimpleQueue() for _ in range(workers)]
+    workerThreads = [
+        threading.Thread(target=replayer.work, args=(workerQueue,), name=f"TrafficReplay-{i}", daemon=True)
+        for i, workerQueue in enumerate(workerQueues)
+    ]
+    for workerThread in workerThreads:
+        workerThread.start()
+
+    maxQueueDepth = 0
+    startTime = time.perf_counter()
+    for record in records:
+        dueTime = startTime + record.offset / speed
+        delay = dueTime - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+        # Scheduled toasts are only referred to by tag, and clearing goes through the first worker
+        routingKey = record.tag if record.operation in ("schedule", "unschedule") else record.group
+        workerQueue = workerQueues[hash(routingKey) % workers if routingKey is not None else 0]
+        workerQueue.put((dueTime, record))
+        maxQueueDepth = max(maxQueueDepth, sum(pendingQueue.qsize() for pendingQueue in workerQueues))
+
+    for workerQueue in workerQueues:
+        workerQueue.put(None)
+    for workerThread in workerThreads:
+        workerThread.join()
+    elapsed = time.perf_counter() - startTime
+
+    return ReplayReport(
+        len(records),
+        elapsed,
+        replayer.errors,
+        {operation: _percentiles(samples) for operation, samples in replayer.latencies.items()},
+        maxQueueDepth,
+        sum(replayer.lags) / len(replayer.lags) if replayer.lags else 0.0,
+        max(replayer.lags, default=0.0),
+    )
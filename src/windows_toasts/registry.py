@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import heapq
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from winrt.windows.ui.notifications import ToastNotification
+
+from .events import ToastActivatedEventArgs, ToastDismissalReason
+from .toast import Toast
+
+DEFAULT_LIFETIME = 3 * 24 * 60 * 60
+"""Seconds a toast without an expiration time is tracked for, which is how long Windows keeps it by default"""
+
+
+class LiveToastEntry:
+    """
+    What a toaster keeps of a shown toast until it reaches a terminal state: its callbacks, a weak reference to it
+    and the registration tokens of the WinRT event handlers
+    """
+
+    __slots__ = (
+        "tag",
+        "group",
+        "expiresAt",
+        "on_activated",
+        "on_dismissed",
+        "on_failed",
+        "_toastRef",
+        "_notification",
+        "_tokens",
+    )
+
+    tag: str
+    group: str
+    expiresAt: float
+    """Time (as in :func:`time.time`) after which the toast is released even if no terminal event was received"""
+
+    def __init__(
+        self,
+        toast: Toast,
+        group: str,
+        expiresAt: float,
+        notification: Optional[ToastNotification] = None,
+        tokens: Tuple[Any, Any, Any] = (None, None, None),
+    ) -> None:
+        self.tag = toast.tag
+        self.group = group
+        self.expiresAt = expiresAt
+        self.on_activated = toast.on_activated
+        self.on_dismissed = toast.on_dismissed
+        self.on_failed = toast.on_failed
+        self._toastRef = weakref.ref(toast)
+        self._notification = notification
+        self._tokens = tokens
+
+    @property
+    def toast(self) -> Optional[Toast]:
+        """The toast, if it is still referenced elsewhere"""
+        return self._toastRef()
+
+    @property
+    def notification(self) -> Optional[ToastNotification]:
+        """The ToastNotification shown, if event handlers were added to it and it has not been released"""
+        return self._notification
+
+    def callback(self, eventName: str) -> Optional[Callable[[Any], None]]:
+        # Prefer the toast's current callback, so that callbacks assigned after showing it still work
+        toast = self._toastRef()
+        if toast is not None:
+            return getattr(toast, eventName)
+
+        return getattr(self, eventName)
+
+    def _unregister_handlers(self) -> int:
+        # Returns the number of handlers removed, so that releasing an entry twice is harmless
+        notification = self._notification
+        if notification is None:
+            return 0
+
+        self._notification = None
+        activatedToken, dismissedToken, failedToken = self._tokens
+        removedCount = 0
+        if activatedToken is not None:
+            notification.remove_activated(activatedToken)
+            removedCount += 1
+        if dismissedToken is not None:
+            notification.remove_dismissed(dismissedToken)
+            removedCount += 1
+        if failedToken is not None:
+            notification.remove_failed(failedToken)
+            removedCount += 1
+
+        return removedCount
+
+
+class LiveToastRegistry:
+    """
+    Tracks the toasts a toaster has shown until they are activated, dismissed, fail, expire or are removed, and routes
+    their WinRT events to their callbacks. Toasts are only referenced weakly, and entries are released as soon as they
+    reach a terminal state, unregistering their WinRT event handlers, so long-running processes do not accumulate state
+
+    :param defaultLifetime: Seconds to keep toasts without an expiration time for
+    :param onRelease: Called with the tag and group of every toast released, e.g. to drop other state kept for it
+    """
+
+    defaultLifetime: float
+    releasedCount: int
+    """Number of toasts released so far"""
+    handlersRegistered: int
+    """Number of WinRT event handlers registered through :meth:`register`"""
+    handlersUnregistered: int
+    """Number of WinRT event handlers unregistered on release"""
+
+    def __init__(
+        self, defaultLifetime: float = DEFAULT_LIFETIME, onRelease: Optional[Callable[[str, str], None]] = None
+    ) -> None:
+        self.defaultLifetime = defaultLifetime
+        self._onRelease = onRelease
+        self.releasedCount = 0
+        self.handlersRegistered = 0
+        self.handlersUnregistered = 0
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], LiveToastEntry] = {}
+        # Expiry times, swept a few at a time whenever toasts are registered or looked up
+        self._expiries: List[Tuple[float, str, str]] = []
+
+    @property
+    def liveCount(self) -> int:
+        """Number of toasts currently tracked"""
+        return len(self._entries)
+
+    @property
+    def leakedHandlers(self) -> int:
+        """Number of WinRT event handlers still registered. Should stay proportional to :attr:`liveCount`"""
+        return self.handlersRegistered - self.handlersUnregistered
+
+    def register(
+        self,
+        toast: Toast,
+        group: str,
+        notification: Optional[ToastNotification] = None,
+        tokens: Tuple[Any, Any, Any] = (None, None, None),
+    ) -> LiveToastEntry:
+        """
+        Start tracking a toast that is being shown, replacing any previous toast with the same tag and group
+
+        :param toast: Toast being shown
+        :param group: Group it is being shown with
+        :param notification: The ToastNotification the event handlers were added to
+        :param tokens: The tokens returned by add_activated, add_dismissed and add_failed, or None for those not added.
+            The handlers are removed when the toast is released
+        """
+        expiresAt = time.time() + self.defaultLifetime
+        if toast.expiration_time is not None:
+            expiresAt = toast.expiration_time.timestamp()
+
+        entry = LiveToastEntry(toast, group, expiresAt, notification, tokens)
+        with self._lock:
+            releasedEntries = self._sweep(time.time())
+            previousEntry = self._entries.pop((entry.tag, group), None)
+            if previousEntry is not None:
+                self.releasedCount += 1
+
+            self._entries[(entry.tag, group)] = entry
+            heapq.heappush(self._expiries, (expiresAt, entry.tag, group))
+            self._compact()
+            self.handlersRegistered += sum(token is not None for token in tokens) if notification is not None else 0
+
+        self._finish_release(releasedEntries)
+        if previousEntry is not None:
+            # The toast was shown again, so only the old notification's handlers are stale
+            self._finish_release((previousEntry,), False)
+
+        return entry
+
+    def get(self, tag: str, group: str) -> Optional[LiveToastEntry]:
+        """
+        The entry of a live toast, or None if it is not tracked (anymore)
+        """
+        with self._lock:
+            releasedEntries = self._sweep(time.time())
+            entry = self._entries.get((tag, group))
+
+        self._finish_release(releasedEntries)
+        return entry
+
+    def release(self, tag: str, group: str) -> Optional[LiveToastEntry]:
+        """
+        Stop tracking a toast
+
+        :return: Its entry, or None if it was not tracked
+        """
+        with self._lock:
+            entry = self._entries.pop((tag, group), None)
+            if entry is None:
+                return None
+
+            self.releasedCount += 1
+
+        self._finish_release((entry,))
+        return entry
+
+    def release_group(self, group: str) -> List[LiveToastEntry]:
+        """
+        Stop tracking every toast in a group
+
+        :return: Their entries
+        """
+        with self._lock:
+            releasedEntries = [entry for key, entry in self._entries.items() if key[1] == group]
+            for entry in releasedEntries:
+                del self._entries[(entry.tag, group)]
+
+            self.releasedCount += len(releasedEntries)
+
+        self._finish_release(releasedEntries)
+        return releasedEntries
+
+    def clear(self) -> List[LiveToastEntry]:
+        """
+        Stop tracking all toasts
+
+        :return: Their entries
+        """
+        with self._lock:
+            releasedEntries = list(self._entries.values())
+            self._entries.clear()
+            self._expiries.clear()
+            self.releasedCount += len(releasedEntries)
+
+        self._finish_release(releasedEntries)
+        return releasedEntries
+
+    def sweep(self) -> int:
+        """
+        Release every toast that has expired. This also happens gradually as toasts are registered and looked up
+
+        :return: Number of toasts released
+        """
+        with self._lock:
+            releasedEntries = self._sweep(time.time(), None)
+
+        self._finish_release(releasedEntries)
+        return len(releasedEntries)
+
+    def dispatch_activated(self, tag: str, group: str, eventArgs: ToastActivatedEventArgs) -> bool:
+        """
+        Call a toast's on_activated and release it
+
+        :return: Whether the toast was tracked
+        """
+        return self._dispatch(tag, group, "on_activated", eventArgs, True)
+
+    def dispatch_dismissed(self, tag: str, group: str, eventArgs: Any) -> bool:
+        """
+        Call a toast's on_dismissed. The toast is released unless it timed out, since it can then still be activated
+        from the action center
+
+        :param eventArgs: WinRT's ToastDismissedEventArgs, or a :class:`~windows_toasts.events.ToastDismissedEventData`
+        :return: Whether the toast was tracked
+        """
+        terminal = ToastDismissalReason(eventArgs.reason) != ToastDismissalReason.TIMED_OUT
+        return self._dispatch(tag, group, "on_dismissed", eventArgs, terminal)
+
+    def dispatch_failed(self, tag: str, group: str, eventArgs: Any) -> bool:
+        """
+        Call a toast's on_failed and release it
+
+        :param eventArgs: WinRT's ToastFailedEventArgs, or a :class:`~windows_toasts.events.ToastFailedEventData`
+        :return: Whether the toast was tracked
+        """
+        return self._dispatch(tag, group, "on_failed", eventArgs, True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        return key in self._entries
+
+    def _dispatch(self, tag: str, group: str, eventName: str, eventArgs: Any, terminal: bool) -> bool:
+        entry = self.release(tag, group) if terminal else self.get(tag, group)
+        if entry is None:
+            return False
+
+        # Called outside the lock, so that callbacks can show or remove toasts themselves
+        callback = entry.callback(eventName)
+        if callback is not None:
+            callback(eventArgs)
+
+        return True
+
+    def _sweep(self, now: float, limit: Optional[int] = 8) -> List[LiveToastEntry]:
+        # Called with the lock held. Releasing a bounded number of toasts per call keeps registering cheap
+        releasedEntries: List[LiveToastEntry] = []
+        while self._expiries and self._expiries[0][0] <= now and (limit is None or len(releasedEntries) < limit):
+            expiresAt, tag, group = heapq.heappop(self._expiries)
+            entry = self._entries.get((tag, group))
+            # Skip toasts that were already released or shown again since
+            if entry is not None and entry.expiresAt == expiresAt:
+                del self._entries[(tag, group)]
+                releasedEntries.append(entry)
+
+        self.releasedCount += len(releasedEntries)
+        return releasedEntries
+
+    def _finish_release(self, releasedEntries: Iterable[LiveToastEntry], notify: bool = True) -> None:
+        # Called without the lock held, since WinRT may be running one of the handlers being removed
+        removedCount = 0
+        for entry in releasedEntries:
+            removedCount += entry._unregister_handlers()
+            if notify and self._onRelease is not None:
+                self._onRelease(entry.tag, entry.group)
+
+        if removedCount:
+            with self._lock:
+                self.handlersUnregistered += removedCount
+
+    def _compact(self) -> None:
+        # Expiry times of released toasts stay in the heap until they are due; rebuild it if they pile up
+        if len(self._expiries) > 2 * len(self._entries) + 64:
+            self._expiries = [(entry.expiresAt, entry.tag, entry.group) for entry in self._entries.values()]
+            heapq.heapify(self._expiries)
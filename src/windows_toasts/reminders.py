@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import threading
+import time
+import traceback
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Union
+
+from .events import ToastActivatedEventArgs
+from .toast import Toast
+from .toasters import BaseWindowsToaster
+from .wrappers import ToastButton, ToastInputSelectionBox
+
+SNOOZE_ARGUMENTS = "windows-toasts:snooze"
+"""Arguments of the buttons added by :meth:`ReminderEngine.add_snooze`"""
+
+_WHEEL_BITS = 6
+_WHEEL_SLOTS = 1 << _WHEEL_BITS
+_WHEEL_MASK = _WHEEL_SLOTS - 1
+_WHEEL_LEVELS = 4
+
+
+class _Reminder:
+    __slots__ = ("toast", "expiry", "slot")
+
+    def __init__(self, toast: Toast, expiry: int) -> None:
+        self.toast = toast
+        self.expiry = expiry
+        self.slot: Optional[Dict[str, _Reminder]] = None
+
+
+class _TimerWheel:
+    """
+    Hierarchical timer wheel keyed by tag. Level n has 64 slots of 64^n ticks each, so inserting and cancelling are
+    O(1) whatever the number of reminders; reminders in higher levels move down a level as their slot comes up.
+    Reminders further away than the top level covers wait in its furthest slot and are placed again when it comes up
+    """
+
+    def __init__(self, tick: int) -> None:
+        self.tick = tick
+        self.slots: List[List[Dict[str, _Reminder]]] = [[{} for _ in range(_WHEEL_SLOTS)] for _ in range(_WHEEL_LEVELS)]
+        self.reminders: Dict[str, _Reminder] = {}
+
+    def insert(self, reminder: _Reminder) -> None:
+        ticksLeft = reminder.expiry - self.tick
+        level = 0
+        while level < _WHEEL_LEVELS - 1 and ticksLeft >= 1 << (_WHEEL_BITS * (level + 1)):
+            level += 1
+
+        slotIndex = (reminder.expiry >> (_WHEEL_BITS * level)) & _WHEEL_MASK
+        if ticksLeft >= 1 << (_WHEEL_BITS * _WHEEL_LEVELS):
+            slotIndex = ((self.tick >> (_WHEEL_BITS * level)) - 1) & _WHEEL_MASK
+
+        reminder.slot = self.slots[level][slotIndex]
+        reminder.slot[reminder.toast.tag] = reminder
+        self.reminders[reminder.toast.tag] = reminder
+
+    def remove(self, tag: str) -> Optional[_Reminder]:
+        reminder = self.reminders.pop(tag, None)
+        if reminder is not None:
+            del reminder.slot[tag]
+
+        return reminder
+
+    def advance(self, tick: int) -> List[_Reminder]:
+        """
+        Move the wheel forward to a tick
+
+        :return: The reminders that became due, soonest first
+        """
+        dueReminders: List[_Reminder] = []
+        while self.tick < tick and self.reminders:
+            self.tick += 1
+            if self.tick & _WHEEL_MASK == 0:
+                for level in range(1, _WHEEL_LEVELS):
+                    slotIndex = (self.tick >> (_WHEEL_BITS * level)) & _WHEEL_MASK
+                    self._cascade(self.slots[level], slotIndex)
+                    if slotIndex != 0:
+                        break
+
+            slot = self.slots[0][self.tick & _WHEEL_MASK]
+            if slot:
+                dueReminders.extend(slot.values())
+                for tag in slot:
+                    del self.reminders[tag]
+                slot.clear()
+
+        # Nothing is pending, so there is nothing to cascade on the way
+        self.tick = max(self.tick, tick)
+        return dueReminders
+
+    def _cascade(self, levelSlots: List[Dict[str, _Reminder]], slotIndex: int) -> None:
+        slot = levelSlots[slotIndex]
+        if not slot:
+            return
+
+        levelSlots[slotIndex] = {}
+        for reminder in slot.values():
+            self.insert(reminder)
+
+
+class ReminderEngine:
+    """
+    Shows toasts again after an interval, e.g. to snooze them, without relying on Windows' snooze button, which
+    :class:`~windows_toasts.toasters.WindowsToaster` cannot show. Reminders are kept in a hierarchical timer wheel,
+    so that adding or cancelling one costs the same however many are pending, and fire from a single background thread.
+    Reminders only last as long as the process
+
+    :param toaster: Toaster to show the toasts again through
+    :param resolution: Seconds per tick of the wheel. Reminders fire up to this late
+    :param clock: Returns the current time in seconds. Defaults to :func:`time.monotonic`
+    """
+
+    toaster: BaseWindowsToaster
+    resolution: float
+    firedCount: int
+    """Number of reminders that fired"""
+    failedCount: int
+    """Number of reminders whose toast could not be shown, or whose showing raised, e.g. in an observer"""
+
+    def __init__(
+        self, toaster: BaseWindowsToaster, resolution: float = 1.0, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.toaster = toaster
+        self.resolution = resolution
+        self.firedCount = 0
+        self.failedCount = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._wakeUp = threading.Condition(self._lock)
+        self._closed = False
+        self._wheel = _TimerWheel(self._current_tick())
+        self._thread = threading.Thread(target=self._fire_loop, name="ReminderEngine", daemon=True)
+        self._thread.start()
+
+    @property
+    def pendingCount(self) -> int:
+        """Number of reminders waiting to fire"""
+        return len(self._wheel.reminders)
+
+    def remind(self, toast: Toast, interval: Union[float, timedelta]) -> None:
+        """
+        Show a toast again after an interval, replacing any reminder already set for its tag
+
+        :param toast: Toast to show again
+        :param interval: Seconds, or a timedelta, to wait
+        """
+        if isinstance(interval, timedelta):
+            interval = interval.total_seconds()
+
+        expiry = self._current_tick(interval)
+        with self._lock:
+            wasIdle = not self._wheel.reminders
+            self._wheel.remove(toast.tag)
+            # The current tick has already been handled, so reminders that are already due fire on the next one
+            self._wheel.insert(_Reminder(toast, max(expiry, self._wheel.tick + 1)))
+            if wasIdle:
+                # The background thread waits indefinitely while there is nothing to fire
+                self._wakeUp.notify()
+
+    def cancel(self, tag: str) -> bool:
+        """
+        Cancel the reminder of a toast
+
+        :param tag: Tag of the toast
+        :return: Whether a reminder was pending
+        """
+        with self._lock:
+            return self._wheel.remove(tag) is not None
+
+    def __contains__(self, tag: str) -> bool:
+        return tag in self._wheel.reminders
+
+    def add_snooze(
+        self,
+        toast: Toast,
+        interval: Union[float, timedelta] = 600.0,
+        selectionBox: Optional[ToastInputSelectionBox] = None,
+        content: str = "Snooze",
+    ) -> ToastButton:
+        """
+        Add a button to a toast that shows it again after an interval. The toast's on_activated is wrapped, and still
+        called for its other buttons. Needs an :class:`~windows_toasts.toasters.InteractableWindowsToaster`
+
+        :param toast: Toast to add the button to
+        :param interval: Seconds, or a timedelta, to snooze for if the user picks no interval
+        :param selectionBox: Selection box to pick the interval from, with the minutes as selection IDs like for
+            :class:`~windows_toasts.wrappers.ToastSystemButton`. It is added to the toast if it isn't there already
+        :param content: Text of the button
+        :return: The button added
+        """
+        if selectionBox is not None and selectionBox not in toast.inputs:
+            toast.AddInput(selectionBox)
+
+        snoozeButton = ToastButton(content, SNOOZE_ARGUMENTS, relatedInput=selectionBox)
+        toast.AddAction(snoozeButton)
+        onActivated = toast.on_activated
+
+        def on_snooze_activated(eventArgs: ToastActivatedEventArgs) -> None:
+            if eventArgs.arguments == SNOOZE_ARGUMENTS:
+                self.snooze(toast, eventArgs, interval, selectionBox)
+            elif onActivated is not None:
+                onActivated(eventArgs)
+
+        toast.on_activated = on_snooze_activated
+        return snoozeButton
+
+    def snooze(
+        self,
+        toast: Toast,
+        eventArgs: ToastActivatedEventArgs,
+        interval: Union[float, timedelta] = 600.0,
+        selectionBox: Optional[ToastInputSelectionBox] = None,
+    ) -> float:
+        """
+        Set a reminder for a toast from its activation, e.g. from an on_activated of your own
+
+        :param eventArgs: Arguments the toast was activated with
+        :param interval: Seconds, or a timedelta, to snooze for if the user picks no interval
+        :param selectionBox: Selection box the user picked the interval in, with the minutes as selection IDs
+        :return: Seconds the toast was snoozed for
+        """
+        if isinstance(interval, timedelta):
+            interval = interval.total_seconds()
+
+        if selectionBox is not None and eventArgs.inputs:
+            try:
+                interval = float(eventArgs.inputs[selectionBox.input_id]) * 60
+            except (KeyError, ValueError):
+                pass
+
+        self.remind(toast, interval)
+        return interval
+
+    def fire_due(self) -> int:
+        """
+        Show the toasts whose reminders are due. This happens automatically in a background thread, but can be forced
+
+        :return: Number of reminders fired
+        """
+        with self._lock:
+            dueReminders = self._wheel.advance(self._current_tick())
+
+        failedCount = 0
+        for reminder in dueReminders:
+            try:
+                self.toaster.show_toast(reminder.toast)
+            except OSError:
+                failedCount += 1
+            except Exception:
+                # Escaping would stop the background thread, and with it every later reminder
+                traceback.print_exc()
+                failedCount += 1
+
+        with self._lock:
+            self.firedCount += len(dueReminders)
+            self.failedCount += failedCount
+
+        return len(dueReminders)
+
+    def close(self) -> None:
+        """
+        Stop the background thread. Pending reminders are dropped
+        """
+        with self._lock:
+            self._closed = True
+            self._wakeUp.notify()
+
+        self._thread.join()
+
+    def __enter__(self) -> ReminderEngine:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def _current_tick(self, delay: float = 0.0) -> int:
+        # Rounded up, so that reminders never fire early
+        return -int(-(self._clock() + delay) // self.resolution)
+
+    def _fire_loop(self) -> None:
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+
+                # Wake up on every tick while anything is pending; the wheel makes each tick cheap
+                self._wakeUp.wait(self.resolution if self._wheel.reminders else None)
+                if self._closed:
+                    return
+
+            self.fire_due()
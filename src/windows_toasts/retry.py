@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import random
+import threading
+import time
+import traceback
+from typing import TYPE_CHECKING, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .toasters import BaseWindowsToaster
+
+RETRYABLE_ERRORS = frozenset(
+    {
+        0x803E0200,  # WPN_E_OUT_OF_SESSION
+        0x803E0201,  # WPN_E_POWER_SAVE
+        0x803E0207,  # WPN_E_TOAST_NOTIFICATION_DROPPED, e.g. when throttled
+        0x803E0208,  # WPN_E_STORAGE_LOCKED
+    }
+)
+"""HRESULTs toasts fail with that are transient, so showing the toast again later may succeed"""
+
+
+class ToastRetryPolicy:
+    """
+    Shows toasts again when they fail with a transient error, backing off exponentially between attempts.
+    Set it as a toaster's :attr:`~windows_toasts.toasters.BaseWindowsToaster.retryPolicy` to enable it; on_failed is
+    then only called once a toast fails with an error that is not retryable, or runs out of attempts.
+    Retries are made from a single background thread, whatever the number of toasts waiting
+
+    :param maxAttempts: Maximum number of times to show a toast, including the first
+    :param baseDelay: Seconds to wait before the first retry, doubled for every retry after it
+    :param maxDelay: Maximum seconds to wait before a retry
+    :param jitter: Fraction of each delay to randomise, so that toasts that failed together are not retried together
+    :param retryableErrors: HRESULTs to retry. Defaults to :data:`RETRYABLE_ERRORS`
+    """
+
+    maxAttempts: int
+    baseDelay: float
+    maxDelay: float
+    jitter: float
+    retryableErrors: FrozenSet[int]
+    retries: int
+    """Number of times toasts were shown again"""
+    givenUp: int
+    """Number of toasts that failed with a retryable error on every attempt"""
+    errorCount: int
+    """Number of retries that raised an unexpected exception, e.g. from an observer"""
+
+    def __init__(
+        self,
+        maxAttempts: int = 4,
+        baseDelay: float = 1.0,
+        maxDelay: float = 60.0,
+        jitter: float = 0.5,
+        retryableErrors: Iterable[int] = RETRYABLE_ERRORS,
+    ) -> None:
+        self.maxAttempts = maxAttempts
+        self.baseDelay = baseDelay
+        self.maxDelay = maxDelay
+        self.jitter = jitter
+        self.retryableErrors = frozenset(retryableErrors)
+        self.retries = 0
+        self.givenUp = 0
+        self.errorCount = 0
+        self._lock = threading.Lock()
+        self._wakeUp = threading.Condition(self._lock)
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._sequence = itertools.count()
+        # Attempts made so far for every toast that failed, until it is released
+        self._attempts: Dict[Tuple[str, str], int] = {}
+        self._due: List[Tuple[float, int, BaseWindowsToaster, str, str]] = []
+
+    @property
+    def pendingCount(self) -> int:
+        """Number of retries waiting for their time"""
+        return len(self._due)
+
+    def is_retryable(self, errorCode: int) -> bool:
+        """
+        Whether a toast that failed with an HRESULT should be shown again
+        """
+        return (errorCode & 0xFFFFFFFF) in self.retryableErrors
+
+    def delay(self, attempt: int) -> float:
+        """
+        Seconds to wait before showing a toast again
+
+        :param attempt: Number of times the toast has been shown so far
+        """
+        fullDelay = min(self.maxDelay, self.baseDelay * 2 ** (attempt - 1))
+        return fullDelay * (1 - self.jitter * random.random())
+
+    def close(self) -> None:
+        """
+        Stop the background thread. Retries still waiting are dropped
+        """
+        with self._lock:
+            self._closed = True
+            self._due.clear()
+            self._wakeUp.notify()
+            thread = self._thread
+
+        if thread is not None:
+            thread.join()
+
+    def _handle_failure(self, toaster: BaseWindowsToaster, tag: str, group: str, errorCode: int) -> bool:
+        """
+        Schedule a retry of a toast that failed
+
+        :return: Whether a retry was scheduled. If not, the failure should be dispatched as usual
+        """
+        if not self.is_retryable(errorCode):
+            return False
+
+        with self._lock:
+            if self._closed:
+                return False
+
+            attempt = self._attempts.get((tag, group), 1)
+            if attempt >= self.maxAttempts:
+                self._attempts.pop((tag, group), None)
+                self.givenUp += 1
+                return False
+
+            self._attempts[(tag, group)] = attempt + 1
+            heapq.heappush(
+                self._due, (time.monotonic() + self.delay(attempt), next(self._sequence), toaster, tag, group)
+            )
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._retry_loop, name="ToastRetryPolicy", daemon=True)
+                self._thread.start()
+
+            self._wakeUp.notify()
+            return True
+
+    def _forget(self, tag: str, group: str) -> None:
+        # Called when a toast is released, however it ended
+        with self._lock:
+            self._attempts.pop((tag, group), None)
+
+    def _retry_loop(self) -> None:
+        with self._lock:
+            while not self._closed:
+                if not self._due:
+                    self._wakeUp.wait()
+                    continue
+
+                timeout = self._due[0][0] - time.monotonic()
+                if timeout > 0:
+                    self._wakeUp.wait(timeout)
+                    continue
+
+                _, _, toaster, tag, group = heapq.heappop(self._due)
+                # Shown without the lock, since the notifier may fail synchronously and schedule another retry
+                self._lock.release()
+                try:
+                    retried = toaster._retry_toast(tag, group)
+                except Exception:
+                    # Escaping would stop the thread, and every later retry would wait forever
+                    traceback.print_exc()
+                    retried = None
+                finally:
+                    self._lock.acquire()
+
+                if retried is None:
+                    self.errorCount += 1
+                elif retried:
+                    self.retries += 1
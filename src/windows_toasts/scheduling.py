@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+import traceback
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from .exceptions import ToastNotFoundError
+from .serialization import toast_from_dict, toast_to_dict
+from .toast import Toast
+from .toasters import BaseWindowsToaster
+
+MAX_SCHEDULED_TOASTS = 4096
+"""Number of scheduled toasts Windows holds per app"""
+
+
+class _ScheduledEntry:
+    __slots__ = ("tag", "toast", "displayTime", "timestamp", "sequence", "inSystem")
+
+    def __init__(self, toast: Toast, displayTime: datetime, sequence: int) -> None:
+        self.tag = toast.tag
+        self.toast = toast
+        self.displayTime = displayTime
+        self.timestamp = displayTime.timestamp()
+        self.sequence = sequence
+        self.inSystem = False
+
+
+class ScheduleOverflowManager:
+    """
+    Schedules any number of toasts, although Windows only holds a limited number per app. The soonest ones, up to
+    capacity, are scheduled through the toaster; the rest wait in a heap ordered by display time, and are scheduled
+    as earlier ones are displayed or cancelled. Toasts that were due while waiting, e.g. because the process was not
+    running, are shown as soon as possible
+
+    :param toaster: Toaster to schedule and show the toasts with
+    :param capacity: Maximum number of toasts to hand to Windows at once
+    :param persistPath: File to persist the toasts in, so that they survive restarts. Their callbacks are not kept,
+        which scheduled toasts do not support anyway
+    """
+
+    toaster: BaseWindowsToaster
+    capacity: int
+    persistPath: Optional[Path]
+
+    def __init__(
+        self,
+        toaster: BaseWindowsToaster,
+        capacity: int = MAX_SCHEDULED_TOASTS,
+        persistPath: Optional[Union[str, os.PathLike]] = None,
+    ) -> None:
+        self.toaster = toaster
+        self.capacity = capacity
+        self.persistPath = None if persistPath is None else Path(persistPath)
+        self._lock = threading.RLock()
+        self._wakeUp = threading.Condition(self._lock)
+        self._closed = False
+        self._sequence = itertools.count()
+        self._entries: Dict[str, _ScheduledEntry] = {}
+        # Heaps of (timestamp, sequence, tag), with entries removed lazily. The scheduled toasts are kept in both
+        # orders, for the soonest to be displayed and the latest to be moved back when an earlier toast arrives
+        self._waiting: List[Tuple[float, int, str]] = []
+        self._systemSoonest: List[Tuple[float, int, str]] = []
+        self._systemLatest: List[Tuple[float, int, str]] = []
+        self._systemCount = 0
+        self._journalLines = 0
+
+        if self.persistPath is not None and self.persistPath.exists():
+            self._load()
+
+        self.top_up()
+        self._thread = threading.Thread(target=self._top_up_loop, name="ScheduleOverflowManager", daemon=True)
+        self._thread.start()
+
+    @property
+    def systemCount(self) -> int:
+        """Number of toasts currently scheduled through Windows"""
+        return self._systemCount
+
+    @property
+    def waitingCount(self) -> int:
+        """Number of toasts waiting for room in the Windows schedule"""
+        return len(self._entries) - self._systemCount
+
+    def schedule(self, toast: Toast, displayTime: datetime) -> None:
+        """
+        Schedule a toast, replacing it if it is already scheduled
+
+        :param toast: Toast to display
+        :param displayTime: Time to display the toast on
+        """
+        with self._lock:
+            if toast.tag in self._entries:
+                self._remove(self._entries[toast.tag])
+
+            entry = _ScheduledEntry(toast, displayTime, next(self._sequence))
+            self._entries[entry.tag] = entry
+            self._journal(
+                {"op": "add", "display_time": displayTime.isoformat(), "toast": toast_to_dict(toast, None, False)}
+            )
+
+            latestEntry = self._peek(self._systemLatest, True)
+            if (
+                self._systemCount >= self.capacity
+                and latestEntry is not None
+                and entry.timestamp < latestEntry.timestamp
+            ):
+                # Make room by moving the latest scheduled toast back to the waiting heap
+                self._unschedule(latestEntry)
+                self._push_waiting(latestEntry)
+
+            self._push_waiting(entry)
+            self._fill()
+            self._wakeUp.notify()
+
+    def cancel(self, tag: str) -> bool:
+        """
+        Cancel a toast, wherever it is waiting
+
+        :param tag: Tag of the toast
+        :return: Whether the toast was scheduled
+        """
+        with self._lock:
+            entry = self._entries.get(tag)
+            if entry is None:
+                return False
+
+            self._remove(entry)
+            self._fill()
+            return True
+
+    def top_up(self) -> int:
+        """
+        Forget toasts Windows has displayed, and schedule waiting toasts in their place.
+        This happens automatically in a background thread, but can be forced. A toast that fails to be scheduled or
+        shown stays waiting, and is tried again by the next top up
+
+        :return: Number of toasts scheduled or shown
+        :raises: OSError: If the toaster fails to schedule or show a toast
+        """
+        with self._lock:
+            now = time.time()
+            while True:
+                entry = self._peek(self._systemSoonest, True)
+                if entry is None or entry.timestamp > now:
+                    break
+
+                heapq.heappop(self._systemSoonest)
+                entry.inSystem = False
+                self._systemCount -= 1
+                del self._entries[entry.tag]
+                self._journal({"op": "remove", "tag": entry.tag})
+
+            return self._fill()
+
+    def get(self, tag: str) -> Optional[Tuple[Toast, datetime]]:
+        """
+        A scheduled toast and its display time, or None if it is not scheduled
+        """
+        with self._lock:
+            entry = self._entries.get(tag)
+            return None if entry is None else (entry.toast, entry.displayTime)
+
+    def upcoming(self, count: int) -> List[Tuple[datetime, Toast]]:
+        """
+        The soonest toasts, scheduled or waiting
+
+        :param count: Maximum number of toasts to return
+        :return: Display times and toasts, soonest first
+        """
+        with self._lock:
+            soonestEntries = heapq.nsmallest(
+                count, self._entries.values(), key=lambda entry: (entry.timestamp, entry.sequence)
+            )
+            return [(entry.displayTime, entry.toast) for entry in soonestEntries]
+
+    def between(self, start: datetime, end: datetime) -> List[Tuple[datetime, Toast]]:
+        """
+        The toasts to be displayed from start until end
+
+        :return: Display times and toasts, soonest first
+        """
+        startTimestamp, endTimestamp = start.timestamp(), end.timestamp()
+        with self._lock:
+            matchingEntries = [
+                entry for entry in self._entries.values() if startTimestamp <= entry.timestamp < endTimestamp
+            ]
+
+        matchingEntries.sort(key=lambda entry: (entry.timestamp, entry.sequence))
+        return [(entry.displayTime, entry.toast) for entry in matchingEntries]
+
+    def close(self) -> None:
+        """
+        Stop the background thread. Toasts already scheduled through Windows stay scheduled
+        """
+        with self._lock:
+            self._closed = True
+            self._wakeUp.notify()
+
+        self._thread.join()
+
+    def __enter__(self) -> ScheduleOverflowManager:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, tag: str) -> bool:
+        return tag in self._entries
+
+    def _peek(self, heap: List[Tuple[float, int, str]], inSystem: bool) -> Optional[_ScheduledEntry]:
+        # Drop heap items of toasts that have since been cancelled, rescheduled or moved
+        while heap:
+            _, sequence, tag = heap[0]
+            entry = self._entries.get(tag)
+            if entry is not None and entry.sequence == sequence and entry.inSystem == inSystem:
+                return entry
+
+            heapq.heappop(heap)
+
+        return None
+
+    def _push_waiting(self, entry: _ScheduledEntry) -> None:
+        heapq.heappush(self._waiting, (entry.timestamp, entry.sequence, entry.tag))
+
+    def _fill(self) -> int:
+        now = time.time()
+        movedCount = 0
+        while self._systemCount < self.capacity:
+            entry = self._peek(self._waiting, False)
+            if entry is None:
+                break
+
+            heapq.heappop(self._waiting)
+            try:
+                if entry.timestamp <= now:
+                    # Overdue, and Windows does not accept schedules in the past
+                    self.toaster.show_toast(entry.toast, True)
+                else:
+                    self.toaster.schedule_toast(entry.toast, entry.displayTime)
+            except BaseException:
+                # Left waiting, to be tried again by the next top up
+                self._push_waiting(entry)
+                raise
+
+            movedCount += 1
+            if entry.timestamp <= now:
+                # Unless the toaster's observers rescheduled or cancelled it in the meantime
+                if self._entries.get(entry.tag) is entry:
+                    del self._entries[entry.tag]
+                    self._journal({"op": "remove", "tag": entry.tag})
+                continue
+
+            entry.inSystem = True
+            self._systemCount += 1
+            heapq.heappush(self._systemSoonest, (entry.timestamp, entry.sequence, entry.tag))
+            heapq.heappush(self._systemLatest, (-entry.timestamp, entry.sequence, entry.tag))
+
+        if movedCount:
+            self._wakeUp.notify()
+
+        self._compact_heaps()
+        return movedCount
+
+    def _compact_heaps(self) -> None:
+        # Items of cancelled or moved toasts stay in the heaps until they reach the top; rebuild them if they pile up
+        if len(self._waiting) + len(self._systemSoonest) + len(self._systemLatest) <= 4 * len(self._entries) + 64:
+            return
+
+        self._waiting = [
+            (entry.timestamp, entry.sequence, entry.tag) for entry in self._entries.values() if not entry.inSystem
+        ]
+        self._systemSoonest = [
+            (entry.timestamp, entry.sequence, entry.tag) for entry in self._entries.values() if entry.inSystem
+        ]
+        self._systemLatest = [(-timestamp, sequence, tag) for timestamp, sequence, tag in self._systemSoonest]
+        for heap in (self._waiting, self._systemSoonest, self._systemLatest):
+            heapq.heapify(heap)
+
+    def _unschedule(self, entry: _ScheduledEntry) -> None:
+        try:
+            self.toaster.unschedule_toast(entry.toast)
+        except ToastNotFoundError:
+            # Displayed in the meantime
+            pass
+
+        entry.inSystem = False
+        self._systemCount -= 1
+
+    def _remove(self, entry: _ScheduledEntry) -> None:
+        if entry.inSystem:
+            self._unschedule(entry)
+
+        del self._entries[entry.tag]
+        self._journal({"op": "remove", "tag": entry.tag})
+
+    def _top_up_loop(self) -> None:
+        with self._lock:
+            while not self._closed:
+                soonestEntry = self._peek(self._systemSoonest, True)
+                timeout = None if soonestEntry is None else max(0.0, soonestEntry.timestamp - time.time())
+                self._wakeUp.wait(timeout)
+                if self._closed:
+                    return
+
+                try:
+                    self.top_up()
+                except Exception:
+                    # Escaping would stop the thread, and with it every later top up
+                    traceback.print_exc()
+
+    def _journal(self, record: dict) -> None:
+        # Appending keeps persisting cheap; the journal is compacted once it is mostly outdated records
+        if self.persistPath is None:
+            return
+
+        if self._journalLines > 2 * len(self._entries) + 1024:
+            self._compact()
+            return
+
+        with open(self.persistPath, "a", encoding="utf-8") as journalFile:
+            journalFile.write(json.dumps(record) + "\n")
+
+        self._journalLines += 1
+
+    def _compact(self) -> None:
+        temporaryPath = self.persistPath.with_name(f"{self.persistPath.name}.tmp")
+        with open(temporaryPath, "w", encoding="utf-8") as journalFile:
+            for entry in self._entries.values():
+                record = {
+                    "op": "add",
+                    "display_time": entry.displayTime.isoformat(),
+                    "toast": toast_to_dict(entry.toast, None, False),
+                }
+                journalFile.write(json.dumps(record) + "\n")
+
+        os.replace(temporaryPath, self.persistPath)
+        self._journalLines = len(self._entries)
+
+    def _load(self) -> None:
+        with open(self.persistPath, encoding="utf-8") as journalFile:
+            for line in journalFile:
+                if not line.strip():
+                    continue
+
+                record = json.loads(line)
+                self._journalLines += 1
+                if record["op"] == "add":
+                    toast = toast_from_dict(record["toast"])
+                    self._entries[toast.tag] = _ScheduledEntry(
+                        toast, datetime.fromisoformat(record["display_time"]), next(self._sequence)
+                    )
+                else:
+                    self._entries.pop(record["tag"], None)
+
+        # Toasts scheduled by a previous run are still held by Windows
+        scheduledTags = {
+            scheduledToast.tag for scheduledToast in self.toaster.toastNotifier.get_scheduled_toast_notifications()
+        }
+        for entry in self._entries.values():
+            heapItem = (entry.timestamp, entry.sequence, entry.tag)
+            if entry.tag in scheduledTags:
+                entry.inSystem = True
+                self._systemCount += 1
+                heapq.heappush(self._systemSoonest, heapItem)
+                heapq.heappush(self._systemLatest, (-entry.timestamp, entry.sequence, entry.tag))
+            else:
+                heapq.heappush(self._waiting, heapItem)
+
+        self._compact()
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import threading
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _SequenceEntry:
+    __slots__ = ("lock", "value")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.value = 0
+
+
+class ToastSequenceAllocator:
+    """
+    Allocates strictly increasing notification sequence numbers per (tag, group), with a lock per toast.
+    Whatever is built with a sequence number is built while holding that toast's lock, so a newer sequence number is
+    always paired with newer data, and updates to different toasts never wait on each other.
+    Entries are only created when asked to, e.g. once a toast is updated, so toasts that are shown and never updated
+    cost nothing here
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], _SequenceEntry] = {}
+
+    def allocate(self, tag: str, group: str, use: Callable[[int], T], minimum: int = 0, create: bool = True) -> T:
+        """
+        Allocate the next sequence number for a toast and call use with it, holding the toast's lock
+
+        :param tag: Tag of the toast
+        :param group: Group of the toast
+        :param use: Called with the sequence number, e.g. to build and send the NotificationData
+        :param minimum: The sequence number will be greater than this, e.g. if updates were sent by another process
+        :param create: Whether to start tracking the toast if it isn't yet. If not, use is called with minimum + 1
+            without any lock, e.g. when showing a toast that may never be updated
+        :return: Whatever use returns
+        """
+        entry = self._entries.get((tag, group))
+        if entry is None:
+            if not create:
+                return use(minimum + 1)
+
+            with self._lock:
+                entry = self._entries.setdefault((tag, group), _SequenceEntry())
+
+        with entry.lock:
+            entry.value = max(entry.value, minimum) + 1
+            return use(entry.value)
+
+    def current(self, tag: str, group: str) -> Optional[int]:
+        """
+        The last sequence number allocated for a toast, or None if there was none
+        """
+        entry = self._entries.get((tag, group))
+        return None if entry is None else entry.value
+
+    def forget(self, tag: str, group: str) -> None:
+        """
+        Stop tracking a toast, e.g. once it has been removed
+        """
+        with self._lock:
+            self._entries.pop((tag, group), None)
+
+    def forget_group(self, group: str) -> None:
+        """
+        Stop tracking every toast in a group
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == group]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """
+        Stop tracking all toasts
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
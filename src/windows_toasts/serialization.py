@@ -0,0 +1,607 @@
+from __future__ import annotations
+
+import datetime
+import json
+import struct
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+from .exceptions import ToastSerializationError
+from .toast import Toast, ToastInput
+from .toast_audio import AudioSource, ToastAudio
+from .wrappers import (
+    ToastButton,
+    ToastButtonColour,
+    ToastDisplayImage,
+    ToastDuration,
+    ToastImage,
+    ToastImagePosition,
+    ToastInputSelectionBox,
+    ToastInputTextBox,
+    ToastProgressBar,
+    ToastScenario,
+    ToastSelection,
+    ToastSystemButton,
+    ToastSystemButtonAction,
+)
+
+SCHEMA_VERSION = 1
+"""Version of the dictionary schema produced by :func:`toast_to_dict`"""
+
+BINARY_MAGIC = b"WTS"
+"""Prefix of every payload produced by :func:`dumps_binary`"""
+
+CALLBACK_FIELDS = ("on_activated", "on_dismissed", "on_failed")
+
+
+class ToastHandlerRegistry:
+    """
+    Maps callbacks to names, so that toasts can be serialized and the callbacks looked up again when deserializing.
+    Every process that deserializes a toast needs to register the same names
+    """
+
+    def __init__(self) -> None:
+        self._handlers: Dict[str, Callable] = {}
+        self._names: Dict[Callable, str] = {}
+
+    def register(self, name: str, handler: Optional[Callable] = None) -> Callable:
+        """
+        Register a handler under a name. Can also be used as a decorator, i.e. ``@registry.register("name")``
+
+        :param name: Name to serialize the handler as
+        :param handler: The callable. If None, returns a decorator instead
+        :return: The handler, or a decorator registering it
+        """
+        if handler is None:
+            return lambda decoratedHandler: self.register(name, decoratedHandler)
+
+        self._handlers[name] = handler
+        self._names[handler] = name
+        return handler
+
+    def unregister(self, name: str) -> None:
+        """
+        Remove a handler by its name, if it was registered
+        """
+        handler = self._handlers.pop(name, None)
+        if handler is not None:
+            self._names.pop(handler, None)
+
+    def name_of(self, handler: Callable) -> str:
+        """
+        :raises: ToastSerializationError: If the handler was never registered
+        """
+        try:
+            return self._names[handler]
+        except (KeyError, TypeError):
+            raise ToastSerializationError(f"Callback {handler!r} is not registered in the handler registry")
+
+    def resolve(self, name: str) -> Callable:
+        """
+        :raises: ToastSerializationError: If no handler is registered under the name
+        """
+        try:
+            return self._handlers[name]
+        except KeyError:
+            raise ToastSerializationError(f"No handler registered under the name '{name}'")
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._handlers
+
+
+handler_registry = ToastHandlerRegistry()
+"""Registry used when none is explicitly passed"""
+
+
+def _datetime_to_str(value: Optional[datetime.datetime]) -> Optional[str]:
+    return None if value is None else value.isoformat()
+
+
+def _datetime_from_str(value: Optional[str]) -> Optional[datetime.datetime]:
+    return None if value is None else datetime.datetime.fromisoformat(value)
+
+
+def _image_from_uri(uri: str) -> ToastImage:
+    # ToastImage has already been validated and resolved into a URI when serializing, so skip __init__
+    toastImage = ToastImage.__new__(ToastImage)
+    toastImage.path = uri
+    return toastImage
+
+
+def _input_to_dict(toastInput: ToastInput) -> dict:
+    inputDict: Dict[str, Any] = {"input_id": toastInput.input_id}
+    if toastInput.caption:
+        inputDict["caption"] = toastInput.caption
+
+    if isinstance(toastInput, ToastInputTextBox):
+        inputDict["type"] = "text"
+        if toastInput.placeholder:
+            inputDict["placeholder"] = toastInput.placeholder
+    else:
+        inputDict["type"] = "selection"
+        inputDict["selections"] = [[selection.selection_id, selection.content] for selection in toastInput.selections]
+        if toastInput.default_selection is not None:
+            inputDict["default_selection"] = toastInput.default_selection.selection_id
+
+    return inputDict
+
+
+def _input_from_dict(inputDict: dict) -> ToastInput:
+    inputType = inputDict.get("type", "text")
+    if inputType == "text":
+        return ToastInputTextBox(inputDict["input_id"], inputDict.get("caption", ""), inputDict.get("placeholder", ""))
+    elif inputType == "selection":
+        selections = tuple(ToastSelection(selectionId, content) for selectionId, content in inputDict["selections"])
+        defaultId = inputDict.get("default_selection")
+        defaultSelection = next((selection for selection in selections if selection.selection_id == defaultId), None)
+        return ToastInputSelectionBox(inputDict["input_id"], inputDict.get("caption", ""), selections, defaultSelection)
+
+    raise ToastSerializationError(f"Unknown input type '{inputType}'")
+
+
+def _action_to_dict(action: Union[ToastButton, ToastSystemButton]) -> dict:
+    actionDict: Dict[str, Any]
+    if isinstance(action, ToastButton):
+        actionDict = {"type": "button", "content": action.content, "arguments": action.arguments}
+        if action.inContextMenu:
+            actionDict["inContextMenu"] = True
+        if action.launch is not None:
+            actionDict["launch"] = action.launch
+    else:
+        actionDict = {"type": "system", "action": action.action.name, "content": action.content}
+
+    if action.image is not None:
+        actionDict["image"] = action.image.path
+    if action.relatedInput is not None:
+        actionDict["relatedInput"] = action.relatedInput.input_id
+    if action.tooltip is not None:
+        actionDict["tooltip"] = action.tooltip
+    if action.colour is not ToastButtonColour.Default:
+        actionDict["colour"] = action.colour.name
+
+    return actionDict
+
+
+def _action_from_dict(actionDict: dict, inputs: Dict[str, ToastInput]) -> Union[ToastButton, ToastSystemButton]:
+    image = _image_from_uri(actionDict["image"]) if "image" in actionDict else None
+    relatedInput = inputs.get(actionDict["relatedInput"]) if "relatedInput" in actionDict else None
+    colour = ToastButtonColour[actionDict.get("colour", "Default")]
+
+    actionType = actionDict.get("type", "button")
+    if actionType == "button":
+        return ToastButton(
+            actionDict.get("content", ""),
+            actionDict.get("arguments", ""),
+            image=image,
+            relatedInput=relatedInput,
+            inContextMenu=actionDict.get("inContextMenu", False),
+            tooltip=actionDict.get("tooltip"),
+            launch=actionDict.get("launch"),
+            colour=colour,
+        )
+    elif actionType == "system":
+        if relatedInput is not None and not isinstance(relatedInput, ToastInputSelectionBox):
+            raise ToastSerializationError("System buttons can only relate to selection boxes")
+
+        return ToastSystemButton(
+            ToastSystemButtonAction[actionDict["action"]],
+            actionDict.get("content", ""),
+            relatedInput=relatedInput,
+            image=image,
+            tooltip=actionDict.get("tooltip"),
+            colour=colour,
+        )
+
+    raise ToastSerializationError(f"Unknown action type '{actionType}'")
+
+
+def _image_to_dict(displayImage: ToastDisplayImage) -> dict:
+    imageDict: Dict[str, Any] = {"image": displayImage.image.path}
+    if displayImage.altText is not None:
+        imageDict["altText"] = displayImage.altText
+    if displayImage.position is not ToastImagePosition.Inline:
+        imageDict["position"] = displayImage.position.name
+    if displayImage.circleCrop:
+        imageDict["circleCrop"] = True
+
+    return imageDict
+
+
+def _image_from_dict(imageDict: dict) -> ToastDisplayImage:
+    return ToastDisplayImage(
+        _image_from_uri(imageDict["image"]),
+        imageDict.get("altText"),
+        ToastImagePosition[imageDict.get("position", "Inline")],
+        imageDict.get("circleCrop", False),
+    )
+
+
+def _audio_to_dict(audio: ToastAudio) -> dict:
+    if isinstance(audio.sound, AudioSource):
+        audioDict: Dict[str, Any] = {"sound": audio.sound.name}
+    else:
+        audioDict = {"path": str(audio.sound)}
+
+    if audio.looping:
+        audioDict["looping"] = True
+    if audio.silent:
+        audioDict["silent"] = True
+
+    return audioDict
+
+
+def _audio_from_dict(audioDict: dict) -> ToastAudio:
+    sound: Union[AudioSource, Path]
+    if "path" in audioDict:
+        sound = Path(audioDict["path"])
+    else:
+        sound = AudioSource[audioDict.get("sound", "Default")]
+
+    return ToastAudio(sound, audioDict.get("looping", False), audioDict.get("silent", False))
+
+
+def progress_bar_to_dict(progressBar: ToastProgressBar) -> dict:
+    """
+    Serialize a progress bar, omitting the fields that are left as default
+
+    :type progressBar: ToastProgressBar
+    """
+    progressDict: Dict[str, Any] = {"status": progressBar.status, "progress": progressBar.progress}
+    if progressBar.caption is not None:
+        progressDict["caption"] = progressBar.caption
+    if progressBar.progress_override is not None:
+        progressDict["progress_override"] = progressBar.progress_override
+
+    return progressDict
+
+
+def progress_bar_from_dict(progressDict: dict) -> ToastProgressBar:
+    """
+    Inverse of :func:`progress_bar_to_dict`
+    """
+    return ToastProgressBar(
+        progressDict.get("status", ""),
+        progressDict.get("caption"),
+        progressDict.get("progress", 0),
+        progressDict.get("progress_override"),
+    )
+
+
+def toast_to_dict(toast: Toast, handlers: Optional[ToastHandlerRegistry] = None, includeCallbacks: bool = True) -> dict:
+    """
+    Serialize a toast into a dictionary made up of JSON-compatible types. Fields left as default are omitted
+
+    :param toast: Toast to serialize
+    :param handlers: Registry to look callback names up in. Defaults to :data:`handler_registry`
+    :param includeCallbacks: Whether to serialize the callbacks. If False, they are left out entirely
+    :raises: ToastSerializationError: If one of the toast's callbacks is not registered
+    :return: Dictionary that can be passed to :func:`toast_from_dict`
+    """
+    if handlers is None:
+        handlers = handler_registry
+
+    toastDict: Dict[str, Any] = {"schema": SCHEMA_VERSION, "tag": toast.tag}
+    if toast.text_fields:
+        toastDict["text_fields"] = list(toast.text_fields)
+    if toast.group is not None:
+        toastDict["group"] = toast.group
+    if toast.updates:
+        toastDict["updates"] = toast.updates
+    if toast.audio is not None:
+        toastDict["audio"] = _audio_to_dict(toast.audio)
+    if toast.duration is not ToastDuration.Default:
+        toastDict["duration"] = toast.duration.name
+    if toast.expiration_time is not None:
+        toastDict["expiration_time"] = _datetime_to_str(toast.expiration_time)
+    if toast.launch_action is not None:
+        toastDict["launch_action"] = toast.launch_action
+    if toast.progress_bar is not None:
+        toastDict["progress_bar"] = progress_bar_to_dict(toast.progress_bar)
+    if toast.attribution_text is not None:
+        toastDict["attribution_text"] = toast.attribution_text
+    if toast.scenario is not ToastScenario.Default:
+        toastDict["scenario"] = toast.scenario.name
+    if toast.suppress_popup:
+        toastDict["suppress_popup"] = True
+    if toast.timestamp is not None:
+        toastDict["timestamp"] = _datetime_to_str(toast.timestamp)
+
+    for callbackField in CALLBACK_FIELDS if includeCallbacks else ():
+        callback = getattr(toast, callbackField)
+        if callback is not None:
+            toastDict[callbackField] = handlers.name_of(callback)
+
+    if toast.images:
+        toastDict["images"] = [_image_to_dict(displayImage) for displayImage in toast.images]
+    if toast.inputs:
+        toastDict["inputs"] = [_input_to_dict(toastInput) for toastInput in toast.inputs]
+    if toast.actions:
+        toastDict["actions"] = [_action_to_dict(action) for action in toast.actions]
+
+    return toastDict
+
+
+def toast_from_dict(toastDict: dict, handlers: Optional[ToastHandlerRegistry] = None) -> Toast:
+    """
+    Create a toast from a dictionary produced by :func:`toast_to_dict`. The tag is preserved if present
+
+    :param toastDict: Serialized toast
+    :param handlers: Registry to resolve callback names with. Defaults to :data:`handler_registry`
+    :raises: ToastSerializationError: If the dictionary is malformed, the schema is unsupported, or a callback name
+        cannot be resolved
+    """
+    if handlers is None:
+        handlers = handler_registry
+
+    if not isinstance(toastDict, dict):
+        raise ToastSerializationError(f"Expected a toast dictionary, got {type(toastDict).__name__}")
+
+    schemaVersion = toastDict.get("schema", SCHEMA_VERSION)
+    if not isinstance(schemaVersion, int) or isinstance(schemaVersion, bool):
+        raise ToastSerializationError(f"Schema version must be an integer, got {schemaVersion!r}")
+    if schemaVersion > SCHEMA_VERSION:
+        raise ToastSerializationError(f"Unsupported schema version {schemaVersion}, maximum is {SCHEMA_VERSION}")
+
+    try:
+        inputs = [_input_from_dict(inputDict) for inputDict in toastDict.get("inputs", ())]
+        inputsById = {toastInput.input_id: toastInput for toastInput in inputs}
+
+        audioDict = toastDict.get("audio")
+        progressDict = toastDict.get("progress_bar")
+        toast = Toast(
+            toastDict.get("text_fields"),
+            audio=None if audioDict is None else _audio_from_dict(audioDict),
+            duration=ToastDuration[toastDict.get("duration", "Default")],
+            expiration_time=_datetime_from_str(toastDict.get("expiration_time")),
+            group=toastDict.get("group"),
+            launch_action=toastDict.get("launch_action"),
+            progress_bar=None if progressDict is None else progress_bar_from_dict(progressDict),
+            attribution_text=toastDict.get("attribution_text"),
+            scenario=ToastScenario[toastDict.get("scenario", "Default")],
+            suppress_popup=toastDict.get("suppress_popup", False),
+            timestamp=_datetime_from_str(toastDict.get("timestamp")),
+            images=[_image_from_dict(imageDict) for imageDict in toastDict.get("images", ())],
+        )
+        # Added separately, as the five actions + inputs limit is checked against the inputs already added
+        for toastInput in inputs:
+            toast.AddInput(toastInput)
+
+        for actionDict in toastDict.get("actions", ()):
+            toast.AddAction(_action_from_dict(actionDict, inputsById))
+    except (KeyError, TypeError, ValueError) as e:
+        raise ToastSerializationError(f"Malformed toast dictionary: {e!r}") from e
+
+    for callbackField in CALLBACK_FIELDS:
+        handlerName = toastDict.get(callbackField)
+        if handlerName is not None:
+            setattr(toast, callbackField, handlers.resolve(handlerName))
+
+    if "tag" in toastDict:
+        toast.tag = toastDict["tag"]
+    toast.updates = toastDict.get("updates", 0)
+
+    return toast
+
+
+def dumps_json(toast: Toast, handlers: Optional[ToastHandlerRegistry] = None) -> str:
+    """
+    Serialize a toast into a compact JSON string
+    """
+    return json.dumps(toast_to_dict(toast, handlers), separators=(",", ":"), ensure_ascii=False)
+
+
+def loads_json(payload: Union[str, bytes], handlers: Optional[ToastHandlerRegistry] = None) -> Toast:
+    """
+    Inverse of :func:`dumps_json`
+    """
+    return toast_from_dict(json.loads(payload), handlers)
+
+
+# Keys that are encoded as a single byte rather than as a string. Append only, as the index is part of the format
+_KEY_TABLE = (
+    "schema",
+    "tag",
+    "text_fields",
+    "group",
+    "updates",
+    "audio",
+    "duration",
+    "expiration_time",
+    "launch_action",
+    "progress_bar",
+    "attribution_text",
+    "scenario",
+    "suppress_popup",
+    "timestamp",
+    "on_activated",
+    "on_dismissed",
+    "on_failed",
+    "images",
+    "inputs",
+    "actions",
+    "type",
+    "content",
+    "arguments",
+    "image",
+    "relatedInput",
+    "tooltip",
+    "colour",
+    "inContextMenu",
+    "launch",
+    "action",
+    "altText",
+    "position",
+    "circleCrop",
+    "input_id",
+    "caption",
+    "placeholder",
+    "selections",
+    "default_selection",
+    "sound",
+    "path",
+    "looping",
+    "silent",
+    "status",
+    "progress",
+    "progress_override",
+)
+_KEY_INDICES = {key: i for i, key in enumerate(_KEY_TABLE)}
+
+_NONE, _TRUE, _FALSE, _INT, _FLOAT, _STR, _LIST, _DICT, _KNOWN_KEY = range(9)
+_DOUBLE = struct.Struct("<d")
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, offset: int) -> tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, offset
+        shift += 7
+
+
+def _encode_value(out: bytearray, value: Any) -> None:
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, int):
+        out.append(_INT)
+        # Zigzag, so that small negative numbers stay small
+        _write_varint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+    elif isinstance(value, float):
+        out.append(_FLOAT)
+        out += _DOUBLE.pack(value)
+    elif isinstance(value, str):
+        encoded = value.encode("utf-8")
+        out.append(_STR)
+        _write_varint(out, len(encoded))
+        out += encoded
+    elif isinstance(value, (list, tuple)):
+        out.append(_LIST)
+        _write_varint(out, len(value))
+        for item in value:
+            _encode_value(out, item)
+    elif isinstance(value, dict):
+        out.append(_DICT)
+        _write_varint(out, len(value))
+        for key, item in value.items():
+            keyIndex = _KEY_INDICES.get(key)
+            if keyIndex is None:
+                _encode_value(out, key)
+            else:
+                out.append(_KNOWN_KEY)
+                out.append(keyIndex)
+            _encode_value(out, item)
+    else:
+        raise ToastSerializationError(f"Cannot encode value of type {type(value).__name__}")
+
+
+def _decode_value(data: bytes, offset: int) -> tuple[Any, int]:
+    typeCode = data[offset]
+    offset += 1
+    if typeCode == _NONE:
+        return None, offset
+    elif typeCode == _TRUE:
+        return True, offset
+    elif typeCode == _FALSE:
+        return False, offset
+    elif typeCode == _INT:
+        zigzag, offset = _read_varint(data, offset)
+        return (zigzag >> 1) if not zigzag & 1 else -((zigzag + 1) >> 1), offset
+    elif typeCode == _FLOAT:
+        return _DOUBLE.unpack_from(data, offset)[0], offset + _DOUBLE.size
+    elif typeCode == _STR:
+        length, offset = _read_varint(data, offset)
+        end = offset + length
+        if end > len(data):
+            raise IndexError("string runs past the end of the payload")
+
+        return data[offset:end].decode("utf-8"), end
+    elif typeCode == _KNOWN_KEY:
+        return _KEY_TABLE[data[offset]], offset + 1
+    elif typeCode == _LIST:
+        length, offset = _read_varint(data, offset)
+        items = []
+        for _ in range(length):
+            item, offset = _decode_value(data, offset)
+            items.append(item)
+        return items, offset
+    elif typeCode == _DICT:
+        length, offset = _read_varint(data, offset)
+        decoded = {}
+        for _ in range(length):
+            key, offset = _decode_value(data, offset)
+            decoded[key], offset = _decode_value(data, offset)
+        return decoded, offset
+
+    raise ToastSerializationError(f"Unknown type code {typeCode} at offset {offset - 1}")
+
+
+def encode_binary(value: Any) -> bytes:
+    """
+    Encode a value made up of JSON-compatible types in the compact binary format
+
+    :raises: ToastSerializationError: If the value contains types that cannot be encoded
+    """
+    out = bytearray(BINARY_MAGIC)
+    out.append(SCHEMA_VERSION)
+    _encode_value(out, value)
+    return bytes(out)
+
+
+def decode_binary(payload: bytes) -> Any:
+    """
+    Inverse of :func:`encode_binary`
+
+    :raises: ToastSerializationError: If the payload is malformed or of an unsupported version
+    """
+    if payload[: len(BINARY_MAGIC)] != BINARY_MAGIC:
+        raise ToastSerializationError("Payload is not in the binary toast format")
+
+    offset = len(BINARY_MAGIC)
+    if len(payload) <= offset:
+        raise ToastSerializationError("Truncated payload: missing schema version")
+
+    if payload[offset] > SCHEMA_VERSION:
+        raise ToastSerializationError(f"Unsupported schema version {payload[offset]}, maximum is {SCHEMA_VERSION}")
+
+    try:
+        value, offset = _decode_value(payload, offset + 1)
+    except (IndexError, UnicodeDecodeError, struct.error) as e:
+        raise ToastSerializationError(f"Truncated or corrupt payload: {e!r}") from e
+    except TypeError as e:
+        # Lists and dicts used as dictionary keys
+        raise ToastSerializationError(f"Corrupt payload: {e}") from e
+    except RecursionError as e:
+        raise ToastSerializationError("Corrupt payload: values are nested too deeply") from e
+
+    if offset != len(payload):
+        raise ToastSerializationError(f"Unexpected {len(payload) - offset} trailing bytes in payload")
+
+    return value
+
+
+def dumps_binary(toast: Toast, handlers: Optional[ToastHandlerRegistry] = None) -> bytes:
+    """
+    Serialize a toast into the compact binary format. Considerably smaller than :func:`dumps_json`
+    """
+    return encode_binary(toast_to_dict(toast, handlers))
+
+
+def loads_binary(payload: bytes, handlers: Optional[ToastHandlerRegistry] = None) -> Toast:
+    """
+    Inverse of :func:`dumps_binary`
+    """
+    return toast_from_dict(decode_binary(payload), handlers)
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import collections
+import cProfile
+import io
+import pstats
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Mapping, Optional, Tuple
+
+from .toast import Toast
+
+if TYPE_CHECKING:
+    from .toasters import BaseWindowsToaster
+
+
+@dataclass
+class SlowOperationRecord:
+    """
+    A toaster operation that took longer than the threshold of a :class:`SlowOperationLog`
+    """
+
+    operation: str
+    """Name of the operation: "show", "update" or "schedule" """
+    duration: float
+    """Seconds the operation took"""
+    stages: Dict[str, float]
+    """Seconds each stage of the operation took, in order"""
+    toasterClass: str
+    """Name of the toaster's class"""
+    aumid: str
+    """AUMID the toaster shows toasts with"""
+    textFields: int
+    """Number of text fields of the toast"""
+    actions: int
+    """Number of actions of the toast"""
+    inputs: int
+    """Number of inputs of the toast"""
+    images: int
+    """Number of images of the toast"""
+    payloadSize: int
+    """Characters of XML sent, or of binding values for updates"""
+    timestamp: float = field(default_factory=time.time)
+    """Time (as in :func:`time.time`) the operation finished"""
+    profile: Optional[str] = None
+    """Statistics of the operation from :mod:`cProfile`, if it was sampled"""
+
+
+class _NullTimer:
+    """
+    Timer used when there is no slow operation log, so that timing costs a method call that does nothing
+    """
+
+    __slots__ = ()
+
+    def stage(self, name: str) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def finish(self, toaster: BaseWindowsToaster, toast: Optional[Toast], payload: Any = None) -> None:
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _OperationTimer:
+    __slots__ = ("_log", "_operation", "_startTime", "_stageTime", "_stages", "_profiler", "_duration")
+
+    def __init__(self, log: SlowOperationLog, operation: str, profiler: Optional[cProfile.Profile]) -> None:
+        self._log = log
+        self._operation = operation
+        self._stages: List[Tuple[str, float]] = []
+        self._profiler = profiler
+        self._duration: Optional[float] = None
+        self._startTime = self._stageTime = time.perf_counter()
+
+    def stage(self, name: str) -> None:
+        """
+        Mark the end of a stage
+        """
+        now = time.perf_counter()
+        self._stages.append((name, now - self._stageTime))
+        self._stageTime = now
+
+    def stop(self) -> None:
+        """
+        Stop the clock and the profiler, if they are still running. Call it whether or not the operation raised, since
+        a profiler left enabled would profile everything the thread runs from then on
+        """
+        if self._duration is not None:
+            return
+
+        self._duration = time.perf_counter() - self._startTime
+        if self._profiler is not None:
+            self._profiler.disable()
+
+    def finish(self, toaster: BaseWindowsToaster, toast: Optional[Toast], payload: Any = None) -> None:
+        """
+        Mark the end of the operation, and record it if it was slow. The fingerprint is only computed then
+
+        :param payload: What was sent: an XmlDocument, binding values, or a function returning either
+        """
+        self.stop()
+        duration = self._duration
+        if duration < self._log.threshold:
+            return
+
+        profile = None
+        if self._profiler is not None:
+            statsText = io.StringIO()
+            pstats.Stats(self._profiler, stream=statsText).sort_stats("cumulative").print_stats(20)
+            profile = statsText.getvalue()
+
+        self._log._append(
+            SlowOperationRecord(
+                self._operation,
+                duration,
+                dict(self._stages),
+                type(toaster).__name__,
+                toaster._AUMID,
+                0 if toast is None else len(toast.text_fields),
+                0 if toast is None else len(toast.actions),
+                0 if toast is None else len(toast.inputs),
+                0 if toast is None else len(toast.images),
+                _payload_size(payload),
+                profile=profile,
+            )
+        )
+
+
+def _payload_size(payload: Any) -> int:
+    if callable(payload):
+        payload = payload()
+    if payload is None:
+        return 0
+    if isinstance(payload, Mapping):
+        return sum(len(value) for value in payload.values() if value is not None)
+
+    return len(payload.get_xml())
+
+
+class SlowOperationLog:
+    """
+    Records the toaster operations that take longer than a threshold, with how long each stage took and the shape of
+    the toast, in a ring buffer. Set it as a toaster's :attr:`~windows_toasts.toasters.BaseWindowsToaster.slowOperationLog`
+    to enable it. Operations faster than the threshold only cost a few clock reads
+
+    :param threshold: Seconds after which an operation is slow
+    :param capacity: Number of records to keep; the oldest are dropped first
+    :param profileRate: Fraction of operations to run under :mod:`cProfile`, whose statistics are kept if they are
+        slow. Profiling slows the operations down, so keep it low
+    """
+
+    threshold: float
+    profileRate: float
+    slowCount: int
+    """Number of slow operations recorded, including those since dropped from the buffer"""
+
+    def __init__(self, threshold: float = 0.05, capacity: int = 256, profileRate: float = 0.0) -> None:
+        self.threshold = threshold
+        self.profileRate = profileRate
+        self.slowCount = 0
+        self._lock = threading.Lock()
+        self._records: Deque[SlowOperationRecord] = collections.deque(maxlen=capacity)
+
+    def records(self) -> List[SlowOperationRecord]:
+        """
+        The slow operations recorded, oldest first
+        """
+        with self._lock:
+            return list(self._records)
+
+    def clear(self) -> None:
+        """
+        Drop all records
+        """
+        with self._lock:
+            self._records.clear()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def start(self, operation: str) -> _OperationTimer:
+        """
+        Start timing an operation
+
+        :param operation: Name of the operation
+        """
+        profiler = None
+        if self.profileRate and random.random() < self.profileRate:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler is active, e.g. in another thread
+                profiler = None
+
+        return _OperationTimer(self, operation, profiler)
+
+    def _append(self, record: SlowOperationRecord) -> None:
+        with self._lock:
+            self._records.append(record)
+            self.slowCount += 1
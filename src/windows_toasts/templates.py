@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import copy
+import os
+import string
+import uuid
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .handle import _default_progress_override
+from .toast import Toast
+from .wrappers import ToastProgressBar
+
+_RenderFunction = Callable[[Mapping[str, Any]], str]
+
+
+def _uuid4_strings(count: int) -> List[str]:
+    """
+    Generate random UUIDs as strings, like ``str(uuid.uuid4())`` but with one call to :func:`os.urandom` for all of them
+    """
+    randomBytes = os.urandom(16 * count).hex()
+    tags = []
+    for offset in range(0, 32 * count, 32):
+        end = offset + 32
+        h = randomBytes[offset:end]
+        # Version 4, and the RFC 4122 variant in the top two bits of the 17th digit
+        tags.append(f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}")
+
+    return tags
+
+
+def _compile_field(template: str) -> Tuple[_RenderFunction, Tuple[str, ...]]:
+    """
+    Compile a format string with named placeholders, e.g. "{sender}: {message}", into a function of a mapping.
+    The placeholders are resolved once, so rendering only looks the values up and formats them
+
+    :param template: Format string, using the same syntax as :meth:`str.format`
+    :raises: ValueError: If a placeholder is positional or refers to an attribute or item
+    :return: The render function, and the keys it reads
+    """
+    percentParts: List[str] = []
+    positionalParts: List[str] = []
+    keys: List[str] = []
+    plainPlaceholders = True
+
+    for literalText, fieldName, formatSpec, conversion in string.Formatter().parse(template):
+        percentParts.append(literalText.replace("%", "%%"))
+        positionalParts.append(literalText.replace("{", "{{").replace("}", "}}"))
+        if fieldName is None:
+            continue
+
+        if not fieldName.isidentifier():
+            raise ValueError(f"Placeholder '{{{fieldName}}}' must be a plain name, e.g. {{sender}}")
+        if "{" in (formatSpec or ""):
+            raise ValueError(f"Placeholder '{{{fieldName}}}' cannot have a nested format specification")
+
+        percentParts.append("%s")
+        positionalParts.append(
+            f"{{{len(keys)}{'' if conversion is None else '!' + conversion}{':' + formatSpec if formatSpec else ''}}}"
+        )
+        keys.append(fieldName)
+        plainPlaceholders = plainPlaceholders and conversion is None and not formatSpec
+
+    if not keys:
+        constant = template.format()
+        return (lambda _: constant), ()
+
+    getValues = itemgetter(*keys)
+    if not plainPlaceholders:
+        # Format specifications need str.format, but positional arguments spare it from looking up names
+        positionalFormat = "".join(positionalParts)
+        if len(keys) == 1:
+            return (lambda mapping: positionalFormat.format(getValues(mapping))), tuple(keys)
+
+        return (lambda mapping: positionalFormat.format(*getValues(mapping))), tuple(keys)
+
+    percentFormat = "".join(percentParts)
+    if len(keys) == 1:
+        if percentFormat == "%s":
+            return (lambda mapping: str(getValues(mapping))), tuple(keys)
+
+        return (lambda mapping: percentFormat % (getValues(mapping),)), tuple(keys)
+
+    return (lambda mapping: percentFormat % getValues(mapping)), tuple(keys)
+
+
+class ToastTemplate:
+    """
+    Text fields, progress status and caption with named placeholders, compiled once and rendered into many toasts.
+    Placeholders use the :meth:`str.format` syntax, e.g. ``"{sender}: {message:.80}"``, but have to be plain names
+
+    :param text_fields: Templates of the text fields. None leaves a field out, like in :attr:`Toast.text_fields`
+    :param status: Template of the progress bar's status. A progress bar is added if it or caption is set
+    :param caption: Template of the progress bar's caption
+    :param progress_override: Template of the progress bar's override
+    :param progress: Key of the progress in the records, a float between 0 and 1 or None for an indeterminate bar.
+        If not set, the progress bar starts at zero
+    :param toast: Toast the rendered toasts are based on, e.g. for images, actions and audio. Its attributes are
+        copied as they are now, so assigning to them or adding actions, images and inputs later does not affect the
+        template
+    :raises: ValueError: If a placeholder is invalid
+    """
+
+    keys: frozenset
+    """The keys the template reads from each record"""
+
+    def __init__(
+        self,
+        text_fields: Sequence[Optional[str]] = (),
+        status: Optional[str] = None,
+        caption: Optional[str] = None,
+        progress_override: Optional[str] = None,
+        progress: Optional[str] = None,
+        toast: Optional[Toast] = None,
+    ) -> None:
+        allKeys: List[str] = []
+
+        def compile_optional(template: Optional[str]) -> Optional[_RenderFunction]:
+            if template is None:
+                return None
+
+            renderFunction, fieldKeys = _compile_field(template)
+            allKeys.extend(fieldKeys)
+            return renderFunction
+
+        self._textFields = [compile_optional(fieldTemplate) for fieldTemplate in text_fields]
+        self._status = compile_optional(status)
+        self._caption = compile_optional(caption)
+        self._progressOverride = compile_optional(progress_override)
+        self._progressKey = progress
+        if progress is not None:
+            allKeys.append(progress)
+
+        self._hasProgressBar = status is not None or caption is not None
+        self.keys = frozenset(allKeys)
+
+        prototype = Toast() if toast is None else toast
+        # Shallow, so that callbacks bound to other objects are not copied along with them. The lists and the progress
+        # bar are copied too, so that modifying them in place on the toast later doesn't affect the template either
+        self._prototypeState = dict(prototype.__dict__)
+        for attributeName in ("text_fields", "tag", "updates"):
+            self._prototypeState.pop(attributeName, None)
+        for attributeName in ("actions", "images", "inputs"):
+            self._prototypeState[attributeName] = list(self._prototypeState[attributeName])
+        self._prototypeState["progress_bar"] = copy.copy(self._prototypeState["progress_bar"])
+
+    def render(self, mapping: Mapping[str, Any]) -> Toast:
+        """
+        Render a toast from a record
+
+        :param mapping: Values of the placeholders
+        :raises: KeyError: If a placeholder is missing from the mapping
+        :return: A new toast, with a new tag
+        """
+        return self._render(mapping, str(uuid.uuid4()))
+
+    def render_many(self, records: Iterable[Mapping[str, Any]]) -> List[Toast]:
+        """
+        Render a toast from each record. Faster than calling :meth:`render` for each, since the tags are generated
+        in one go
+
+        :param records: Values of the placeholders, one mapping per toast
+        :return: The new toasts, in the same order
+        """
+        records = list(records)
+        render = self._render
+        return [render(record, tag) for record, tag in zip(records, _uuid4_strings(len(records)))]
+
+    def _render(self, mapping: Mapping[str, Any], tag: str) -> Toast:
+        newToast = Toast.__new__(Toast)
+        newToast.__dict__ = {
+            **self._prototypeState,
+            # The lists are copied, so that rendered toasts can be modified independently
+            "actions": self._prototypeState["actions"].copy(),
+            "images": self._prototypeState["images"].copy(),
+            "inputs": self._prototypeState["inputs"].copy(),
+            "text_fields": [None if renderField is None else renderField(mapping) for renderField in self._textFields],
+            "tag": tag,
+            "updates": 0,
+        }
+        if self._hasProgressBar:
+            newToast.progress_bar = self._render_progress_bar(mapping)
+        elif newToast.progress_bar is not None:
+            newToast.progress_bar = copy.copy(newToast.progress_bar)
+
+        return newToast
+
+    def render_values(self, mapping: Mapping[str, Any]) -> Dict[str, Optional[str]]:
+        """
+        Render only the binding values, e.g. to update a toast shown from this template through
+        :meth:`~windows_toasts.handle.ToastHandle.update`
+
+        :param mapping: Values of the placeholders
+        :return: Binding names mapped to their values
+        """
+        bindingValues: Dict[str, Optional[str]] = {}
+        for i, renderField in enumerate(self._textFields):
+            if renderField is not None:
+                bindingValues[f"text{i + 1}"] = renderField(mapping)
+
+        if self._hasProgressBar:
+            progressBar = self._render_progress_bar(mapping)
+            progress = "indeterminate" if progressBar.progress is None else str(progressBar.progress)
+            bindingValues["status"] = progressBar.status
+            bindingValues["progress"] = progress
+            bindingValues["progress_override"] = progressBar.progress_override or _default_progress_override(progress)
+            bindingValues["caption"] = progressBar.caption or ""
+
+        return bindingValues
+
+    def _render_progress_bar(self, mapping: Mapping[str, Any]) -> ToastProgressBar:
+        return ToastProgressBar(
+            "" if self._status is None else self._status(mapping),
+            None if self._caption is None else self._caption(mapping),
+            0 if self._progressKey is None else mapping[self._progressKey],
+            None if self._progressOverride is None else self._progressOverride(mapping),
+        )
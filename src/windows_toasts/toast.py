@@ -6,7 +6,7 @@ import urllib.parse
 import uuid
 import warnings
 from collections.abc import Iterable
-from typing import Callable, Optional, Union
+from typing import TYPE_CHECKING, Callable, Optional, Union
 
 from winrt.windows.ui.notifications import ToastDismissedEventArgs, ToastFailedEventArgs
 
@@ -23,6 +23,9 @@ from .wrappers import (
     ToastSystemButton,
 )
 
+if TYPE_CHECKING:
+    from .serialization import ToastHandlerRegistry
+
 ToastInput = Union[ToastInputTextBox, ToastInputSelectionBox]
 
 
@@ -203,3 +206,29 @@ class Toast:
         newToast.tag = str(uuid.uuid4())
 
         return newToast
+
+    def to_dict(self, handlers: Optional[ToastHandlerRegistry] = None) -> dict:
+        """
+        Serialize the toast into a schema-versioned dictionary. Callbacks are stored by their registered names.
+        See :func:`~windows_toasts.serialization.toast_to_dict`
+
+        :param handlers: Registry to look callback names up in. Defaults to the global registry
+        :rtype: dict
+        """
+        from .serialization import toast_to_dict
+
+        return toast_to_dict(self, handlers)
+
+    @classmethod
+    def from_dict(cls, toastDict: dict, handlers: Optional[ToastHandlerRegistry] = None) -> Toast:
+        """
+        Create a toast from a dictionary created by :meth:`to_dict`.
+        See :func:`~windows_toasts.serialization.toast_from_dict`
+
+        :param toastDict: Serialized toast
+        :param handlers: Registry to resolve callback names with. Defaults to the global registry
+        :rtype: Toast
+        """
+        from .serialization import toast_from_dict
+
+        return toast_from_dict(toastDict, handlers)
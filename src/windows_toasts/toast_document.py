@@ -1,5 +1,5 @@
 import datetime
-from typing import Union
+from typing import List, Optional, Union
 
 from winrt.windows.data.xml.dom import IXmlNode, XmlDocument, XmlElement
 
@@ -28,15 +28,31 @@ class ToastDocument:
     """
 
     xmlDocument: XmlDocument
+    toastNode: IXmlType
+    """Root toast node, as to avoid having to find it every time"""
     bindingNode: IXmlType
     """Binding node, as to avoid having to find it every time"""
+    _textNodes: List[IXmlType]
+    """Text field nodes, by index"""
+    _imageNodes: List[IXmlType]
+    """Image nodes, in the order they were added"""
+    _actionsNode: Optional[IXmlType]
+    """Actions node, created along with the first input or action"""
+    _audioNode: Optional[IXmlType]
+    """Audio node, created along with the audio attributes"""
     _inputFields: int
     """Tracker of number of input fields"""
 
     def __init__(self, toast: Toast) -> None:
         self.xmlDocument = XmlDocument()
         self.xmlDocument.load_xml("<toast><visual><binding></binding></visual></toast>")
+        # The only two lookups; every node created afterwards is kept, so that setting it up does not scan the document
+        self.toastNode = self.GetElementByTagName("toast")
         self.bindingNode = self.GetElementByTagName("binding")
+        self._textNodes = []
+        self._imageNodes = []
+        self._actionsNode = None
+        self._audioNode = None
 
         # Unclear whether this leads to issues regarding spacing
         for i in range(len(toast.text_fields)):
@@ -44,6 +60,7 @@ class ToastDocument:
             # Needed for WindowsToaster
             self.SetAttribute(textElement, "id", str(i + 1))
             self.bindingNode.append_child(textElement)
+            self._textNodes.append(textElement)
 
         # Not sure if this is the best way to do this along with the clone bit in AddImage()
         if len(toast.images) > 0:
@@ -52,6 +69,7 @@ class ToastDocument:
             # Needed for WindowsToaster
             self.SetAttribute(imageElement, "id", "1")
             self.bindingNode.append_child(imageElement)
+            self._imageNodes.append(imageElement)
 
         self._inputFields = 0
 
@@ -126,10 +144,10 @@ class ToastDocument:
         on Microsoft.com <https://learn.microsoft.com/windows/apps/design/shell/tiles-and-notifications/adaptive
         -interactive-toasts#audio>`_
         """
-        audioNode = self.GetElementByTagName("audio")
+        audioNode = self._audioNode
         if audioNode is None:
-            audioNode = self.xmlDocument.create_element("audio")
-            self.GetElementByTagName("toast").append_child(audioNode)
+            audioNode = self._audioNode = self.xmlDocument.create_element("audio")
+            self.toastNode.append_child(audioNode)
 
         if audioConfiguration.silent:
             self.SetAttribute(audioNode, "silent", str(audioConfiguration.silent).lower())
@@ -148,7 +166,7 @@ class ToastDocument:
 
         :param nodePosition: Index of the text fields of the toast type for the text to be written in
         """
-        targetNode = self.xmlDocument.get_elements_by_tag_name("text").item(nodePosition)
+        targetNode = self._textNodes[nodePosition]
 
         # We used to simply set it to newValue, but since we've now switched to BindableString we just set it to text{i}
         # Set it to i + 1 just because starting at 1 rather than 0 is easier on the eye
@@ -161,7 +179,7 @@ class ToastDocument:
         :param nodePosition: Index of the text fields of the toast type for the text to be written in
         :param newValue: Content value of the text field
         """
-        targetNode = self.xmlDocument.get_elements_by_tag_name("text").item(nodePosition)
+        targetNode = self._textNodes[nodePosition]
         self.SetNodeStringValue(targetNode, newValue)
 
     def SetCustomTimestamp(self, customTimestamp: datetime.datetime) -> None:
@@ -173,8 +191,7 @@ class ToastDocument:
         :param customTimestamp: The target datetime
         :type customTimestamp: datetime.datetime
         """
-        toastNode = self.GetElementByTagName("toast")
-        self.SetAttribute(toastNode, "displayTimestamp", customTimestamp.strftime("%Y-%m-%dT%H:%M:%SZ"))
+        self.SetAttribute(self.toastNode, "displayTimestamp", customTimestamp.strftime("%Y-%m-%dT%H:%M:%SZ"))
 
     def AddImage(self, displayImage: ToastDisplayImage) -> None:
         """
@@ -183,12 +200,13 @@ class ToastDocument:
 
         :type displayImage: ToastDisplayImage
         """
-        imageNode = self.GetElementByTagName("image")
+        imageNode = self._imageNodes[0]
         if self.GetAttributeValue(imageNode, "src") != "":
             # For WindowsToaster
             imageNode = imageNode.clone_node(True)
             self.SetAttribute(imageNode, "id", "2")
             self.bindingNode.append_child(imageNode)
+            self._imageNodes.append(imageNode)
 
         self.SetAttribute(imageNode, "src", str(displayImage.image.path))
 
@@ -209,8 +227,7 @@ class ToastDocument:
         :param scenario: Scenario to mark the toast as
         :type scenario: ToastScenario
         """
-        toastNode = self.GetElementByTagName("toast")
-        self.SetAttribute(toastNode, "scenario", scenario.value)
+        self.SetAttribute(self.toastNode, "scenario", scenario.value)
 
     def AddInput(self, toastInput: Union[ToastInputTextBox, ToastInputSelectionBox]) -> None:
         """
@@ -240,18 +257,8 @@ class ToastDocument:
                 self.SetAttribute(selectionElement, "content", selection.content)
                 inputNode.append_child(selectionElement)
 
-        actionNodes = self.xmlDocument.get_elements_by_tag_name("actions")
-        if actionNodes.length > 0:
-            actionsNode = actionNodes.item(0)
-            # actionsNode.insert_before(inputNode, actionsNode.first_child)
-            actionsNode.append_child(inputNode)
-        else:
-            toastNode = self.GetElementByTagName("toast")
-
-            actionsNode = self.xmlDocument.create_element("actions")
-            toastNode.append_child(actionsNode)
-
-            actionsNode.append_child(inputNode)
+        # actionsNode.insert_before(inputNode, actionsNode.first_child)
+        self._get_actions_node().append_child(inputNode)
 
     def SetDuration(self, duration: ToastDuration) -> None:
         """
@@ -259,8 +266,7 @@ class ToastDocument:
 
         :type duration: ToastDuration
         """
-        toastNode = self.GetElementByTagName("toast")
-        self.SetAttribute(toastNode, "duration", duration.value)
+        self.SetAttribute(self.toastNode, "duration", duration.value)
 
     def AddAction(self, action: Union[ToastButton, ToastSystemButton]) -> None:
         """
@@ -268,13 +274,7 @@ class ToastDocument:
 
         :type action: Union[ToastButton, ToastSystemButton]
         """
-        actionNodes = self.xmlDocument.get_elements_by_tag_name("actions")
-        if actionNodes.length > 0:
-            actionsNode = actionNodes.item(0)
-        else:
-            actionsNode = self.xmlDocument.create_element("actions")
-            self.GetElementByTagName("toast").append_child(actionsNode)
-
+        actionsNode = self._get_actions_node()
         actionNode = self.xmlDocument.create_element("action")
         self.SetAttribute(actionNode, "content", action.content)
 
@@ -336,3 +336,10 @@ class ToastDocument:
             self.SetAttribute(progressBarNode, "title", progressBar.caption)
 
         self.bindingNode.append_child(progressBarNode)
+
+    def _get_actions_node(self) -> IXmlType:
+        if self._actionsNode is None:
+            self._actionsNode = self.xmlDocument.create_element("actions")
+            self.toastNode.append_child(self._actionsNode)
+
+        return self._actionsNode
@@ -1,7 +1,15 @@
+from __future__ import annotations
+
+import copy
+import time
+import uuid
 import warnings
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, TypeVar
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Set, Tuple, TypeVar, Union
 
+from winrt.windows.data.xml.dom import XmlDocument
 from winrt.windows.ui.notifications import (
     NotificationData,
     NotificationUpdateResult,
@@ -12,8 +20,14 @@ from winrt.windows.ui.notifications import (
     ToastNotifier,
 )
 
-from .events import ToastActivatedEventArgs
+from .activation import ToastActivationDispatcher
+from .events import ToastActivatedEventArgs, ToastFailedEventData
 from .exceptions import ToastNotFoundError
+from .handle import ToastHandle
+from .registry import LiveToastRegistry
+from .retry import ToastRetryPolicy
+from .sequencing import ToastSequenceAllocator
+from .slowlog import _NULL_TIMER, SlowOperationLog
 from .toast import Toast
 from .toast_document import ToastDocument
 from .wrappers import ToastDuration, ToastImagePosition, ToastScenario
@@ -21,37 +35,49 @@ from .wrappers import ToastDuration, ToastImagePosition, ToastScenario
 ToastNotificationT = TypeVar("ToastNotificationT", ToastNotification, ScheduledToastNotification)
 
 
-def _build_adaptable_data(toast: Toast) -> NotificationData:
+def _build_binding_values(toast: Toast) -> Dict[str, Optional[str]]:
     """
-    Build the adaptable content from a toast
+    Build the values of the bindings, e.g. {text1} and {status}, from a toast
 
     :param toast: Toast that has adaptable content
     :type toast: Toast
-    :return: A NotificationData object ready to be used in ToastNotifier.Update
-    :rtype: NotificationData
+    :return: Binding names mapped to their values
     """
-    notificationData = NotificationData()
-
-    toast.updates += 1
-    notificationData.sequence_number = toast.updates
+    bindingValues: Dict[str, Optional[str]] = {}
 
     for i, fieldContent in enumerate(toast.text_fields):
         if fieldContent is not None:
-            notificationData.values[f"text{i + 1}"] = fieldContent
+            bindingValues[f"text{i + 1}"] = fieldContent
 
     progressBar = toast.progress_bar
     if progressBar is not None:
-        notificationData.values["status"] = progressBar.status
-        notificationData.values.insert(
-            "progress", "indeterminate" if progressBar.progress is None else str(progressBar.progress)
-        )
+        bindingValues["status"] = progressBar.status
+        bindingValues["progress"] = "indeterminate" if progressBar.progress is None else str(progressBar.progress)
         progressOverride = progressBar.progress_override
         if progressOverride is None and progressBar.progress is not None:
             # Recreate default Windows behaviour while still allowing it to be changed in the future
             progressOverride = f"{round(progressBar.progress * 100)}%"
 
-        notificationData.values["progress_override"] = progressOverride
-        notificationData.values["caption"] = progressBar.caption or ""
+        bindingValues["progress_override"] = progressOverride
+        bindingValues["caption"] = progressBar.caption or ""
+
+    return bindingValues
+
+
+def _build_notification_data(bindingValues: Mapping[str, Optional[str]], sequenceNumber: int) -> NotificationData:
+    """
+    Build a NotificationData from binding values
+
+    :param bindingValues: Binding names mapped to their values
+    :param sequenceNumber: Sequence number, so that Windows can discard out of order updates
+    :return: A NotificationData object ready to be used in ToastNotifier.Update
+    :rtype: NotificationData
+    """
+    notificationData = NotificationData()
+    notificationData.sequence_number = sequenceNumber
+
+    for bindingName, bindingValue in bindingValues.items():
+        notificationData.values[bindingName] = bindingValue
 
     return notificationData
 
@@ -75,6 +101,102 @@ def _build_toast_notification(toast: Toast, toastNotification: ToastNotification
     return toastNotification
 
 
+class ToasterObserver:
+    """
+    Receives notifications of a toaster's operations, once they have been handed to Windows.
+    Subclass it, override the methods you need and register it with :meth:`BaseWindowsToaster.add_observer`
+    """
+
+    def toast_shown(self, toast: Toast, group: str) -> None:
+        """A toast was shown. group is the group it was shown with, which defaults to its tag"""
+
+    def toast_updated(self, tag: str, group: str, succeeded: bool) -> None:
+        """A toast's data was updated"""
+
+    def toast_removed(self, tag: str, group: str) -> None:
+        """A toast was removed from the action center"""
+
+    def group_removed(self, group: str) -> None:
+        """A group of toasts was removed from the action center"""
+
+    def toasts_cleared(self) -> None:
+        """All the toaster's toasts were removed from the action center"""
+
+    def toast_scheduled(self, toast: Toast, displayTime: datetime) -> None:
+        """A toast was scheduled"""
+
+    def toast_unscheduled(self, tag: str) -> None:
+        """A scheduled toast was unscheduled"""
+
+    def toast_released(self, tag: str, group: str) -> None:
+        """
+        The toaster stopped tracking a toast, because it was activated, dismissed, failed, expired or removed.
+        May be called from WinRT's event threads
+        """
+
+
+@dataclass(frozen=True)
+class CompiledToast:
+    """
+    A toast compiled by :meth:`BaseWindowsToaster.compile`. Its XML and binding values are built once, so showing it
+    only creates the notification and hands it to Windows. Every time it is shown, it gets a new tag
+    """
+
+    toaster: BaseWindowsToaster = field(repr=False, compare=False)
+    """Toaster that compiled it, since the XML depends on the toaster"""
+    xml: str
+    """XML of the toast, with a placeholder in place of the tag"""
+    bindingValues: Optional[Mapping[str, Optional[str]]]
+    """Values of the toast's bindings, or None if it is static"""
+    _tagPlaceholder: str = field(repr=False)
+    _state: Mapping[str, Any] = field(repr=False, compare=False)
+
+    def show(self) -> ToastHandle:
+        """
+        Show a new instance of the toast
+
+        :return: A handle to update or remove that instance
+        """
+        return self.toaster._show_compiled(self)
+
+
+@dataclass
+class BulkRemovalResult:
+    """
+    Outcome of :meth:`BaseWindowsToaster.remove_toasts` or :meth:`BaseWindowsToaster.remove_where`
+    """
+
+    removed: int = 0
+    """Number of toasts removed from the action center, including those removed with their group"""
+    groupsRemoved: int = 0
+    """Number of groups removed with a single call, because every toast in them matched"""
+    notFound: int = 0
+    """Number of toasts or tags asked for that were not in the action center"""
+    failed: int = 0
+    """Number of toasts or groups whose removal raised an error"""
+
+
+def _toast_from_state(toastState: Mapping[str, Any], tag: str) -> Toast:
+    """
+    Create a toast from the attributes of a compiled toast, without copying them again
+
+    :param toastState: Attributes of the toast
+    :param tag: Tag of the new toast
+    """
+    newToast = Toast.__new__(Toast)
+    newToast.__dict__ = {
+        **toastState,
+        # The lists are copied, so that changing one instance does not change the compiled toast
+        "actions": list(toastState["actions"]),
+        "images": list(toastState["images"]),
+        "inputs": list(toastState["inputs"]),
+        "text_fields": list(toastState["text_fields"]),
+        "tag": tag,
+        "updates": 0,
+    }
+    return newToast
+
+
 class BaseWindowsToaster:
     """
     Wrapper to simplify WinRT's ToastNotificationManager
@@ -85,14 +207,82 @@ class BaseWindowsToaster:
     applicationText: str
     notifierAUMID: Optional[str]
     toastNotifier: ToastNotifier
+    sequenceAllocator: ToastSequenceAllocator
+    """Allocates the sequence numbers of the toasts' data"""
+    liveToasts: LiveToastRegistry
+    """
+    Toasts with event handlers, or that were updated, that have not yet been activated, dismissed, failed, expired or
+    removed
+    """
+    staticToasts: bool
+    """Whether to show toasts with their values inlined by default, which is cheaper but means they cannot be updated"""
+    retryPolicy: Optional[ToastRetryPolicy]
+    """Policy to show toasts again with when they fail with a transient error. None to not retry them"""
+    slowOperationLog: Optional[SlowOperationLog]
+    """Log to record slow show, update and schedule calls in. None to not time them"""
+    activationDispatcher: Optional[ToastActivationDispatcher]
+    """
+    Dispatcher to register the on_activated of scheduled toasts with, and to pass the activations of toasts tracked
+    without an on_activated on to. None to only call the on_activated of toasts shown by this toaster
+    """
+    _toastHistory: Optional[ToastNotificationHistory]
+    _observers: Tuple[ToasterObserver, ...]
 
     def __init__(self, applicationText: str):
         self.applicationText = applicationText
+        self.sequenceAllocator = ToastSequenceAllocator()
+        self.liveToasts = LiveToastRegistry(onRelease=self._toast_released)
+        self.staticToasts = False
+        self.retryPolicy = None
+        self.slowOperationLog = None
+        self.activationDispatcher = None
+        self._toastHistory = None
+        self._observers = ()
 
     @property
     def _AUMID(self) -> str:
         return self.notifierAUMID or self.applicationText
 
+    @property
+    def toastHistory(self) -> ToastNotificationHistory:
+        """
+        History of the toasts in the action center. Defaults to WinRT's, but can be replaced, e.g. with
+        :class:`~windows_toasts.notifiers.InMemoryToastHistory`
+        """
+        if self._toastHistory is None:
+            return ToastNotificationManager.history
+
+        return self._toastHistory
+
+    @toastHistory.setter
+    def toastHistory(self, value: Optional[ToastNotificationHistory]) -> None:
+        self._toastHistory = value
+
+    def add_observer(self, observer: ToasterObserver) -> None:
+        """
+        Register an observer to be notified of the toaster's operations
+        """
+        # Replaced rather than mutated, so that operations in other threads can iterate over it without a lock
+        self._observers = (*self._observers, observer)
+
+    def remove_observer(self, observer: ToasterObserver) -> None:
+        """
+        Unregister an observer registered with :meth:`add_observer`
+        """
+        self._observers = tuple(registered for registered in self._observers if registered is not observer)
+
+    def _payload_key(self) -> Hashable:
+        """
+        What the XML built by :meth:`_setup_toast` depends on besides the toast, so that toasters with equal keys can
+        share it
+        """
+        return type(self)
+
+    def _warn_unsupported(self, toast: Toast) -> None:
+        """
+        Warn about parts of the toast the toaster cannot display
+        """
+
     def _setup_toast(self, toast: Toast, dynamic: bool) -> ToastDocument:
         """
         Setup toast to send. Should generally be used internally
@@ -120,64 +310,335 @@ class BaseWindowsToaster:
             toastContent.SetScenario(toast.scenario)
 
         if toast.launch_action is not None:
-            toastContent.SetAttribute(toastContent.GetElementByTagName("toast"), "launch", toast.launch_action)
-            toastContent.SetAttribute(toastContent.GetElementByTagName("toast"), "activationType", "protocol")
+            toastContent.SetAttribute(toastContent.toastNode, "launch", toast.launch_action)
+            toastContent.SetAttribute(toastContent.toastNode, "activationType", "protocol")
         else:
-            toastContent.SetAttribute(toastContent.GetElementByTagName("toast"), "launch", toast.tag)
+            toastContent.SetAttribute(toastContent.toastNode, "launch", toast.tag)
 
         return toastContent
 
-    def show_toast(self, toast: Toast) -> None:
+    def show_toast(self, toast: Toast, static: Optional[bool] = None) -> ToastHandle:
         """
         Displays the specified toast notification.
         If `toast` has already been shown, it will pop up again, but make no new sections in the action center
 
         :param toast: Toast to display
+        :param static: Whether to inline the toast's values instead of binding them, like scheduled toasts do.
+            This skips building its data, but updates will have no effect. Defaults to :attr:`staticToasts`
+        :return: A lightweight handle that can update or remove the toast without keeping `toast` around
         """
-        toastNotification = ToastNotification(self._setup_toast(toast, True).xmlDocument)
-        toastNotification.data = _build_adaptable_data(toast)
+        timer = self._start_timing("show")
+        try:
+            if static is None:
+                static = self.staticToasts
+
+            xmlDocument = self._setup_toast(toast, not static).xmlDocument
+            timer.stage("build")
+            notificationToSend = _build_toast_notification(toast, ToastNotification(xmlDocument))
+            timer.stage("notification")
+            toastHandle = self._show_notification(
+                toast, notificationToSend, None if static else lambda: _build_binding_values(toast), timer
+            )
+        finally:
+            # Stop profiling even if the operation raised, or the profiler would stay enabled in this thread
+            timer.stop()
 
-        if toast.on_activated is not None:  # pragma: no cover
-            # For some reason on_activated's type is generic, so cast it
-            toastNotification.add_activated(
-                lambda _, eventArgs: toast.on_activated(ToastActivatedEventArgs.fromWinRt(eventArgs))
+        timer.finish(self, toast, xmlDocument)
+        return toastHandle
+
+    def compile(self, toast: Toast, static: Optional[bool] = None) -> CompiledToast:
+        """
+        Compile a toast to be shown many times, e.g. an alert, without rebuilding it every time.
+        The toast is copied, so changing it afterwards does not affect the compiled toast
+
+        :param toast: Toast to compile
+        :param static: Whether to inline the toast's values, like in :meth:`show_toast`
+        :return: The compiled toast. Show it through :meth:`CompiledToast.show`
+        """
+        if static is None:
+            static = self.staticToasts
+
+        # Callbacks are kept as they are, since copying them would copy the objects they are bound to
+        compiledState = {
+            attributeName: value if attributeName.startswith("on_") else copy.deepcopy(value)
+            for attributeName, value in toast.__dict__.items()
+        }
+        # Built with a placeholder as its tag, which only appears in the launch argument if there is no launch action
+        tagPlaceholder = str(uuid.uuid4())
+        placeholderToast = _toast_from_state(compiledState, tagPlaceholder)
+        xml = self._setup_toast(placeholderToast, not static).xmlDocument.get_xml()
+        bindingValues = None if static else MappingProxyType(_build_binding_values(placeholderToast))
+        return CompiledToast(self, xml, bindingValues, tagPlaceholder, MappingProxyType(compiledState))
+
+    def _show_compiled(self, compiledToast: CompiledToast) -> ToastHandle:
+        timer = self._start_timing("show")
+        try:
+            # A toast to track this instance with, so that callbacks and observers work as for any other
+            toast = _toast_from_state(compiledToast._state, str(uuid.uuid4()))
+            xmlDocument = XmlDocument()
+            xmlDocument.load_xml(compiledToast.xml.replace(compiledToast._tagPlaceholder, toast.tag))
+            timer.stage("build")
+            notificationToSend = _build_toast_notification(toast, ToastNotification(xmlDocument))
+            timer.stage("notification")
+            bindingValues = compiledToast.bindingValues
+            toastHandle = self._show_notification(
+                toast, notificationToSend, None if bindingValues is None else bindingValues.copy, timer
             )
+        finally:
+            timer.stop()
+
+        timer.finish(self, toast, xmlDocument)
+        return toastHandle
+
+    def _show_notification(
+        self,
+        toast: Toast,
+        notificationToSend: ToastNotification,
+        buildValues: Optional[Callable[[], Dict[str, Optional[str]]]],
+        timer=_NULL_TIMER,
+    ) -> ToastHandle:
+        """
+        Show a notification built from a toast, tracking it and notifying the observers
+
+        :param buildValues: Returns the binding values to send the notification with, or None if it is static
+        :param timer: Timer of the operation, from :meth:`_start_timing`
+        """
+        hasCallbacks = toast.on_activated is not None or toast.on_dismissed is not None or toast.on_failed is not None
+        registered = hasCallbacks or self.retryPolicy is not None
+        if registered:
+            # The handlers are shared and look the toast up by tag, so WinRT never holds on to the toast itself.
+            # All three are added so that the toast is released whichever way it ends, which also removes them.
+            # Retrying also needs them, to find out about failures and to show the notification again
+            eventTokens = (
+                notificationToSend.add_activated(self._on_activated),
+                notificationToSend.add_dismissed(self._on_dismissed),
+                notificationToSend.add_failed(self._on_failed),
+            )
+            self.liveToasts.register(toast, notificationToSend.group, notificationToSend, eventTokens)
+        elif (toast.tag, notificationToSend.group) in self.liveToasts:
+            # Nothing is kept for toasts without handlers until they are updated, but a toast shown again replaces the
+            # notification the previous handlers were added to
+            self.liveToasts.release(toast.tag, notificationToSend.group)
+
+        timer.stage("register")
+
+        def show(sequenceNumber: int) -> Dict[str, Optional[str]]:
+            toast.updates = sequenceNumber
+            bindingValues = buildValues()
+            notificationToSend.data = _build_notification_data(bindingValues, sequenceNumber)
+            self.toastNotifier.show(notificationToSend)
+            return bindingValues
+
+        group = notificationToSend.group
+        try:
+            if buildValues is None:
+                # Nothing is bound, so there is no data and no sequence number to keep track of
+                self.toastNotifier.show(notificationToSend)
+                bindingValues = {}
+            else:
+                # Sequence numbers are only tracked once the toast is updated, unless it is being shown again
+                bindingValues = self.sequenceAllocator.allocate(toast.tag, group, show, toast.updates, False)
+        except BaseException:
+            # Otherwise the entry, and the callbacks it holds, would be kept until it expires
+            if registered:
+                self.liveToasts.release(toast.tag, group)
+            raise
+
+        timer.stage("deliver")
+        for observer in self._observers:
+            observer.toast_shown(toast, group)
+
+        timer.stage("observers")
+        return ToastHandle(self, toast.tag, group, bindingValues, toast.updates)
+
+    def _on_activated(self, sender: ToastNotification, eventArgs) -> None:  # pragma: no cover
+        # For some reason the event arguments' type is generic, so cast them
+        self._dispatch_activated(sender.tag, sender.group, ToastActivatedEventArgs.fromWinRt(eventArgs))
+
+    def _on_dismissed(self, sender: ToastNotification, eventArgs) -> None:  # pragma: no cover
+        self.liveToasts.dispatch_dismissed(sender.tag, sender.group, eventArgs)
+
+    def _on_failed(self, sender: ToastNotification, eventArgs) -> None:  # pragma: no cover
+        self._dispatch_failed(sender.tag, sender.group, eventArgs)
+
+    def _dispatch_activated(self, tag: str, group: str, eventArgs: ToastActivatedEventArgs) -> bool:
+        """
+        Call a toast's on_activated and release it, or pass the activation on to the activation dispatcher if the toast
+        is tracked for its other callbacks or for retrying, but has no on_activated. Toasts that aren't tracked have no
+        handlers for Windows to call, so their activations only reach the app through its launch
+
+        :return: Whether the toast was tracked
+        """
+        activationDispatcher = self.activationDispatcher
+        entry = self.liveToasts.get(tag, group)
+        tracked = self.liveToasts.dispatch_activated(tag, group, eventArgs)
+        if activationDispatcher is not None and entry is not None and entry.callback("on_activated") is None:
+            activationDispatcher.dispatch(eventArgs.arguments, eventArgs.inputs, tag)
 
-        if toast.on_dismissed is not None:  # pragma: no cover
-            toastNotification.add_dismissed(lambda _, eventArgs: toast.on_dismissed(eventArgs))
+        return tracked
 
-        if toast.on_failed is not None:  # pragma: no cover
-            toastNotification.add_failed(lambda _, eventArgs: toast.on_failed(eventArgs))
+    def _dispatch_failed(self, tag: str, group: str, eventArgs) -> bool:
+        """
+        Retry a toast that failed if the retry policy allows it, and otherwise call its on_failed and release it
+
+        :param eventArgs: WinRT's ToastFailedEventArgs, or a :class:`~windows_toasts.events.ToastFailedEventData`
+        :return: Whether the toast was tracked
+        """
+        retryPolicy = self.retryPolicy
+        if (
+            retryPolicy is not None
+            and (tag, group) in self.liveToasts
+            and retryPolicy._handle_failure(self, tag, group, ToastFailedEventData.fromWinRt(eventArgs).error_code)
+        ):
+            return True
+
+        return self.liveToasts.dispatch_failed(tag, group, eventArgs)
+
+    def _start_timing(self, operation: str):
+        """
+        Start timing an operation for the slow operation log, if there is one
+
+        :return: A timer to mark the stages of the operation with
+        """
+        slowOperationLog = self.slowOperationLog
+        return _NULL_TIMER if slowOperationLog is None else slowOperationLog.start(operation)
+
+    def _retry_toast(self, tag: str, group: str) -> bool:
+        """
+        Show a toast that failed again, with the same notification and event handlers
+
+        :return: Whether the toast was still tracked, and so could be shown again
+        """
+        entry = self.liveToasts.get(tag, group)
+        if entry is None or entry.notification is None:
+            return False
+
+        try:
+            self.toastNotifier.show(entry.notification)
+        except OSError as error:
+            errorCode = getattr(error, "winerror", None) or 0x80004005
+            self.liveToasts.dispatch_failed(tag, group, ToastFailedEventData(errorCode & 0xFFFFFFFF))
+            return False
+
+        return True
 
-        notificationToSend = _build_toast_notification(toast, toastNotification)
+    def _toast_released(self, tag: str, group: str) -> None:
+        self.sequenceAllocator.forget(tag, group)
+        retryPolicy = self.retryPolicy
+        if retryPolicy is not None:
+            retryPolicy._forget(tag, group)
 
-        self.toastNotifier.show(notificationToSend)
+        for observer in self._observers:
+            observer.toast_released(tag, group)
 
     def update_toast(self, toast: Toast) -> bool:
         """
-        Update the passed notification data with the new data in the clas
+        Update the passed notification data with the new data in the clas.
+        Safe to call from several threads at once; see :class:`~windows_toasts.sequencing.ToastSequenceAllocator`
 
         :param toast: Toast to update
         :type toast: Toast
         :return: Whether the update succeeded
         """
-        newData = _build_adaptable_data(toast)
-        updateResult = self.toastNotifier.update_with_tag_and_group(newData, toast.tag, toast.group or toast.tag)
-        return updateResult == NotificationUpdateResult.SUCCEEDED
+        succeeded, _ = self._update_binding_values(
+            toast.tag, toast.group or toast.tag, lambda: _build_binding_values(toast), toast.updates, toast
+        )
+        return succeeded
+
+    def _update_binding_values(
+        self,
+        tag: str,
+        group: str,
+        buildValues: Callable[[], Mapping[str, Optional[str]]],
+        minimumSequenceNumber: int = 0,
+        toast: Optional[Toast] = None,
+    ) -> Tuple[bool, int]:
+        """
+        Update a toast by its tag and group, e.g. from a :class:`ToastHandle`. The values are built and sent while
+        holding the toast's sequence lock, so concurrent updates reach the notifier in sequence number order
+
+        :param buildValues: Returns the binding values to update with
+        :param minimumSequenceNumber: The sequence number used will be greater than this
+        :param toast: If passed, its update counter is set to the sequence number used
+        :return: Whether the update succeeded, and the sequence number used
+        """
+        timer = self._start_timing("update")
+
+        def update(sequenceNumber: int) -> Tuple[NotificationUpdateResult, int, Mapping[str, Optional[str]]]:
+            timer.stage("lock")
+            if toast is not None:
+                toast.updates = sequenceNumber
+
+            bindingValues = buildValues()
+            timer.stage("build")
+            newData = _build_notification_data(bindingValues, sequenceNumber)
+            return self.toastNotifier.update_with_tag_and_group(newData, tag, group), sequenceNumber, bindingValues
+
+        try:
+            if (tag, group) not in self.liveToasts:
+                # Track the toast from its first update, so that the sequence state kept for it is dropped once it is
+                # released, e.g. because it expired. Updates through a handle only have the tag to go on
+                trackedToast = toast
+                if trackedToast is None:
+                    trackedToast = Toast(group=group)
+                    trackedToast.tag = tag
+
+                self.liveToasts.register(trackedToast, group)
+
+            updateResult, sequenceNumber, bindingValues = self.sequenceAllocator.allocate(
+                tag, group, update, minimumSequenceNumber
+            )
+            if updateResult == NotificationUpdateResult.NOTIFICATION_NOT_FOUND:
+                self.liveToasts.release(tag, group)
+
+            succeeded = updateResult == NotificationUpdateResult.SUCCEEDED
+            timer.stage("deliver")
+
+            for observer in self._observers:
+                observer.toast_updated(tag, group, succeeded)
+
+            timer.stage("observers")
+        finally:
+            timer.stop()
+
+        timer.finish(self, toast, bindingValues)
+        return succeeded, sequenceNumber
 
     def schedule_toast(self, toast: Toast, displayTime: datetime) -> None:
         """
-        Schedule the passed notification toast. Warning: scheduled toasts cannot be updated or activated (i.e. on_X)
+        Schedule the passed notification toast. Warning: scheduled toasts cannot be updated, and their on_dismissed
+        and on_failed are never called. Windows raises no events for them, so their on_activated is only called if
+        there is an :attr:`activationDispatcher` to register it with, and the app passes the activation it is launched
+        with to :meth:`~windows_toasts.activation.ToastActivationDispatcher.dispatch`
 
         :param toast: Toast to display
         :type toast: Toast
         :param displayTime: Time to display the toast on
         :type displayTime: datetime
         """
-        toastNotification = ScheduledToastNotification(self._setup_toast(toast, False).xmlDocument, displayTime)
-        scheduledNotificationToSend = _build_toast_notification(toast, toastNotification)
+        timer = self._start_timing("schedule")
+        try:
+            xmlDocument = self._setup_toast(toast, False).xmlDocument
+            timer.stage("build")
+            toastNotification = ScheduledToastNotification(xmlDocument, displayTime)
+            scheduledNotificationToSend = _build_toast_notification(toast, toastNotification)
+            timer.stage("notification")
+
+            self.toastNotifier.add_to_schedule(scheduledNotificationToSend)
+            timer.stage("deliver")
+
+            activationDispatcher = self.activationDispatcher
+            if activationDispatcher is not None:
+                activationDispatcher.register_toast(toast, displayTime)
+
+            for observer in self._observers:
+                observer.toast_scheduled(toast, displayTime)
+
+            timer.stage("observers")
+        finally:
+            timer.stop()
 
-        self.toastNotifier.add_to_schedule(scheduledNotificationToSend)
+        timer.finish(self, toast, xmlDocument)
 
     def unschedule_toast(self, toast: Toast) -> None:
         """
@@ -193,13 +654,21 @@ class BaseWindowsToaster:
             raise ToastNotFoundError(f"Toast unscheduling failed. Toast {toast} not found")
 
         self.toastNotifier.remove_from_schedule(targetNotification)
+        self._forget_activation(toast.tag)
+
+        for observer in self._observers:
+            observer.toast_unscheduled(toast.tag)
 
     def clear_toasts(self) -> None:
         """
         Clear toasts popped by this toaster
         """
-        toastHistory: ToastNotificationHistory = ToastNotificationManager.history
-        toastHistory.clear_with_id(self._AUMID)
+        self.toastHistory.clear_with_id(self._AUMID)
+        self.sequenceAllocator.clear()
+        self.liveToasts.clear()
+
+        for observer in self._observers:
+            observer.toasts_cleared()
 
     def clear_scheduled_toasts(self) -> None:
         """
@@ -208,21 +677,134 @@ class BaseWindowsToaster:
         scheduledToasts = self.toastNotifier.get_scheduled_toast_notifications()
         for toast in scheduledToasts:
             self.toastNotifier.remove_from_schedule(toast)
+            self._forget_activation(toast.tag)
+
+            for observer in self._observers:
+                observer.toast_unscheduled(toast.tag)
 
     def remove_toast(self, toast: Toast) -> None:
         """
         Removes an individual popped toast
         """
-        # Is fetching toastHistory expensive? Should this be stored in an instance variable?
-        toastHistory: ToastNotificationHistory = ToastNotificationManager.history
-        toastHistory.remove_grouped_tag_with_id(toast.tag, toast.group or toast.tag, self._AUMID)
+        self._remove_by_tag(toast.tag, toast.group or toast.tag)
+
+    def _remove_by_tag(self, tag: str, group: str) -> None:
+        self.toastHistory.remove_grouped_tag_with_id(tag, group, self._AUMID)
+        self.sequenceAllocator.forget(tag, group)
+        self.liveToasts.release(tag, group)
+        self._forget_activation(tag)
+
+        for observer in self._observers:
+            observer.toast_removed(tag, group)
+
+    def _forget_activation(self, tag: str) -> None:
+        # Only forgets toasts registered by schedule_toast, not handlers registered for the tag by the user
+        activationDispatcher = self.activationDispatcher
+        if activationDispatcher is not None:
+            activationDispatcher._forget_toast(tag)
 
     def remove_toast_group(self, toastGroup: str) -> None:
         """
         Removes a group of toast notifications, identified by the specified group ID
         """
-        toastHistory: ToastNotificationHistory = ToastNotificationManager.history
-        toastHistory.remove_group_with_id(toastGroup, self._AUMID)
+        self.toastHistory.remove_group_with_id(toastGroup, self._AUMID)
+        self.sequenceAllocator.forget_group(toastGroup)
+        self.liveToasts.release_group(toastGroup)
+
+        for observer in self._observers:
+            observer.group_removed(toastGroup)
+
+    def remove_toasts(
+        self, toasts: Iterable[Union[Toast, str]], chunkSize: int = 500, chunkDelay: float = 0.0
+    ) -> BulkRemovalResult:
+        """
+        Remove many toasts, going over a single snapshot of the action center rather than one call per toast.
+        Groups whose toasts all match are removed with a single call
+
+        :param toasts: Toasts, or tags of toasts in any group
+        :param chunkSize: Number of removal calls to make before pausing
+        :param chunkDelay: Seconds to pause between chunks, so as not to hold up the notification platform
+        :return: How many toasts were removed, and how
+        """
+        snapshot = self.toastHistory.get_history_with_id(self._AUMID)
+        keysByTag: Dict[str, List[Tuple[str, str]]] = {}
+        for notification in snapshot:
+            keysByTag.setdefault(notification.tag, []).append((notification.tag, notification.group))
+
+        result = BulkRemovalResult()
+        matchingKeys: Set[Tuple[str, str]] = set()
+        for toast in toasts:
+            if isinstance(toast, str):
+                tagKeys = keysByTag.get(toast, ())
+            else:
+                toastKey = (toast.tag, toast.group or toast.tag)
+                tagKeys = [toastKey] if toastKey in keysByTag.get(toast.tag, ()) else ()
+
+            if not tagKeys:
+                result.notFound += 1
+
+            matchingKeys.update(tagKeys)
+
+        return self._remove_matching(snapshot, matchingKeys, chunkSize, chunkDelay, result)
+
+    def remove_where(
+        self, predicate: Callable[[ToastNotification], bool], chunkSize: int = 500, chunkDelay: float = 0.0
+    ) -> BulkRemovalResult:
+        """
+        Remove the toasts in the action center that match a predicate, going over a single snapshot of it.
+        Groups whose toasts all match are removed with a single call
+
+        :param predicate: Called with each WinRT ToastNotification in the action center, e.g.
+            ``lambda notification: notification.group == "messages"``
+        :param chunkSize: Number of removal calls to make before pausing
+        :param chunkDelay: Seconds to pause between chunks, so as not to hold up the notification platform
+        :return: How many toasts were removed, and how
+        """
+        snapshot = self.toastHistory.get_history_with_id(self._AUMID)
+        matchingKeys = {(notification.tag, notification.group) for notification in snapshot if predicate(notification)}
+        return self._remove_matching(snapshot, matchingKeys, chunkSize, chunkDelay, BulkRemovalResult())
+
+    def _remove_matching(
+        self,
+        snapshot: Iterable[ToastNotification],
+        matchingKeys: Set[Tuple[str, str]],
+        chunkSize: int,
+        chunkDelay: float,
+        result: BulkRemovalResult,
+    ) -> BulkRemovalResult:
+        groupSizes: Dict[str, int] = {}
+        for notification in snapshot:
+            groupSizes[notification.group] = groupSizes.get(notification.group, 0) + 1
+
+        matchingByGroup: Dict[str, List[str]] = {}
+        for tag, group in matchingKeys:
+            matchingByGroup.setdefault(group, []).append(tag)
+
+        # Each removal is a single call, either of a whole group or of a single toast
+        removals: List[Tuple[str, Optional[str], int]] = []
+        for group, tags in matchingByGroup.items():
+            if len(tags) > 1 and len(tags) == groupSizes[group]:
+                removals.append((group, None, len(tags)))
+            else:
+                removals.extend((group, tag, 1) for tag in tags)
+
+        for i, (group, tag, toastCount) in enumerate(removals):
+            if i and chunkDelay and i % chunkSize == 0:
+                time.sleep(chunkDelay)
+
+            try:
+                if tag is None:
+                    self.remove_toast_group(group)
+                    result.groupsRemoved += 1
+                else:
+                    self._remove_by_tag(tag, group)
+            except OSError:
+                result.failed += 1
+                continue
+
+            result.removed += toastCount
+
+        return result
 
 
 class WindowsToaster(BaseWindowsToaster):
@@ -244,7 +826,15 @@ class WindowsToaster(BaseWindowsToaster):
         # .create_toast_notifier() fails with "Element not found"
         self.toastNotifier = ToastNotificationManager.create_toast_notifier_with_id(applicationText)
 
-    def show_toast(self, toast: Toast) -> None:  # pragma: no cover
+    def show_toast(self, toast: Toast, static: Optional[bool] = None) -> ToastHandle:  # pragma: no cover
+        self._warn_unsupported(toast)
+        return super().show_toast(toast, static)
+
+    def compile(self, toast: Toast, static: Optional[bool] = None) -> CompiledToast:
+        self._warn_unsupported(toast)
+        return super().compile(toast, static)
+
+    def _warn_unsupported(self, toast: Toast) -> None:
         if len(toast.inputs) > 0:
             warnings.warn(self.__InteractableWarningMessage.format("input fields"))
 
@@ -260,8 +850,6 @@ class WindowsToaster(BaseWindowsToaster):
         if any(toast_image.position == ToastImagePosition.Hero for toast_image in toast.images):
             warnings.warn(self.__InteractableWarningMessage.format("hero placements"))
 
-        super().show_toast(toast)
-
     def _setup_toast(self, toast, dynamic) -> ToastDocument:
         toastContent = super()._setup_toast(toast, dynamic)
 
@@ -299,6 +887,10 @@ class InteractableWindowsToaster(BaseWindowsToaster):
 
         self.toastNotifier = ToastNotificationManager.create_toast_notifier_with_id(self.notifierAUMID)
 
+    def _payload_key(self) -> Hashable:
+        # The application text is put in the attribution field when using the default AUMID
+        return type(self), self.applicationText if self.defaultAUMID else None
+
     def _setup_toast(self, toast, dynamic):
         toastContent = super()._setup_toast(toast, dynamic)
 
@@ -312,8 +904,7 @@ class InteractableWindowsToaster(BaseWindowsToaster):
                 toastContent.SetTextFieldStatic(i, fieldContent)
 
         toastContent.SetAttribute(toastContent.bindingNode, "template", "ToastGeneric")
-        toastNode = toastContent.GetElementByTagName("toast")
-        toastContent.SetAttribute(toastNode, "useButtonStyle", "true")
+        toastContent.SetAttribute(toastContent.toastNode, "useButtonStyle", "true")
 
         # If we haven't set up our own AUMID, put our application text in the attribution field
         if self.defaultAUMID and toast.attribution_text is None:
@@ -90,7 +90,7 @@ class ToastImage:
         Initialise an :class:`ToastImage` class to use in certain classes.
         Online images are supported only in packaged apps that have the internet capability in their manifest.
         Unpackaged apps don't support http images; you must download the image to your local app data,
-        and reference it locally.
+        and reference it locally, e.g. with :class:`~windows_toasts.images.ToastImageFetcher`.
 
         :param imagePath: The path to an image file
         :type imagePath: Union[str, PathLike]
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta
+
+
+def test_activation_dispatcher():
+    from src.windows_toasts import ToastActivationDispatcher
+
+    dispatcher = ToastActivationDispatcher()
+    activations = []
+    dispatcher.register_tag("report", lambda eventArgs: activations.append(("tag", eventArgs.arguments)))
+    dispatcher.register_arguments("open", lambda eventArgs: activations.append(("arguments", eventArgs.arguments)))
+    dispatcher.register_action("reply", lambda eventArgs: activations.append(("action", eventArgs.inputs)))
+    assert len(dispatcher) == 3
+
+    # The tag wins over the arguments, and arguments double as the tag when it isn't known
+    assert dispatcher.dispatch("open", tag="report")
+    assert dispatcher.dispatch("report")
+    assert dispatcher.dispatch("open", tag="other")
+    assert dispatcher.dispatch("action=reply&id=42", {"message": "On it"})
+    assert not dispatcher.dispatch("action=forward&id=42")
+    assert not dispatcher.dispatch(None)
+    assert activations == [("tag", "open"), ("tag", "report"), ("arguments", "open"), ("action", {"message": "On it"})]
+    assert (dispatcher.dispatchedCount, dispatcher.unhandledCount) == (4, 2)
+
+    # Handlers registered by the user last until they are unregistered
+    assert dispatcher.unregister_tag("report")
+    assert not dispatcher.unregister_tag("report")
+    assert dispatcher.unregister_arguments("open")
+    assert dispatcher.unregister_action("reply")
+    assert len(dispatcher) == 0
+
+
+def test_register_toast():
+    from src.windows_toasts import Toast, ToastActivationDispatcher, ToastButton
+
+    dispatcher = ToastActivationDispatcher(defaultLifetime=60)
+    activations = []
+    toast = Toast(["Build finished"], actions=[ToastButton("Open", "open-build-1")], on_activated=activations.append)
+    assert dispatcher.register_toast(toast)
+    assert not dispatcher.register_toast(Toast(["No callback"]))
+
+    # The registration ends with the first activation, whether by tag or by button
+    assert dispatcher.dispatch("open-build-1")
+    assert not dispatcher.dispatch(toast.tag)
+    assert len(dispatcher) == 0
+
+    # Toasts are forgotten once they expire, when later toasts are registered
+    dispatcher.register_toast(toast, datetime.now() - timedelta(minutes=2))
+    expiringToast = Toast(["Expiring"], expiration_time=datetime.now() - timedelta(seconds=1), on_activated=print)
+    dispatcher.register_toast(expiringToast)
+    dispatcher.register_toast(Toast(["Fresh"], on_activated=print))
+    assert not dispatcher.dispatch(toast.tag)
+    assert not dispatcher.dispatch(expiringToast.tag)
+    assert len(dispatcher) == 1
+    assert [eventArgs.arguments for eventArgs in activations] == ["open-build-1"]
+
+
+def test_toaster_routes_activations():
+    from src.windows_toasts import InteractableWindowsToaster, SimulatedToastNotifier, Toast, ToastActivationDispatcher
+
+    toaster = InteractableWindowsToaster("Python")
+    notifier = SimulatedToastNotifier().attach(toaster)
+    dispatcher = toaster.activationDispatcher = ToastActivationDispatcher()
+    activations = []
+
+    # Windows raises no events for scheduled toasts, so their activations come through the app's launch handler
+    scheduledToast = Toast(["Stand-up"], on_activated=lambda eventArgs: activations.append("scheduled"))
+    unscheduledToast = Toast(["Cancelled"], on_activated=lambda eventArgs: activations.append("unscheduled"))
+    toaster.schedule_toast(scheduledToast, datetime.now() - timedelta(seconds=1))
+    toaster.schedule_toast(unscheduledToast, datetime.now() - timedelta(seconds=1))
+    toaster.unschedule_toast(unscheduledToast)
+    assert notifier.deliver_scheduled() == 1
+    assert not notifier.activate(scheduledToast.tag)
+    assert dispatcher.dispatch(scheduledToast.tag)
+    assert not dispatcher.dispatch(unscheduledToast.tag)
+
+    # Toasts with an on_activated of their own keep it, and tracked toasts without one go to the dispatcher
+    ownToast = Toast(["Own"], on_activated=lambda eventArgs: activations.append("own"))
+    dismissibleToast = Toast(["Dismissible"], on_dismissed=print)
+    plainToast = Toast(["Plain"])
+    dispatcher.register_action("archive", lambda eventArgs: activations.append("archived"))
+    toaster.show_toast(ownToast)
+    toaster.show_toast(dismissibleToast)
+    toaster.show_toast(plainToast)
+    assert notifier.activate(ownToast.tag, arguments="action=archive")
+    assert notifier.activate(dismissibleToast.tag, arguments="action=archive&id=6")
+    assert (ownToast.tag, ownToast.tag) not in toaster.liveToasts
+    assert (dismissibleToast.tag, dismissibleToast.tag) not in toaster.liveToasts
+
+    # The dispatcher adds no handlers to toasts without callbacks, so they are left to the launch handler too
+    assert not notifier.activate(plainToast.tag, arguments="action=archive&id=7")
+    assert dispatcher.dispatch("action=archive&id=7")
+    assert len(toaster.liveToasts) == 0
+    assert activations == ["scheduled", "own", "archived", "archived"]
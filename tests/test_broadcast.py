@@ -0,0 +1,55 @@
+from pytest import warns
+
+from src.windows_toasts import (
+    InMemoryToastNotifier,
+    InteractableWindowsToaster,
+    Toast,
+    ToastBroadcaster,
+    ToastProgressBar,
+    WindowsToaster,
+)
+
+
+def test_broadcast():
+    toasters = [
+        InteractableWindowsToaster("Product A", "Vendor.ProductA"),
+        InteractableWindowsToaster("Product B", "Vendor.ProductB"),
+        WindowsToaster("Product C"),
+    ]
+    notifiers = [InMemoryToastNotifier().attach(toaster) for toaster in toasters]
+
+    builtCount = 0
+    for toaster in toasters:
+        buildPayload = toaster._setup_toast
+
+        def counting_setup_toast(toast, dynamic, buildPayload=buildPayload):
+            nonlocal builtCount
+            builtCount += 1
+            return buildPayload(toast, dynamic)
+
+        toaster._setup_toast = counting_setup_toast
+
+    broadcaster = ToastBroadcaster(toasters)
+    sharedToast = Toast(["Update available"], group="updates", progress_bar=ToastProgressBar("Downloading..."))
+    with warns(UserWarning, match="progress bars"):
+        toastBroadcast = broadcaster.show_toast(sharedToast)
+
+    assert toastBroadcast.succeeded
+    assert len(toastBroadcast.handles) == 3
+    # Both interactable toasters have their own AUMID, so they share the XML
+    assert builtCount == 2
+    assert all(notifier.values_of(sharedToast.tag, "updates")["text1"] == "Update available" for notifier in notifiers)
+
+    updateResults = toastBroadcast.update(progress=0.5)
+    assert [updateResult.succeeded for updateResult in updateResults] == [True, True, True]
+    assert all(notifier.values_of(sharedToast.tag, "updates")["progress"] == "0.5" for notifier in notifiers)
+
+    # A copy that is gone does not keep the others from being updated
+    toasters[1].remove_toast(sharedToast)
+    sharedToast.text_fields = ["Installing"]
+    updateResults = broadcaster.update_toast(sharedToast)
+    assert [updateResult.succeeded for updateResult in updateResults] == [True, False, True]
+    assert notifiers[2].values_of(sharedToast.tag, "updates")["text1"] == "Installing"
+
+    toastBroadcast.remove()
+    assert not any(len(notifier) for notifier in notifiers)
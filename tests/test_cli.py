@@ -0,0 +1,60 @@
+import io
+import json
+
+
+def test_cli_lines():
+    from src.windows_toasts import InteractableWindowsToaster
+    from src.windows_toasts.__main__ import run
+    from src.windows_toasts.notifiers import InMemoryToastNotifier
+
+    toaster = InteractableWindowsToaster("Python")
+    notifier = InMemoryToastNotifier().attach(toaster)
+
+    lines = [
+        {"text_fields": ["Deploying"], "tag": "deploy", "progress_bar": {"status": "Starting", "progress": 0}},
+        *(
+            {"op": "update", "tag": "deploy", "progress_bar": {"status": "Copying", "progress": i / 10}}
+            for i in range(10)
+        ),
+        {"text_fields": ["Unrelated"]},
+        {"op": "remove", "tag": "deploy"},
+        {"op": "explode"},
+    ]
+    inputStream = io.StringIO("\n".join(json.dumps(line) for line in lines) + "\n\nnot json\n")
+    outputStream = io.StringIO()
+
+    assert run(inputStream, outputStream, toaster, batchSize=4) == 2
+
+    results = [json.loads(line) for line in outputStream.getvalue().splitlines()]
+    assert [result["line"] for result in results] == [*range(1, 15), 16]
+    assert all(result["ok"] for result in results[:13])
+    assert results[12]["tag"] == "deploy"
+    assert "Unknown op 'explode'" in results[13]["error"]
+    assert "JSONDecodeError" in results[14]["error"]
+
+    assert notifier.shownCount == 2
+    assert notifier.updateCount == 10
+    assert notifier.values_of("deploy") is None
+
+
+def test_cli_forgets_untagged_toasts():
+    from src.windows_toasts import InteractableWindowsToaster
+    from src.windows_toasts.__main__ import ToastLineProcessor
+    from src.windows_toasts.notifiers import InMemoryToastNotifier
+
+    toaster = InteractableWindowsToaster("Python")
+    notifier = InMemoryToastNotifier().attach(toaster)
+    processor = ToastLineProcessor(toaster)
+
+    # Plain toasts with generated tags are not kept, however many are shown
+    results = [processor.process(i, json.dumps({"text_fields": [f"Message {i}"]})) for i in range(1000)]
+    processor.process(1000, json.dumps({"text_fields": ["Tagged"], "tag": "tagged"}))
+    processor.process(
+        1001, json.dumps({"text_fields": ["Upload"], "progress_bar": {"status": "Sending", "progress": 0}})
+    )
+    assert len(processor._toasts) == 2
+
+    # They can still be updated by the tag reported for them
+    result = processor.process(1002, json.dumps({"op": "update", "tag": results[0]["tag"], "text_fields": ["Edited"]}))
+    assert result["ok"]
+    assert notifier.updateCount == 1
@@ -0,0 +1,137 @@
+import os
+import sys
+import threading
+import uuid
+
+from pytest import fixture, raises
+
+from src.windows_toasts import InteractableWindowsToaster, Toast, ToastActivatedEventArgs, ToastProgressBar
+from src.windows_toasts.serialization import encode_binary
+
+
+@fixture
+def daemon_address(tmp_path):
+    if sys.platform == "win32":
+        return rf"\\.\pipe\windows-toasts-test-{uuid.uuid4()}"
+
+    return str(tmp_path / "daemon.sock")
+
+
+def test_daemon_round_trip(daemon_address):
+    from src.windows_toasts.daemon import ToastDaemon, ToastDaemonClient
+    from src.windows_toasts.notifiers import InMemoryToastNotifier
+
+    toaster = InteractableWindowsToaster("Python")
+    notifier = InMemoryToastNotifier().attach(toaster)
+
+    received = []
+    activatedEvent = threading.Event()
+    progressToast = Toast(["Building"], progress_bar=ToastProgressBar("Compiling...", progress=0))
+    progressToast.on_activated = lambda eventArgs: (received.append(eventArgs), activatedEvent.set())
+
+    with ToastDaemon(toaster, daemon_address, authkey=b"secret") as daemon:
+        with ToastDaemonClient(daemon_address, authkey=b"secret") as client:
+            # Pipelined: nothing is waited on until every request has been sent
+            futures = [client.show_toast(Toast([f"Toast #{i}"])) for i in range(50)]
+            futures.append(client.show_toast(progressToast))
+
+            progressToast.progress_bar.progress = 0.5
+            updateFuture = client.update_toast(progressToast)
+
+            for future in futures:
+                assert future.result(timeout=10) is None
+            assert updateFuture.result(timeout=10) is True
+
+            assert notifier.shownCount == 51
+            assert notifier.values_of(progressToast.tag)["progress"] == "0.5"
+
+            # Events raised in the daemon are relayed to the client that submitted the toast
+            shownToast, _ = daemon._toasts[progressToast.tag]
+            shownToast.on_activated(ToastActivatedEventArgs("clicked", {"reply": "Hi"}))
+            assert activatedEvent.wait(10)
+            assert received == [ToastActivatedEventArgs("clicked", {"reply": "Hi"})]
+
+            client.remove_toast(progressToast).result(timeout=10)
+            assert notifier.values_of(progressToast.tag) is None
+
+            with raises(RuntimeError, match="ToastSerializationError"):
+                client._submit("show", {"schema": 1000}, []).result(timeout=10)
+
+
+def test_daemon_robustness(daemon_address, monkeypatch):
+    from src.windows_toasts.daemon import ToastDaemon, ToastDaemonClient
+    from src.windows_toasts.notifiers import InMemoryToastNotifier
+
+    toaster = InteractableWindowsToaster("Python")
+    notifier = InMemoryToastNotifier().attach(toaster)
+    activatedEvent = threading.Event()
+
+    def failing_callback(_):
+        activatedEvent.set()
+        raise ValueError("Callback failed")
+
+    def failing_show(*_):
+        raise OSError("Notification platform unavailable")
+
+    with ToastDaemon(toaster, daemon_address) as daemon:
+        if sys.platform != "win32":
+            # A second daemon does not take the socket over from a running one
+            with raises(OSError, match="already listening"):
+                ToastDaemon(toaster, daemon_address).start()
+
+        with ToastDaemonClient(daemon_address) as client:
+            # Malformed requests get an error reply instead of stopping the dispatcher
+            for message in ([], {"show": 1}, 42, ["show", 0]):
+                client._connection.send_bytes(encode_binary(message))
+            with raises(RuntimeError, match="Wrong number of arguments"):
+                client._submit("update").result(timeout=10)
+
+            # Only toasts with callbacks are kept, until the toaster releases them
+            plainToast = Toast(["Plain"])
+            callbackToast = Toast(["Callback"], on_activated=failing_callback)
+            client.show_toast(plainToast).result(timeout=10)
+            client.show_toast(callbackToast).result(timeout=10)
+            assert list(daemon._toasts) == [callbackToast.tag]
+
+            # A failing callback does not stop the client from receiving replies
+            notifier.activate(callbackToast.tag)
+            assert activatedEvent.wait(10)
+            assert daemon._toasts == {}
+            # Garbage frames are answered with an error too, without closing the connection
+            client._connection.send_bytes(b"garbage")
+            afterToast = Toast(["After"], on_dismissed=print)
+            assert client.show_toast(afterToast).result(timeout=10) is None
+            assert len(daemon._toasts) == 1
+
+            # Toasts can only be updated and removed by the client that showed them
+            with ToastDaemonClient(daemon_address) as otherClient:
+                with raises(RuntimeError, match="another client"):
+                    otherClient.remove_toast(afterToast).result(timeout=10)
+                with raises(RuntimeError, match="another client"):
+                    otherClient.update_toast(afterToast).result(timeout=10)
+            assert len(daemon._toasts) == 1
+
+            # Toasts that fail to show are not kept
+            with monkeypatch.context() as patch:
+                patch.setattr(toaster, "show_toast", failing_show)
+                with raises(RuntimeError, match="OSError"):
+                    client.show_toast(Toast(["Failing"], on_activated=print)).result(timeout=10)
+            assert len(daemon._toasts) == 1
+
+        # Submissions that cannot be sent fail instead of never resolving
+        with raises(OSError):
+            client.show_toast(Toast(["Closed"])).result(timeout=10)
+
+        # Toasts of clients that disconnected are dropped
+        for _ in range(100):
+            if not daemon._toasts:
+                break
+            threading.Event().wait(0.05)
+        assert daemon._toasts == {}
+
+    if sys.platform != "win32":
+        # The socket left behind by a daemon that is gone is replaced
+        with open(daemon_address, "w"):
+            pass
+        with ToastDaemon(toaster, daemon_address):
+            assert oct(os.stat(daemon_address).st_mode & 0o777) == "0o600"
@@ -0,0 +1,80 @@
+def test_history_index():
+    from src.windows_toasts import InteractableWindowsToaster, Toast
+    from src.windows_toasts.history import ToastHistoryIndex
+    from src.windows_toasts.notifiers import InMemoryToastNotifier
+
+    toaster = InteractableWindowsToaster("Python")
+    notifier = InMemoryToastNotifier().attach(toaster)
+
+    # Toasts shown before the index was created are picked up from the history
+    earlyToast = Toast(["Shown before indexing"], group="downloads")
+    toaster.show_toast(earlyToast)
+
+    history = ToastHistoryIndex(toaster, reconcileInterval=None)
+    assert history.exists(earlyToast.tag, "downloads")
+    assert earlyToast in history
+
+    toasts = [Toast([f"Toast {i}"], group="downloads" if i % 2 else None) for i in range(10)]
+    for toast in toasts:
+        toaster.show_toast(toast)
+
+    assert len(history) == 11
+    assert history.count("downloads") == 6
+    assert history.counts_by_group()["downloads"] == 6
+    assert history.get(toasts[0].tag).age >= 0
+    assert history.older_than(3600) == []
+
+    toaster.remove_toast(toasts[1])
+    toaster.remove_toast(toasts[2])
+    assert not history.exists(toasts[1].tag, "downloads")
+    assert not history.exists(toasts[2].tag)
+    assert len(history) == 9
+
+    toaster.remove_toast_group("downloads")
+    assert history.count("downloads") == 0
+    assert len(history) == 4
+
+    # Changes made behind the toaster's back are picked up on reconciliation, keeping the original timestamps
+    firstSeen = history.get(toasts[0].tag).firstSeen
+    notifier.hide(notifier._snapshot()[-1])
+    assert len(history) == 4
+    history.refresh()
+    assert len(history) == 3
+    assert history.get(toasts[0].tag).firstSeen == firstSeen
+
+    toaster.clear_toasts()
+    assert len(history) == 0
+
+    history.close()
+    toaster.show_toast(toasts[0])
+    assert len(history) == 0
+
+
+def test_history_refresh_race(monkeypatch):
+    import threading
+
+    from src.windows_toasts import InteractableWindowsToaster, Toast
+    from src.windows_toasts.history import ToastHistoryIndex
+    from src.windows_toasts.notifiers import InMemoryToastNotifier
+
+    toaster = InteractableWindowsToaster("Python")
+    InMemoryToastNotifier().attach(toaster)
+    history = ToastHistoryIndex(toaster, reconcileInterval=None)
+    racingToast = Toast(["Shown during a refresh"])
+    get_history_with_id = toaster.toastHistory.get_history_with_id
+    showThreads = []
+
+    def racing_snapshot(aumid):
+        # The toast is shown after the snapshot is taken, but before the index swaps it in
+        snapshot = get_history_with_id(aumid)
+        showThread = threading.Thread(target=toaster.show_toast, args=(racingToast,))
+        showThread.start()
+        showThreads.append(showThread)
+        showThread.join(0.5)
+        return snapshot
+
+    monkeypatch.setattr(toaster.toastHistory, "get_history_with_id", racing_snapshot)
+    history.refresh()
+    monkeypatch.undo()
+    showThreads[0].join()
+    assert history.exists(racingToast.tag)
@@ -0,0 +1,167 @@
+import pytest
+
+
+def test_image_cache(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+
+    from src.windows_toasts import Toast, ToastDisplayImage, ToastImageCache, ToastImagePosition
+    from src.windows_toasts.images import _path_of
+
+    photoPath = tmp_path / "photo.jpg"
+    Image.new("RGB", (4000, 3000), (200, 30, 30)).save(photoPath)
+    smallPath = tmp_path / "small.png"
+    Image.new("RGB", (20, 20), (30, 200, 30)).save(smallPath)
+
+    toast = Toast(
+        ["Photos"],
+        images=[
+            ToastDisplayImage.fromPath(photoPath, position=ToastImagePosition.AppLogo, circleCrop=True),
+            ToastDisplayImage.fromPath(photoPath, position=ToastImagePosition.Hero),
+            ToastDisplayImage.fromPath(photoPath),
+            ToastDisplayImage.fromPath(smallPath),
+        ],
+    )
+
+    with ToastImageCache(tmp_path / "cache", scale=2.0) as cache:
+        assert cache.prepare(toast).result(timeout=60) is toast
+        preparedSizes = []
+        for displayImage in toast.images:
+            with Image.open(_path_of(displayImage.image)) as preparedImage:
+                preparedSizes.append(preparedImage.size)
+                if displayImage.circleCrop:
+                    # Outside the circle is transparent
+                    assert preparedImage.getpixel((0, 0))[3] == 0
+                    assert preparedImage.getpixel((48, 48))[3] == 255
+
+        assert preparedSizes == [(96, 96), (728, 360), (480, 360), (20, 20)]
+        assert toast.images[0].position == ToastImagePosition.AppLogo
+        assert toast.images[0].image.path.startswith((tmp_path / "cache").as_uri())
+        assert cache.misses == 4
+
+        # The same images again are served from the cache, without processing
+        sameToast = Toast(images=[ToastDisplayImage.fromPath(photoPath, position=ToastImagePosition.Hero)])
+        cache.prepare(sameToast).result(timeout=60)
+        assert sameToast.images[0].image == toast.images[1].image
+        assert cache.misses == 4
+
+        # Evicted down to the size limit, least recently used first
+        cache.maxBytes = 0
+        assert cache.evict() > 0
+        assert list((tmp_path / "cache").glob("*.png")) == []
+        assert len(cache._processed) == 0
+
+
+def test_image_cache_entries(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src.windows_toasts import ToastDisplayImage, ToastImageCache
+
+    sourcePaths = []
+    for i in range(5):
+        sourcePaths.append(tmp_path / f"source{i}.png")
+        Image.new("RGB", (20, 20), (i, 0, 0)).save(sourcePaths[-1])
+
+    # Only the most recently used sources are remembered, so the table stays bounded however many images go through
+    with ThreadPoolExecutor() as executor, ToastImageCache(
+        tmp_path / "cache", executor=executor, maxEntries=3
+    ) as cache:
+        for sourcePath in sourcePaths:
+            cache.submit(ToastDisplayImage.fromPath(sourcePath)).result(timeout=60)
+
+        assert [key[0] for key in cache._processed] == [str(sourcePath) for sourcePath in sourcePaths[2:]]
+
+        # Forgotten sources are found in the cache again by their content
+        cache.submit(ToastDisplayImage.fromPath(sourcePaths[0])).result(timeout=60)
+        assert (cache.misses, cache.hits) == (5, 1)
+        assert len(cache._processed) == 3
+
+
+def test_image_fetcher(tmp_path):
+    import http.server
+    import threading
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src.windows_toasts import InvalidImageException, ToastImageFetcher, ToastImagePosition
+    from src.windows_toasts.images import _path_of
+
+    imageData = {"/avatar.png": b"\x89PNG\r\n\x1a\n avatar", "/other.png": b"\x89PNG\r\n\x1a\n other"}
+    requests = []
+    declaredLengths = {"/declared.png"}
+
+    class ImageHandler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests.append((self.path, self.headers.get("If-None-Match")))
+            # Slow enough for concurrent fetches to overlap
+            time.sleep(0.1)
+            etag = f'"{hash(imageData[self.path])}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("ETag", etag)
+            if self.path in declaredLengths:
+                self.send_header("Content-Length", str(len(imageData[self.path])))
+            self.end_headers()
+            self.wfile.write(imageData[self.path])
+
+        def log_message(self, *_):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), ImageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    baseUrl = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        with ToastImageFetcher(tmp_path / "remote", maxAge=60) as fetcher:
+            # Concurrent fetches of the same image share one download
+            with ThreadPoolExecutor(8) as executor:
+                fetchFutures = list(executor.map(lambda _: fetcher.fetch(f"{baseUrl}/avatar.png"), range(8)))
+            fetchedImages = {fetchFuture.result(timeout=10).path for fetchFuture in fetchFutures}
+            assert len(fetchedImages) == 1
+            assert len(requests) == 1
+            localPath = _path_of(fetchFutures[0].result())
+            assert localPath.suffix == ".png"
+            assert localPath.read_bytes() == imageData["/avatar.png"]
+
+            # Fresh copies are used without contacting the server
+            displayImage = fetcher.display_image(f"{baseUrl}/avatar.png", position=ToastImagePosition.AppLogo)
+            assert displayImage.result(timeout=10).position == ToastImagePosition.AppLogo
+            assert len(requests) == 1
+            assert fetcher.hits == 1
+
+            # Stale copies are revalidated with their ETag
+            fetcher.maxAge = 0
+            fetcher.fetch(f"{baseUrl}/avatar.png").result(timeout=10)
+            assert requests[-1][1] is not None
+            assert fetcher.revalidations == 1
+            assert fetcher.downloads == 1
+
+            # Changed images are downloaded again
+            imageData["/avatar.png"] = b"\x89PNG\r\n\x1a\n new avatar"
+            assert (
+                _path_of(fetcher.fetch(f"{baseUrl}/avatar.png").result(timeout=10)).read_bytes().endswith(b"new avatar")
+            )
+            assert fetcher.downloads == 2
+
+            # Least recently used images are evicted once the cache is too large
+            fetcher.maxBytes = len(imageData["/other.png"])
+            fetcher.fetch(f"{baseUrl}/other.png").result(timeout=10)
+            assert not localPath.exists()
+            assert len(list((tmp_path / "remote").glob("*.png"))) == 1
+
+            # Images larger than the limit fail, whether or not the server says how large they are up front
+            fetcher.maxImageBytes = 64
+            imageData["/huge.png"] = imageData["/declared.png"] = b"\x89PNG\r\n\x1a\n" + bytes(100)
+            for path in ("/huge.png", "/declared.png"):
+                with pytest.raises(InvalidImageException, match="allowed"):
+                    fetcher.fetch(f"{baseUrl}{path}").result(timeout=10)
+            assert fetcher.downloads == 3
+    finally:
+        server.shutdown()
+        server.server_close()
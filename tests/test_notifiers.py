@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = datetime.now().timestamp()
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_simulated_rate_limit_and_history():
+    from src.windows_toasts import InteractableWindowsToaster, SimulatedToastNotifier, Toast
+
+    clock = FakeClock()
+    toaster = InteractableWindowsToaster("Python")
+    notifier = SimulatedToastNotifier(rateLimit=2, burst=5, historyCapacity=3, seed=1, clock=clock).attach(toaster)
+
+    toasts = [Toast([f"Toast {i}"]) for i in range(8)]
+    for toast in toasts:
+        toaster.show_toast(toast)
+
+    # The burst goes through, the rest is dropped silently, and only the newest make it to the action center
+    assert notifier.shownCount == 5
+    assert notifier.throttledCount == 3
+    assert notifier.evictedCount == 2
+    assert [notification.tag for notification in notifier.history.get_history_with_id("")] == [
+        toast.tag for toast in toasts[2:5]
+    ]
+
+    # Tokens come back with time, and showing a toast again moves it to the top
+    clock.now += 1
+    toaster.show_toast(toasts[2])
+    toaster.show_toast(toasts[5])
+    assert notifier.throttledCount == 3
+    assert [notification.tag for notification in notifier.history.get_history_with_id("")] == [
+        toasts[4].tag,
+        toasts[2].tag,
+        toasts[5].tag,
+    ]
+
+
+def test_simulated_failures():
+    from src.windows_toasts import InteractableWindowsToaster, SimulatedToastNotifier, Toast, ToastRetryPolicy
+    from src.windows_toasts.notifiers import TOAST_NOTIFICATION_DROPPED
+
+    toaster = InteractableWindowsToaster("Python")
+    notifier = SimulatedToastNotifier(failureRate=1, failureCode=0x80070057).attach(toaster)
+    failures = []
+    failedToast = Toast(["Failing"], on_failed=lambda eventArgs: failures.append(eventArgs.error_code))
+    toaster.show_toast(failedToast)
+    notifier.flush_events()
+    assert failures == [0x80070057]
+    assert notifier.failedCount == 1
+    assert len(notifier) == 0
+
+    # Throttled toasts can fail instead of disappearing, and are then retried
+    clock = FakeClock()
+    notifier = SimulatedToastNotifier(rateLimit=1, burst=1, dropSilently=False, clock=clock).attach(toaster)
+    retryPolicy = toaster.retryPolicy = ToastRetryPolicy(baseDelay=60)
+    toaster.show_toast(Toast(["First"]))
+    throttledToast = Toast(["Throttled"], on_failed=lambda eventArgs: failures.append(eventArgs.error_code))
+    toaster.show_toast(throttledToast)
+    notifier.flush_events()
+    assert notifier.throttledCount == 1
+    assert retryPolicy.pendingCount == 1
+    assert failures == [0x80070057]
+
+    retryPolicy.close()
+    toaster.retryPolicy = None
+    toaster.show_toast(throttledToast)
+    notifier.flush_events()
+    assert failures == [0x80070057, TOAST_NOTIFICATION_DROPPED]
+
+
+def test_simulated_scheduled_delivery():
+    from src.windows_toasts import InteractableWindowsToaster, SimulatedToastNotifier, Toast
+
+    clock = FakeClock()
+    toaster = InteractableWindowsToaster("Python")
+    notifier = SimulatedToastNotifier(scheduleJitter=30, seed=3, clock=clock).attach(toaster)
+
+    scheduledToasts = [Toast([f"Reminder {i}"]) for i in range(10)]
+    for i, scheduledToast in enumerate(scheduledToasts):
+        toaster.schedule_toast(scheduledToast, datetime.fromtimestamp(clock.now) + timedelta(seconds=60 + i))
+
+    toaster.unschedule_toast(scheduledToasts[9])
+    assert notifier.deliver_scheduled() == 0
+
+    clock.now += 120
+    assert notifier.deliver_scheduled() == 9
+    assert notifier.scheduledDeliveries == 9
+    assert notifier.get_scheduled_toast_notifications() == []
+    # Toasts scheduled a second apart arrive out of order, because of the jitter
+    deliveredTags = [notification.tag for notification in notifier.history.get_history_with_id("")]
+    assert sorted(deliveredTags) == sorted(toast.tag for toast in scheduledToasts[:9])
+    assert deliveredTags != [toast.tag for toast in scheduledToasts[:9]]
@@ -0,0 +1,39 @@
+def test_progress_aggregator():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src.windows_toasts import InteractableWindowsToaster
+    from src.windows_toasts.notifiers import InMemoryToastNotifier
+    from src.windows_toasts.progress import ToastProgressAggregator
+
+    toaster = InteractableWindowsToaster("Python")
+    notifier = InMemoryToastNotifier().attach(toaster)
+
+    with ToastProgressAggregator(toaster, minInterval=0.05) as aggregator:
+        build = aggregator.group("build", total=400, title="Parallel build", unit="files")
+        assert aggregator.group("build", total=1) is build
+
+        def worker(_):
+            for _ in range(4):
+                build.advance()
+
+        with ThreadPoolExecutor(16) as executor:
+            list(executor.map(worker, range(100)))
+
+        build.add_total(100)
+        build.advance(100)
+
+    values = notifier.values_of(build.toast.tag, "build")
+    assert values["status"] == "500 of 500 files"
+    assert values["progress"] == "1.0"
+    assert values["caption"] == "Parallel build"
+    # One smooth toast rather than an update per report
+    assert notifier.shownCount == 1
+    assert notifier.updateCount < 500
+
+    assert build.finish("Done!")
+    assert notifier.values_of(build.toast.tag, "build")["status"] == "Done!"
+
+    # A flush that was already running when the group finished does not overwrite the final status
+    build.advance()
+    assert not build._push()
+    assert notifier.values_of(build.toast.tag, "build")["status"] == "Done!"
@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+
+
+def test_record_and_replay(tmp_path):
+    from src.windows_toasts import InMemoryToastNotifier, InteractableWindowsToaster, Toast, ToastButton
+    from src.windows_toasts.recording import TrafficRecorder, read_recording, replay_traffic
+
+    toaster = InteractableWindowsToaster("Python")
+    InMemoryToastNotifier().attach(toaster)
+    recordingPath = tmp_path / "traffic.wtr"
+
+    with TrafficRecorder(toaster, recordingPath) as recorder:
+        toasts = [
+            Toast([f"Message {i}", "Secret"], group="chat", actions=[ToastButton("Open", f"id={i}")]) for i in range(5)
+        ]
+        toastHandles = [toaster.show_toast(toast) for toast in toasts]
+        toastHandles[0].update(["Message 0", "Edited"])
+        toaster.remove_toast(toasts[1])
+        scheduledToast = Toast(["Later"])
+        toaster.schedule_toast(scheduledToast, datetime.now() + timedelta(hours=1))
+        toaster.unschedule_toast(scheduledToast)
+        toaster.remove_toast_group("chat")
+
+    assert recorder.recordCount == 10
+    records = list(read_recording(recordingPath))
+    assert [record.operation for record in records] == [
+        *["show"] * 5,
+        "update",
+        "remove",
+        "schedule",
+        "unschedule",
+        "remove_group",
+    ]
+    assert records[0].tag == toasts[0].tag and records[0].group == "chat"
+    assert records[7].group == scheduledToast.tag and 3590 < records[7].displayDelay <= 3600
+    assert all(later.offset >= earlier.offset for earlier, later in zip(records, records[1:]))
+    # Content is redacted, but the sizes are kept, so the toasts differing only in their texts share a shape
+    assert records[0].shape["text_fields"] == ["xxxxxxxxx", "xxxxxx"]
+    assert records[0].shape["actions"][0]["arguments"] == "xxxx"
+    assert records[0].shape is records[4].shape
+
+    replayToaster = InteractableWindowsToaster("Python")
+    replayNotifier = InMemoryToastNotifier().attach(replayToaster)
+    report = replay_traffic(recordingPath, replayToaster, speed=100, workers=2)
+    assert report.operations == 10
+    assert report.errors == {}
+    assert report.throughput > 0
+    assert set(report.latencies) == {"show", "update", "remove", "schedule", "unschedule", "remove_group"}
+    assert report.latencies["show"][50] <= report.latencies["show"][100]
+    assert replayNotifier.shownCount == 5
+    assert replayNotifier.updateCount == 1
+    assert len(replayNotifier) == 0
+
+
+def test_truncated_recording(tmp_path):
+    import pytest
+
+    from src.windows_toasts import InMemoryToastNotifier, InteractableWindowsToaster, Toast, ToastSerializationError
+    from src.windows_toasts.recording import TrafficRecorder, read_recording
+
+    toaster = InteractableWindowsToaster("Python")
+    InMemoryToastNotifier().attach(toaster)
+    recordingPath = tmp_path / "traffic.wtr"
+    with TrafficRecorder(toaster, recordingPath, redact=False):
+        toaster.show_toast(Toast(["Kept"]))
+        toaster.show_toast(Toast(["Cut short"]))
+
+    recordingPath.write_bytes(recordingPath.read_bytes()[:-3])
+    records = list(read_recording(recordingPath))
+    assert len(records) == 1
+    assert records[0].shape["text_fields"] == ["Kept"]
+
+    recordingPath.write_bytes(b"not a recording")
+    with pytest.raises(ToastSerializationError):
+        list(read_recording(recordingPath))
+
+
+def test_redaction_and_shape_cap(tmp_path):
+    from src.windows_toasts import (
+        InMemoryToastNotifier,
+        InteractableWindowsToaster,
+        Toast,
+        ToastButton,
+        ToastDisplayImage,
+        ToastImage,
+        ToastInputSelectionBox,
+        ToastInputTextBox,
+        ToastProgressBar,
+        ToastSelection,
+    )
+    from src.windows_toasts.recording import TrafficRecorder, read_recording
+
+    toaster = InteractableWindowsToaster("Python")
+    InMemoryToastNotifier().attach(toaster)
+    recordingPath = tmp_path / "traffic.wtr"
+    imagePath = tmp_path / "secret.png"
+    imagePath.write_bytes(b"")
+    toast = Toast(
+        ["Secret"],
+        progress_bar=ToastProgressBar("Uploading", "payroll.xlsx", 0.5, "Half"),
+        images=[ToastDisplayImage(ToastImage(imagePath), "Private photo")],
+        inputs=[
+            ToastInputTextBox("reply", "Reply to Alice", "Type here"),
+            ToastInputSelectionBox("snooze", "Snooze", [ToastSelection("15", "Until the payroll meeting")]),
+        ],
+        actions=[ToastButton("Send", "send", tooltip="Send to Alice")],
+    )
+    with TrafficRecorder(toaster, recordingPath, maxShapes=2) as recorder:
+        toaster.show_toast(toast)
+        for i in range(3):
+            toaster.show_toast(Toast([f"Unique {i}"]))
+        toaster.show_toast(toast)
+        assert len(recorder._shapeIds) == 2
+
+    records = list(read_recording(recordingPath))
+    shape = records[0].shape
+    assert shape["progress_bar"] == {
+        "status": "xxxxxxxxx",
+        "progress": 0.5,
+        "caption": "xxxxxxxxxxxx",
+        "progress_override": "xxxx",
+    }
+    scheme, _, location = shape["images"][0]["image"].partition("://")
+    assert scheme == "file" and set(location) == {"x"}
+    assert shape["images"][0]["altText"] == "xxxxxxxxxxxxx"
+    assert shape["inputs"][0]["caption"] == "xxxxxxxxxxxxxx" and shape["inputs"][0]["placeholder"] == "xxxxxxxxx"
+    assert shape["inputs"][1]["selections"] == [["15", "xxxxxxxxxxxxxxxxxxxxxxxxx"]]
+    assert shape["actions"][0]["tooltip"] == "xxxxxxxxxxxxx"
+    # The first shape was forgotten, so it is written again under a new ID when the toast is shown again
+    assert records[4].shape is not shape and records[4].shape["inputs"] == shape["inputs"]
@@ -0,0 +1,138 @@
+def test_live_toast_registry():
+    import gc
+    from datetime import datetime, timedelta
+
+    from src.windows_toasts import InteractableWindowsToaster, Toast, ToastActivatedEventArgs
+    from src.windows_toasts.events import ToastDismissalReason, ToastDismissedEventData
+    from src.windows_toasts.notifiers import InMemoryToastNotifier
+
+    toaster = InteractableWindowsToaster("Python")
+    InMemoryToastNotifier().attach(toaster)
+    registry = toaster.liveToasts
+
+    # Toasts without callbacks are only tracked once they are updated, and without any event handlers
+    plainToast = Toast(["No callbacks"], group="plain")
+    toaster.show_toast(plainToast)
+    assert registry.liveCount == 0
+    toaster.update_toast(plainToast)
+    assert registry.liveCount == 1
+    assert registry.handlersRegistered == 0
+    toaster.remove_toast_group("plain")
+
+    receivedEvents = []
+    toast = Toast(["Tracked"], on_activated=receivedEvents.append, on_dismissed=receivedEvents.append)
+    tag = toast.tag
+    toaster.show_toast(toast)
+    assert registry.liveCount == 1
+    assert registry.leakedHandlers == 3
+
+    # Nothing keeps the toast alive, but its callbacks still run
+    del toast
+    gc.collect()
+    assert registry.get(tag, tag).toast is None
+
+    # Timing out moves the toast to the action center, where it can still be activated
+    assert registry.dispatch_dismissed(tag, tag, ToastDismissedEventData(ToastDismissalReason.TIMED_OUT))
+    assert registry.liveCount == 1
+    assert registry.dispatch_activated(tag, tag, ToastActivatedEventArgs("clicked"))
+    assert receivedEvents[-1].arguments == "clicked"
+    assert registry.liveCount == 0
+    assert registry.releasedCount == 2
+    assert registry.leakedHandlers == 0
+    assert toaster.sequenceAllocator.current(tag, tag) is None
+    assert not registry.dispatch_activated(tag, tag, ToastActivatedEventArgs("clicked again"))
+    assert len(receivedEvents) == 2
+
+    # Expired and removed toasts are released without any event
+    expiredToast = Toast(["Expired"], on_failed=print, expiration_time=datetime.now() - timedelta(seconds=1))
+    removedToast = Toast(["Removed"], on_failed=print, group="removed")
+    toaster.show_toast(expiredToast)
+    assert registry.liveCount == 1
+    assert registry.sweep() == 1
+    toaster.show_toast(removedToast)
+    assert registry.liveCount == 1
+    toaster.remove_toast_group("removed")
+    assert registry.liveCount == 0
+    assert registry.releasedCount == 4
+    assert registry.leakedHandlers == 0
+
+
+def test_event_handler_leaks():
+    import gc
+    import tracemalloc
+
+    from src.windows_toasts import InteractableWindowsToaster, Toast, ToastDismissalReason
+    from src.windows_toasts.notifiers import InMemoryToastNotifier
+
+    toaster = InteractableWindowsToaster("Python")
+    notifier = InMemoryToastNotifier().attach(toaster)
+    receivedEvents = []
+
+    def cycle(i: int) -> None:
+        toast = Toast([f"Cycle {i}"], on_activated=receivedEvents.append, on_dismissed=receivedEvents.append)
+        toaster.show_toast(toast)
+        if i % 3 == 0:
+            notifier.activate(toast.tag)
+        elif i % 3 == 1:
+            notifier.dismiss(toast.tag)
+        else:
+            notifier.dismiss(toast.tag, reason=ToastDismissalReason.TIMED_OUT)
+            toaster.remove_toast(toast)
+
+        receivedEvents.clear()
+
+    for i in range(500):
+        cycle(i)
+
+    tracemalloc.start()
+    try:
+        gc.collect()
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(3000):
+            cycle(i)
+        gc.collect()
+        growth = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    assert toaster.liveToasts.liveCount == 0
+    assert toaster.liveToasts.leakedHandlers == 0
+    assert len(toaster.sequenceAllocator) == 0
+    assert len(notifier) == 0
+    # Nothing per toast is kept, so memory does not grow with the number of cycles
+    assert growth < 64 * 1024
+
+
+def test_fire_and_forget_toasts():
+    from src.windows_toasts import InteractableWindowsToaster, Toast
+    from src.windows_toasts.notifiers import InMemoryToastNotifier
+
+    toaster = InteractableWindowsToaster("Python")
+    notifier = InMemoryToastNotifier().attach(toaster)
+    for i in range(2000):
+        toaster.show_toast(Toast([f"Toast {i}"]))
+
+    # Toasts without callbacks that are never updated leave nothing behind in the toaster
+    assert notifier.shownCount == 2000
+    assert toaster.liveToasts.liveCount == 0
+    assert len(toaster.sequenceAllocator) == 0
+
+
+def test_failed_show_releases_toast(monkeypatch):
+    from pytest import raises
+
+    from src.windows_toasts import InteractableWindowsToaster, Toast
+    from src.windows_toasts.notifiers import InMemoryToastNotifier
+
+    toaster = InteractableWindowsToaster("Python")
+    notifier = InMemoryToastNotifier().attach(toaster)
+
+    def unavailable(_):
+        raise OSError("Notification platform unavailable")
+
+    # The entry, and the callback it holds, go as soon as showing the toast fails
+    monkeypatch.setattr(notifier, "show", unavailable)
+    with raises(OSError):
+        toaster.show_toast(Toast(["Failing"], on_activated=print))
+    assert toaster.liveToasts.liveCount == 0
+    assert toaster.liveToasts.leakedHandlers == 0
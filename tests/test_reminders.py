@@ -0,0 +1,128 @@
+import time
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def wait_until(condition) -> None:
+    deadline = time.time() + 5
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert condition()
+
+
+def test_reminder_engine():
+    from src.windows_toasts import InMemoryToastNotifier, ReminderEngine, Toast, WindowsToaster
+
+    clock = FakeClock()
+    toaster = WindowsToaster("Python")
+    notifier = InMemoryToastNotifier().attach(toaster)
+
+    with ReminderEngine(toaster, clock=clock) as engine:
+        toasts = [Toast([f"Reminder {i}"]) for i in range(5)]
+        for i, toast in enumerate(toasts):
+            engine.remind(toast, 60 * (i + 1))
+
+        # Setting a reminder again replaces it, and reminders can be cancelled by tag
+        engine.remind(toasts[4], 30)
+        assert engine.cancel(toasts[3].tag)
+        assert not engine.cancel(toasts[3].tag)
+        assert engine.pendingCount == 4
+        assert toasts[0].tag in engine
+
+        clock.now += 59
+        engine.fire_due()
+        wait_until(lambda: notifier.shownCount == 1)
+        assert notifier.values_of(toasts[4].tag) is not None
+
+        clock.now += 1
+        engine.fire_due()
+        wait_until(lambda: notifier.shownCount == 2)
+        assert notifier.values_of(toasts[0].tag) is not None
+
+        # Far away reminders go through the higher levels of the wheel
+        engine.remind(toasts[3], 3 * 24 * 3600)
+        clock.now += 3 * 24 * 3600
+        engine.fire_due()
+        wait_until(lambda: engine.firedCount == 5)
+        assert engine.pendingCount == 0
+        assert notifier.shownCount == 5
+
+
+def test_snooze_button():
+    from src.windows_toasts import (
+        InMemoryToastNotifier,
+        InteractableWindowsToaster,
+        ReminderEngine,
+        Toast,
+        ToastInputSelectionBox,
+        ToastSelection,
+    )
+    from src.windows_toasts.reminders import SNOOZE_ARGUMENTS
+
+    clock = FakeClock()
+    toaster = InteractableWindowsToaster("Python")
+    notifier = InMemoryToastNotifier().attach(toaster)
+    activations = []
+
+    with ReminderEngine(toaster, clock=clock) as engine:
+        selectionBox = ToastInputSelectionBox(
+            "snoozeTime", "Remind me in", (ToastSelection("15", "15 minutes"), ToastSelection("60", "1 hour"))
+        )
+        toast = Toast(["Meeting"], on_activated=activations.append)
+        snoozeButton = engine.add_snooze(toast, 300, selectionBox)
+        assert toast.actions == [snoozeButton]
+        assert toast.inputs == [selectionBox]
+
+        toaster.show_toast(toast)
+        notifier.activate(toast.tag, arguments=SNOOZE_ARGUMENTS, inputs={"snoozeTime": "15"})
+        assert activations == []
+        assert toast.tag in engine
+
+        clock.now += 15 * 60
+        engine.fire_due()
+        wait_until(lambda: notifier.shownCount == 2)
+
+        # Other buttons still reach the toast's own callback, and without a pick the fixed interval is used
+        notifier.activate(toast.tag, arguments="open")
+        assert [eventArgs.arguments for eventArgs in activations] == ["open"]
+        toaster.show_toast(toast)
+        notifier.activate(toast.tag, arguments=SNOOZE_ARGUMENTS)
+        clock.now += 300
+        engine.fire_due()
+        wait_until(lambda: notifier.shownCount == 4)
+
+
+def test_failing_reminder(monkeypatch):
+    from src.windows_toasts import InMemoryToastNotifier, ReminderEngine, Toast, WindowsToaster
+
+    clock = FakeClock()
+    toaster = WindowsToaster("Python")
+    notifier = InMemoryToastNotifier().attach(toaster)
+    brokenToast = Toast(["Broken"])
+    showToast = toaster.show_toast
+
+    def broken_show(toast):
+        if toast is brokenToast:
+            raise ValueError("Observer bug")
+        return showToast(toast)
+
+    monkeypatch.setattr(toaster, "show_toast", broken_show)
+    with ReminderEngine(toaster, resolution=0.01, clock=clock) as engine:
+        engine.remind(brokenToast, 1)
+        engine.remind(Toast(["Sibling"]), 1)
+        engine.remind(Toast(["Later"]), 2)
+
+        # The failure is counted without keeping the other reminders, due now or later, from firing
+        clock.now += 1
+        wait_until(lambda: engine.firedCount == 2)
+        assert engine.failedCount == 1
+        clock.now += 1
+        wait_until(lambda: notifier.shownCount == 2)
+        assert engine.failedCount == 1
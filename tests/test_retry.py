@@ -0,0 +1,79 @@
+import time
+
+from src.windows_toasts import InMemoryToastNotifier, InteractableWindowsToaster, Toast, ToastRetryPolicy
+
+THROTTLED = 0x803E0207
+
+
+def wait_until(condition) -> None:
+    deadline = time.time() + 5
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert condition()
+
+
+def test_retry_policy():
+    toaster = InteractableWindowsToaster("Python")
+    notifier = InMemoryToastNotifier().attach(toaster)
+    retryPolicy = toaster.retryPolicy = ToastRetryPolicy(maxAttempts=3, baseDelay=0.01, jitter=0.5)
+
+    failures = []
+    retriedToast = Toast(["Throttled"], on_failed=lambda eventArgs: failures.append(eventArgs.error_code))
+    toaster.show_toast(retriedToast)
+
+    # Transient failures are retried, until the toast runs out of attempts
+    for attempt in range(2):
+        assert notifier.fail(retriedToast.tag, errorCode=THROTTLED)
+        assert failures == []
+        wait_until(lambda: notifier.values_of(retriedToast.tag) is not None)
+
+    assert retryPolicy.retries == 2
+    assert notifier.fail(retriedToast.tag, errorCode=THROTTLED)
+    assert failures == [THROTTLED]
+    assert retryPolicy.givenUp == 1
+    assert (retriedToast.tag, retriedToast.tag) not in toaster.liveToasts
+
+    # Others are not retried, even for toasts without callbacks
+    plainToast = Toast(["Invalid"])
+    toaster.show_toast(plainToast)
+    assert notifier.fail(plainToast.tag, errorCode=0x80070057)
+    assert (plainToast.tag, plainToast.tag) not in toaster.liveToasts
+
+    # Toasts removed while waiting are not shown again
+    removedToast = Toast(["Removed"])
+    toaster.show_toast(removedToast)
+    retryPolicy.baseDelay = 0.2
+    notifier.fail(removedToast.tag, errorCode=THROTTLED)
+    toaster.remove_toast(removedToast)
+    wait_until(lambda: retryPolicy.pendingCount == 0)
+    assert notifier.values_of(removedToast.tag) is None
+    assert retryPolicy.retries == 2
+    assert not retryPolicy._attempts
+
+    # Unexpected errors are counted, and do not stop later retries
+    retryPolicy.baseDelay = 0.01
+    brokenToast, laterToast = Toast(["Broken"]), Toast(["Later"])
+    toaster.show_toast(brokenToast)
+    toaster.show_toast(laterToast)
+
+    def broken_show(notification):
+        raise ValueError("Broken notifier")
+
+    show, notifier.show = notifier.show, broken_show
+    notifier.fail(brokenToast.tag, errorCode=THROTTLED)
+    wait_until(lambda: retryPolicy.errorCount == 1)
+    notifier.show = show
+    notifier.fail(laterToast.tag, errorCode=THROTTLED)
+    wait_until(lambda: retryPolicy.retries == 3)
+
+    retryPolicy.close()
+
+
+def test_retry_delay():
+    retryPolicy = ToastRetryPolicy(baseDelay=1, maxDelay=5, jitter=0)
+    assert [retryPolicy.delay(attempt) for attempt in range(1, 6)] == [1, 2, 4, 5, 5]
+
+    retryPolicy.jitter = 0.5
+    assert all(2 <= retryPolicy.delay(3) <= 4 for _ in range(100))
+    assert retryPolicy.is_retryable(THROTTLED - 2**32)
@@ -0,0 +1,93 @@
+def test_schedule_overflow(tmp_path):
+    import time
+    from datetime import datetime, timedelta
+
+    from src.windows_toasts import InteractableWindowsToaster, ScheduleOverflowManager, Toast
+    from src.windows_toasts.notifiers import InMemoryToastNotifier
+
+    toaster = InteractableWindowsToaster("Python")
+    notifier = InMemoryToastNotifier().attach(toaster)
+    journalPath = tmp_path / "schedule.jsonl"
+
+    def scheduled_tags() -> set:
+        return {scheduledToast.tag for scheduledToast in notifier.get_scheduled_toast_notifications()}
+
+    now = datetime.now()
+    soonToast = Toast(["Soon"])
+    laterToasts = [Toast([f"Later {i}"]) for i in range(5)]
+    with ScheduleOverflowManager(toaster, capacity=3, persistPath=journalPath) as manager:
+        for i, laterToast in enumerate(laterToasts):
+            manager.schedule(laterToast, now + timedelta(hours=i + 1))
+
+        assert len(manager) == 5
+        assert manager.systemCount == 3
+        assert manager.waitingCount == 2
+        assert scheduled_tags() == {laterToast.tag for laterToast in laterToasts[:3]}
+
+        # An earlier toast takes the place of the latest scheduled one
+        manager.schedule(soonToast, now + timedelta(seconds=0.5))
+        assert scheduled_tags() == {soonToast.tag, laterToasts[0].tag, laterToasts[1].tag}
+        assert [upcomingToast for _, upcomingToast in manager.upcoming(2)] == [soonToast, laterToasts[0]]
+        assert manager.between(now + timedelta(minutes=90), now + timedelta(hours=10))[0][1] == laterToasts[1]
+
+        # Cancelling makes room for the next waiting toast
+        assert manager.cancel(laterToasts[0].tag)
+        assert not manager.cancel(laterToasts[0].tag)
+        assert scheduled_tags() == {soonToast.tag, laterToasts[1].tag, laterToasts[2].tag}
+
+        # Once Windows has displayed a toast, the background thread schedules the next one
+        notifier.remove_from_schedule(
+            next(
+                scheduled
+                for scheduled in notifier.get_scheduled_toast_notifications()
+                if scheduled.tag == soonToast.tag
+            )
+        )
+        deadline = time.time() + 5
+        while soonToast.tag in manager and time.time() < deadline:
+            time.sleep(0.05)
+
+        assert soonToast.tag not in manager
+        assert scheduled_tags() == {laterToast.tag for laterToast in laterToasts[1:4]}
+
+    # A new manager picks up where the last one left off
+    with ScheduleOverflowManager(toaster, capacity=3, persistPath=journalPath) as manager:
+        assert len(manager) == 4
+        assert manager.systemCount == 3
+        assert manager.get(laterToasts[4].tag)[1] == now + timedelta(hours=5)
+        assert manager.get(laterToasts[4].tag)[0].text_fields == ["Later 4"]
+
+
+def test_failed_scheduling(tmp_path, monkeypatch):
+    from datetime import datetime, timedelta
+
+    from pytest import raises
+
+    from src.windows_toasts import InteractableWindowsToaster, ScheduleOverflowManager, Toast
+    from src.windows_toasts.notifiers import InMemoryToastNotifier
+
+    toaster = InteractableWindowsToaster("Python")
+    notifier = InMemoryToastNotifier().attach(toaster)
+    journalPath = tmp_path / "schedule.jsonl"
+
+    def unavailable(*_):
+        raise OSError("Notification platform unavailable")
+
+    laterToast = Toast(["Later"])
+    overdueToast = Toast(["Overdue"])
+    with ScheduleOverflowManager(toaster, capacity=3, persistPath=journalPath) as manager:
+        # Toasts that fail to be scheduled or shown stay waiting, rather than being lost
+        with monkeypatch.context() as patch:
+            patch.setattr(toaster, "schedule_toast", unavailable)
+            patch.setattr(toaster, "show_toast", unavailable)
+            with raises(OSError):
+                manager.schedule(laterToast, datetime.now() + timedelta(hours=1))
+            with raises(OSError):
+                manager.schedule(overdueToast, datetime.now() - timedelta(hours=1))
+
+        assert (manager.waitingCount, manager.systemCount) == (2, 0)
+        assert "remove" not in journalPath.read_text()
+
+        assert manager.top_up() == 2
+        assert (len(manager), manager.systemCount) == (1, 1)
+        assert notifier.values_of(overdueToast.tag) is not None
@@ -0,0 +1,113 @@
+from pytest import raises
+
+from src.windows_toasts import Toast, ToastHandlerRegistry, ToastSerializationError
+
+
+def _build_full_toast(imagePath):
+    from datetime import datetime, timedelta, timezone
+
+    from src.windows_toasts import (
+        AudioSource,
+        ToastAudio,
+        ToastButton,
+        ToastButtonColour,
+        ToastDisplayImage,
+        ToastImage,
+        ToastImagePosition,
+        ToastInputSelectionBox,
+        ToastInputTextBox,
+        ToastProgressBar,
+        ToastScenario,
+        ToastSelection,
+        ToastSystemButton,
+        ToastSystemButtonAction,
+    )
+
+    selections = (ToastSelection("1", "1 minute"), ToastSelection("5", "5 minutes"))
+    selectionBox = ToastInputSelectionBox("snooze", "Snooze for", selections, selections[1])
+    textBox = ToastInputTextBox("reply", "Reply:", "Type here")
+
+    return Toast(
+        ["Hello, World!", None, "Goodbye"],
+        audio=ToastAudio(AudioSource.Call3, looping=True),
+        expiration_time=datetime.now(timezone.utc) + timedelta(hours=1),
+        group="messages",
+        launch_action="https://python.org",
+        progress_bar=ToastProgressBar("Downloading...", "python.exe", 0.25),
+        attribution_text="Via pytest",
+        scenario=ToastScenario.Reminder,
+        suppress_popup=True,
+        timestamp=datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc),
+        images=[ToastDisplayImage(ToastImage(imagePath), "Python", ToastImagePosition.Hero, circleCrop=True)],
+        inputs=[textBox, selectionBox],
+        actions=[
+            ToastButton("Send", "action=send", relatedInput=textBox, colour=ToastButtonColour.Green),
+            ToastSystemButton(ToastSystemButtonAction.Snooze, relatedInput=selectionBox),
+        ],
+    )
+
+
+def test_serialization_round_trip(example_image_path):
+    from src.windows_toasts.serialization import dumps_binary, dumps_json, loads_binary, loads_json
+
+    handlers = ToastHandlerRegistry()
+    activatedHandler = handlers.register("activated", lambda _: None)
+
+    originalToast = _build_full_toast(example_image_path)
+    originalToast.on_activated = activatedHandler
+    originalToast.updates = 3
+
+    for serializedToast in (
+        Toast.from_dict(originalToast.to_dict(handlers), handlers),
+        loads_json(dumps_json(originalToast, handlers), handlers),
+        loads_binary(dumps_binary(originalToast, handlers), handlers),
+    ):
+        assert serializedToast == originalToast
+        assert serializedToast.to_dict(handlers) == originalToast.to_dict(handlers)
+        assert serializedToast.on_activated is activatedHandler
+        assert serializedToast.actions[0].relatedInput is serializedToast.inputs[0]
+        assert serializedToast.actions[1].relatedInput is serializedToast.inputs[1]
+        assert serializedToast.images[0].image.path == originalToast.images[0].image.path
+        assert serializedToast.timestamp == originalToast.timestamp
+        assert serializedToast.updates == 3
+
+    assert len(dumps_binary(originalToast, handlers)) < len(dumps_json(originalToast, handlers).encode())
+
+
+def test_serialization_errors():
+    from src.windows_toasts.serialization import decode_binary, dumps_binary, loads_binary
+
+    handlers = ToastHandlerRegistry()
+    lambdaToast = Toast(["Unregistered callback"], on_dismissed=lambda _: None)
+
+    with raises(ToastSerializationError, match="is not registered"):
+        lambdaToast.to_dict(handlers)
+
+    with raises(ToastSerializationError, match="No handler registered"):
+        Toast.from_dict({"text_fields": ["Hi"], "on_failed": "missing"}, handlers)
+
+    with raises(ToastSerializationError, match="Unsupported schema version"):
+        Toast.from_dict({"schema": 1000})
+
+    with raises(ToastSerializationError, match="Malformed toast dictionary"):
+        Toast.from_dict({"scenario": "NotAScenario"})
+
+    payload = dumps_binary(Toast(["Hello, World!"]))
+    with raises(ToastSerializationError, match="Truncated or corrupt payload"):
+        decode_binary(payload[:-3])
+
+    with raises(ToastSerializationError, match="missing schema version"):
+        decode_binary(payload[:3])
+
+    with raises(ToastSerializationError, match="not in the binary toast format"):
+        decode_binary(b"{}")
+
+    # A list as a dictionary key, values nested past the recursion limit, and payloads that are not toasts
+    with raises(ToastSerializationError, match="Corrupt payload"):
+        decode_binary(b"WTS\x01\x07\x01\x06\x00\x00")
+    with raises(ToastSerializationError, match="nested too deeply"):
+        decode_binary(b"WTS\x01" + b"\x06\x01" * 100000 + b"\x00")
+    with raises(ToastSerializationError, match="Expected a toast dictionary"):
+        loads_binary(b"WTS\x01\x00")
+    with raises(ToastSerializationError, match="must be an integer"):
+        Toast.from_dict({"schema": "1"})
@@ -0,0 +1,72 @@
+import sys
+from datetime import datetime, timedelta
+
+from pytest import raises
+
+from src.windows_toasts import (
+    InMemoryToastNotifier,
+    InteractableWindowsToaster,
+    SlowOperationLog,
+    Toast,
+    ToastButton,
+    ToastProgressBar,
+)
+
+
+def test_slow_operation_log():
+    toaster = InteractableWindowsToaster("Python", "Vendor.Product")
+    InMemoryToastNotifier().attach(toaster)
+    slowOperationLog = toaster.slowOperationLog = SlowOperationLog(threshold=0, capacity=3)
+
+    wideToast = Toast(
+        ["Title", "Body"], actions=[ToastButton("Open", "open")], progress_bar=ToastProgressBar("Working...")
+    )
+    toastHandle = toaster.show_toast(wideToast)
+    toastHandle.update(status="Done")
+    toaster.schedule_toast(Toast(["Later"]), datetime.now() + timedelta(hours=1))
+
+    showRecord, updateRecord, scheduleRecord = slowOperationLog.records()
+    assert showRecord.operation == "show"
+    assert list(showRecord.stages) == ["build", "notification", "register", "deliver", "observers"]
+    assert showRecord.toasterClass == "InteractableWindowsToaster"
+    assert showRecord.aumid == "Vendor.Product"
+    assert (showRecord.textFields, showRecord.actions, showRecord.inputs, showRecord.images) == (2, 1, 0, 0)
+    assert showRecord.payloadSize > 0
+    assert showRecord.profile is None
+
+    # Handle updates have no toast to take the shape of
+    assert updateRecord.operation == "update"
+    assert list(updateRecord.stages) == ["lock", "build", "deliver", "observers"]
+    assert updateRecord.textFields == 0
+    assert updateRecord.payloadSize == sum(len(value) for value in toastHandle.values.values())
+    assert scheduleRecord.operation == "schedule"
+
+    # Only the latest records are kept
+    slowOperationLog.profileRate = 1
+    toaster.show_toast(Toast(["Profiled"]))
+    assert len(slowOperationLog) == 3
+    assert slowOperationLog.slowCount == 4
+    assert "_show_notification" in slowOperationLog.records()[-1].profile
+
+    # Fast operations are not recorded
+    slowOperationLog.clear()
+    slowOperationLog.threshold = 60
+    toaster.show_toast(Toast(["Fast"]))
+    assert slowOperationLog.records() == []
+
+
+def test_profiler_stopped_on_error():
+    toaster = InteractableWindowsToaster("Python")
+    notifier = InMemoryToastNotifier().attach(toaster)
+    slowOperationLog = toaster.slowOperationLog = SlowOperationLog(threshold=0, profileRate=1)
+
+    def broken_show(notification):
+        raise ValueError("Broken notifier")
+
+    notifier.show = broken_show
+    with raises(ValueError):
+        toaster.show_toast(Toast(["Failing"]))
+
+    # Failed operations are not recorded, and do not leave the profiler running
+    assert sys.getprofile() is None
+    assert len(slowOperationLog) == 0
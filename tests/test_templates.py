@@ -0,0 +1,48 @@
+import pytest
+
+
+def test_template_render():
+    from src.windows_toasts import Toast, ToastButton, ToastTemplate
+
+    prototype = Toast(group="messages", actions=[ToastButton("Reply", "reply")])
+    template = ToastTemplate(
+        ["{sender}", "{message!r:.12}", None, "100% {count:03d}"],
+        status="{count} unread",
+        progress="ratio",
+        toast=prototype,
+    )
+    assert template.keys == {"sender", "message", "count", "ratio"}
+
+    records = [
+        {"sender": f"User {i}", "message": "Hello there, how are you?", "count": i, "ratio": i / 10} for i in range(5)
+    ]
+    toasts = template.render_many(records)
+    assert [toast.text_fields[0] for toast in toasts] == [f"User {i}" for i in range(5)]
+    assert toasts[3].text_fields[1:] == ["'Hello there", None, "100% 003"]
+    assert toasts[3].progress_bar.status == "3 unread"
+    assert toasts[3].progress_bar.progress == 0.3
+    assert toasts[3].group == "messages"
+    assert toasts[3].actions == prototype.actions
+    assert toasts[3].actions is not prototype.actions
+    assert len({toast.tag for toast in toasts} | {prototype.tag}) == 6
+
+    # Adding to the prototype's lists after compiling doesn't change what the template renders
+    prototype.AddAction(ToastButton("Archive", "archive"))
+    assert len(template.render(records[0]).actions) == 1
+
+    assert template.render_values(records[2]) == {
+        "text1": "User 2",
+        "text2": "'Hello there",
+        "text4": "100% 002",
+        "status": "2 unread",
+        "progress": "0.2",
+        "progress_override": "20%",
+        "caption": "",
+    }
+
+    with pytest.raises(KeyError):
+        template.render({"sender": "Nobody"})
+
+    for invalidTemplate in ("{}", "{0}", "{user.name}", "{value:{width}}"):
+        with pytest.raises(ValueError):
+            ToastTemplate([invalidTemplate])
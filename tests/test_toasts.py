@@ -351,3 +351,190 @@ def test_remove_toast_group():
     time.sleep(1)
 
     toast2.on_activated(ToastActivatedEventArgs())
+
+
+def test_bulk_removal():
+    from src.windows_toasts import InMemoryToastNotifier, ToasterObserver
+
+    class RemovalCounter(ToasterObserver):
+        def __init__(self) -> None:
+            self.toastsRemoved = 0
+            self.groupsRemoved = 0
+
+        def toast_removed(self, tag: str, group: str) -> None:
+            self.toastsRemoved += 1
+
+        def group_removed(self, group: str) -> None:
+            self.groupsRemoved += 1
+
+    toaster = InteractableWindowsToaster("Python")
+    notifier = InMemoryToastNotifier().attach(toaster)
+    removalCounter = RemovalCounter()
+    toaster.add_observer(removalCounter)
+
+    chatToasts = [Toast([f"Chat {i}"], group="chat") for i in range(10)]
+    mailToasts = [Toast([f"Mail {i}"], group="mail") for i in range(5)]
+    otherToasts = [Toast([f"Other {i}"]) for i in range(3)]
+    for toast in chatToasts + mailToasts + otherToasts:
+        toaster.show_toast(toast)
+
+    # A whole group is removed in one call, the rest one by one
+    result = toaster.remove_where(
+        lambda notification: notification.group == "chat" or notification.tag == mailToasts[0].tag
+    )
+    assert (result.removed, result.groupsRemoved, result.notFound, result.failed) == (11, 1, 0, 0)
+    assert (removalCounter.groupsRemoved, removalCounter.toastsRemoved) == (1, 1)
+    assert len(notifier) == 7
+
+    # Toasts and tags can be mixed, and those no longer there are counted
+    result = toaster.remove_toasts(
+        [mailToasts[0], mailToasts[1], mailToasts[2].tag, otherToasts[0], "missing"], chunkSize=2, chunkDelay=0.01
+    )
+    assert (result.removed, result.groupsRemoved, result.notFound) == (3, 0, 2)
+    assert len(notifier) == 4
+    assert (mailToasts[1].tag, "mail") not in toaster.liveToasts
+
+    result = toaster.remove_toasts(otherToasts[1:])
+    assert (result.removed, result.groupsRemoved) == (2, 0)
+    assert len(notifier) == 2
+
+
+def test_toast_handle():
+    import pickle
+
+    from src.windows_toasts import ToastHandle, ToastProgressBar
+    from src.windows_toasts.notifiers import InMemoryToastNotifier
+
+    toaster = InteractableWindowsToaster("Python")
+    notifier = InMemoryToastNotifier().attach(toaster)
+
+    newToast = Toast(["Downloading", "python.exe"], group="downloads", progress_bar=ToastProgressBar("Starting..."))
+    toastHandle = toaster.show_toast(newToast)
+    del newToast
+    # Sequence numbers are only tracked once the toast is updated, until it is released
+    assert len(toaster.sequenceAllocator) == 0
+
+    assert toastHandle.update(progress=0.5, status="Downloading...")
+    assert toaster.sequenceAllocator.current(toastHandle.tag, "downloads") == toastHandle.sequence_number
+    assert toastHandle.update(text_fields=["Downloaded"], progress=1)
+    assert notifier.values_of(toastHandle.tag, "downloads") == {
+        "text1": "Downloaded",
+        "text2": "python.exe",
+        "status": "Downloading...",
+        "progress": "1",
+        "progress_override": "100%",
+        "caption": "",
+    }
+
+    with raises(ValueError, match="is not a binding"):
+        toastHandle.update(title="Nope")
+
+    # Keep updating from a deserialized copy, e.g. in another process
+    copiedHandle = pickle.loads(pickle.dumps(toastHandle))
+    with raises(RuntimeError, match="not bound to a toaster"):
+        copiedHandle.update(progress=None)
+
+    copiedHandle = ToastHandle.from_dict(toastHandle.to_dict(), toaster)
+    assert copiedHandle.update(progress=None, progress_override="Verifying")
+    assert notifier.sequence_number_of(toastHandle.tag, "downloads") == toastHandle.sequence_number + 1
+    assert notifier.values_of(toastHandle.tag, "downloads")["progress"] == "indeterminate"
+
+    copiedHandle.remove()
+    assert notifier.values_of(toastHandle.tag, "downloads") is None
+    assert len(toaster.sequenceAllocator) == 0
+
+
+def test_static_toast():
+    from src.windows_toasts import ToastProgressBar
+    from src.windows_toasts.notifiers import InMemoryToastNotifier
+
+    toaster = InteractableWindowsToaster("Python")
+    notifier = InMemoryToastNotifier().attach(toaster)
+
+    staticToast = Toast(["Build finished"], progress_bar=ToastProgressBar("Done", progress=1))
+    toastHandle = toaster.show_toast(staticToast, static=True)
+    # The values are inlined, so nothing is bound
+    assert notifier.values_of(staticToast.tag) == {}
+    assert toastHandle.values == {}
+    assert toaster.sequenceAllocator.current(staticToast.tag, staticToast.tag) is None
+
+    toaster.staticToasts = True
+    defaultToast = Toast(["One-shot"])
+    toaster.show_toast(defaultToast)
+    assert notifier.values_of(defaultToast.tag) == {}
+
+    dynamicToast = Toast(["Dynamic"])
+    toaster.show_toast(dynamicToast, static=False)
+    assert notifier.values_of(dynamicToast.tag) == {"text1": "Dynamic"}
+
+
+def test_compiled_toast():
+    from dataclasses import FrozenInstanceError
+
+    from src.windows_toasts import ToastButton, ToastProgressBar
+    from src.windows_toasts.notifiers import InMemoryToastNotifier
+
+    toaster = InteractableWindowsToaster("Python")
+    notifier = InMemoryToastNotifier().attach(toaster)
+
+    activatedArguments = []
+    alertToast = Toast(
+        ["Disk almost full"],
+        group="alerts",
+        progress_bar=ToastProgressBar("Used", progress=0.9),
+        actions=[ToastButton("Clean up", "cleanup")],
+        on_activated=lambda eventArgs: activatedArguments.append(eventArgs.arguments),
+    )
+    compiledToast = toaster.compile(alertToast)
+    # Changing the source afterwards does not affect the compiled toast
+    alertToast.text_fields[0] = "Changed"
+    alertToast.progress_bar.status = "Changed"
+    alertToast.actions.clear()
+    with raises(FrozenInstanceError):
+        compiledToast.xml = ""
+
+    firstHandle, secondHandle = compiledToast.show(), compiledToast.show()
+    assert firstHandle.tag != secondHandle.tag
+    assert notifier.values_of(firstHandle.tag, "alerts")["text1"] == "Disk almost full"
+    assert notifier.values_of(secondHandle.tag, "alerts")["status"] == "Used"
+    # The launch argument is each instance's own tag
+    assert notifier.activate(secondHandle.tag, "alerts")
+    assert activatedArguments == [secondHandle.tag]
+    [firstNotification] = notifier.history.get_history_with_id("")
+    assert f'launch="{firstHandle.tag}"' in firstNotification.content.get_xml()
+
+    assert firstHandle.update(progress=1)
+    assert notifier.values_of(firstHandle.tag, "alerts")["progress_override"] == "100%"
+
+    staticToast = toaster.compile(Toast(["Static"]), static=True)
+    assert staticToast.bindingValues is None
+    assert "Static" in staticToast.xml
+    assert notifier.values_of(staticToast.show().tag) == {}
+
+
+def test_concurrent_updates():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src.windows_toasts import ToastProgressBar
+    from src.windows_toasts.notifiers import InMemoryToastNotifier
+
+    toaster = InteractableWindowsToaster("Python")
+    notifier = InMemoryToastNotifier().attach(toaster)
+
+    sharedToast = Toast(["Shared job"], progress_bar=ToastProgressBar("Working..."))
+    toastHandle = toaster.show_toast(sharedToast)
+
+    def worker(workerId):
+        for i in range(100):
+            if workerId % 2:
+                toaster.update_toast(sharedToast)
+            else:
+                toastHandle.update(status=f"{workerId}-{i}")
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(worker, range(8)))
+
+    # No update was given a duplicate or out of order sequence number, so none were discarded
+    assert notifier.discardedUpdates == 0
+    assert notifier.updateCount == 800
+    assert notifier.sequence_number_of(sharedToast.tag) == 801